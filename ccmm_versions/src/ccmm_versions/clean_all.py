@@ -10,28 +10,111 @@
 
 The normalization removes annotations, sorts elements and attributes,
 and cleans namespaces.
+
+Hashes of the normalized sources are kept in a manifest inside the output
+directory (ignored by git), so files that have not changed since the previous run are skipped.
+Files that need to be normalized are processed in parallel.
 """
 
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
 from lxml import etree
-from lxml.etree import _Element as Element
+
+if TYPE_CHECKING:
+    from lxml.etree import _Element as Element
+
+XS = "{http://www.w3.org/2001/XMLSchema}"
+
+MANIFEST_FILE = ".clean_all_manifest.json"
+
+# increase when the normalization changes, so that all files are normalized again
+NORMALIZATION_VERSION = 1
+
+# elements removed from the schema
+REMOVED_ELEMENTS = {f"{XS}annotation", f"{XS}include", f"{XS}import"}
+
+# attributes that are not needed in the normalized schema
+REMOVED_ATTRIBUTES = {
+    "{http://www.w3.org/ns/sawsdl}modelReference",
+    "{http://www.w3.org/2007/XMLSchema-versioning}minVersion",
+    "targetNamespace",
+    "elementFormDefault",
+}
 
 
 @click.command()
 @click.argument("input_dir", type=click.Path())
 @click.argument("output_dir", type=click.Path())
-def clean_all(input_dir: str, output_dir: str) -> None:
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default="number of CPUs",
+    help="Number of processes normalizing the files.",
+)
+@click.option("--force", is_flag=True, help="Normalize all files even if they have not changed.")
+def clean_all(input_dir: str, output_dir: str, jobs: int, force: bool) -> None:
     """Normalize all XML Schema files in the input directory and save to output directory."""
     Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    # output file => source file, if more sources map to the same output, the last one wins
+    sources: dict[Path, Path] = {}
     for xsd_file in list(Path(input_dir).glob("**/*.xsd")):
-        click.secho(f"Normalizing: {xsd_file}", fg="green")
         if xsd_file.resolve().is_relative_to(Path(output_dir).resolve()):
             continue
         relpath = xsd_file.relative_to(input_dir)
-        outpath = Path(output_dir) / (relpath.parts[0] + ".xsd")
-        normalize_xml_schema(xsd_file, outpath)
+        sources[Path(output_dir) / (relpath.parts[0] + ".xsd")] = xsd_file
+
+    manifest_path = Path(output_dir) / MANIFEST_FILE
+    previous_manifest = {} if force else load_manifest(manifest_path)
+    manifest: dict[str, str] = {}
+    to_normalize: list[tuple[Path, Path]] = []
+    for outpath, xsd_file in sources.items():
+        source_hash = hashlib.sha256(xsd_file.read_bytes()).hexdigest()
+        manifest[outpath.name] = source_hash
+        if previous_manifest.get(outpath.name) == source_hash and outpath.exists():
+            click.secho(f"Unchanged: {xsd_file}", fg="yellow")
+            continue
+        click.secho(f"Normalizing: {xsd_file}", fg="green")
+        to_normalize.append((xsd_file, outpath))
+
+    if jobs > 1 and len(to_normalize) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(to_normalize))) as executor:
+            # list() to propagate exceptions from the workers
+            list(executor.map(normalize_xml_schema, *zip(*to_normalize, strict=True)))
+    else:
+        for xsd_file, outpath in to_normalize:
+            normalize_xml_schema(xsd_file, outpath)
+
+    save_manifest(manifest_path, manifest)
+
+
+def load_manifest(manifest_path: Path) -> dict[str, str]:
+    """Load output file name => source hash mapping from the previous run."""
+    if not manifest_path.exists():
+        return {}
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except ValueError:
+        # corrupted manifest, normalize all files again
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != NORMALIZATION_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(manifest_path: Path, files: dict[str, str]) -> None:
+    """Save output file name => source hash mapping for the next run."""
+    manifest_path.write_text(
+        json.dumps({"version": NORMALIZATION_VERSION, "files": dict(sorted(files.items()))}, indent=2) + "\n"
+    )
 
 
 def normalize_xml_schema(input_xml: Path, output_xml: Path) -> None:
@@ -40,16 +123,8 @@ def normalize_xml_schema(input_xml: Path, output_xml: Path) -> None:
     parser = etree.XMLParser(remove_blank_text=True)
     tree = etree.parse(input_xml, parser)
     root = tree.getroot()
-    # Define namespaces we might encounter in schema files
-    nsmap = {
-        "xs": "http://www.w3.org/2001/XMLSchema",
-        "xsd": "http://www.w3.org/2001/XMLSchema",
-    }
-
-    remove_annotation_elements(root, nsmap)
-    remove_extension_lax_elements(root, nsmap)
-    sort_attributes_by_name(root)
-    sort_elements_by_name(root, nsmap)
+
+    normalize_tree(root)
     etree.cleanup_namespaces(root)
 
     # Serialize with consistent formatting
@@ -64,82 +139,71 @@ def normalize_xml_schema(input_xml: Path, output_xml: Path) -> None:
     )
 
 
-def remove_extension_lax_elements(root: Element, nsmap: dict) -> None:
-    """Remove xs:any elements with 'lax' processContents from the XML schema."""
-    # Remove all xs:any with processContents="lax"
-    for el in root.xpath('//xs:any[@processContents="lax"]', namespaces=nsmap):
-        el.getparent().remove(el)
-
-
-def remove_annotation_elements(root: Element, nsmap: dict) -> None:
-    """Remove annotation, include, and import elements from the XML schema."""
-    # Remove all annotation elements (which contain documentation/appinfo)
-    for el in root.xpath("//xs:annotation", namespaces=nsmap):
-        el.getparent().remove(el)
-    for el in root.xpath("//xs:include", namespaces=nsmap):
-        el.getparent().remove(el)
-    for el in root.xpath("//xs:import", namespaces=nsmap):
-        el.getparent().remove(el)
-    for el in root.xpath("//xs:import", namespaces=nsmap):
-        el.getparent().remove(el)
+def normalize_tree(root: Element) -> None:
+    """Normalize the schema in a single walk over the tree.
 
-
-def sort_attributes_by_name(root: Element) -> None:
-    """Sort attributes of each element lexicographically and remove unnecessary ones."""
+    Removes annotation, include and import elements and xs:any elements
+    with 'lax' processContents, sorts (and cleans up) attributes of each element
+    and sorts xs:element children of each parent element by their name attribute.
+    """
+    removed: list[Element] = []
+    # ordered set of parents, an element is not moved in the tree while it is walked
+    parents_with_elements: dict[Element, None] = {}
     for element in root.iter():
-        if not isinstance(element, Element):
-            continue  # comment, processing instruction, etc.
-
-        # Get all attributes and sort them
-        attrs = element.attrib
-        if attrs:
-            sorted_attrs = sorted(attrs.items())
-            # Clear and re-add in sorted order
-            element.attrib.clear()
-            for name, value in sorted_attrs:
-                val = value
-                if name in (
-                    "{http://www.w3.org/ns/sawsdl}modelReference",
-                    "{http://www.w3.org/2007/XMLSchema-versioning}minVersion",
-                    "targetNamespace",
-                    "elementFormDefault",
-                ):
-                    # Skip attributes that are not needed
-                    continue
-
-                if name == "type" and ":" in value:
-                    val = value.split(":")[-1]  # Keep only local name
-                element.attrib[name] = val
-
-
-def sort_elements_by_name(root: Element, nsmap: dict) -> None:
-    """Sort xs:element children of each parent element by their name attribute."""
-    # Define the namespace
-
-    # Find all parent elements that contain xs:element children
-    parents_with_elements = root.xpath("//*[xs:element]", namespaces=nsmap)
+        tag = element.tag
+        if tag in REMOVED_ELEMENTS or (tag == f"{XS}any" and element.get("processContents") == "lax"):
+            removed.append(element)
+            continue
+        if element.attrib:
+            sort_attributes(element)
+        if tag == f"{XS}element":
+            parents_with_elements[element.getparent()] = None
+
+    for el in removed:
+        parent = el.getparent()
+        if parent is not None:
+            parent.remove(el)
 
     for parent in parents_with_elements:
-        # Get all xs:element children
-        elements = parent.xpath("xs:element", namespaces=nsmap)
-
-        # Skip if only one element (nothing to sort)
-        if len(elements) <= 1:
+        sort_elements_by_name(parent)
+
+
+def sort_attributes(element: Element) -> None:
+    """Sort attributes of the element lexicographically and remove unnecessary ones."""
+    sorted_attrs = sorted(element.attrib.items())
+    # Clear and re-add in sorted order
+    element.attrib.clear()
+    for name, value in sorted_attrs:
+        val = value
+        if name in REMOVED_ATTRIBUTES:
+            # Skip attributes that are not needed
             continue
+        if name == "type" and ":" in value:
+            val = value.split(":")[-1]  # Keep only local name
+        element.attrib[name] = val
 
-        # Sort elements by their name attribute
-        elements_sorted = sorted(
-            elements,
-            key=lambda el: el.get("name", "").lower(),  # Case-insensitive sort
-        )
 
-        # Remove all elements from parent (we'll re-add them in sorted order)
-        for el in elements:
-            parent.remove(el)
+def sort_elements_by_name(parent: Element) -> None:
+    """Sort xs:element children of the parent element by their name attribute."""
+    elements = [child for child in parent if child.tag == f"{XS}element"]
+
+    # Skip if only one element (nothing to sort)
+    if len(elements) <= 1:
+        return
+
+    # Sort elements by their name attribute
+    elements_sorted = sorted(
+        elements,
+        key=lambda el: el.get("name", "").lower(),  # Case-insensitive sort
+    )
+
+    # Remove all elements from parent (we'll re-add them in sorted order)
+    for el in elements:
+        parent.remove(el)
 
-        # Add elements back in sorted order
-        for el in elements_sorted:
-            parent.append(el)
+    # Add elements back in sorted order
+    for el in elements_sorted:
+        parent.append(el)
 
 
 # Example usage:
@@ -6,20 +6,47 @@
 # ccmm-versions is free software; you can redistribute it and/or modify it
 # under the terms of the MIT License; see LICENSE file for more details.
 #
-"""Diff CCMM schemas between two releases."""
+"""Diff CCMM schemas between two releases.
 
-import subprocess
-import sys
+The schemas are expected to be normalized by clean_all.py. Instead of the generic
+(and slow) xmldiff matching, nodes of the schemas are matched by their tag and
+identifying attribute (name, ref, value or base), which is linear in the size
+of the schema. The edit script is then generated and formatted by xmldiff,
+so the output has the same format as `xmldiff --format xml`.
+"""
+
+import hashlib
+import os
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
+from lxml import etree
+from xmldiff import formatting
+from xmldiff.diff import Differ
+
+if TYPE_CHECKING:
+    from lxml.etree import _Element as Element
+
+# attributes identifying a node among its siblings with the same tag
+IDENTIFYING_ATTRIBUTES = ("name", "ref", "value", "base")
 
 
 @click.command()
 @click.argument("previous_release_dir", type=click.Path(exists=True))
 @click.argument("current_release_dir", type=click.Path(exists=True))
 @click.argument("diff_name", type=click.Path(), required=True)
-def diff_schemas(previous_release_dir: str, current_release_dir: str, diff_name: str) -> None:
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default="number of CPUs",
+    help="Number of processes diffing the files.",
+)
+def diff_schemas(previous_release_dir: str, current_release_dir: str, diff_name: str, jobs: int) -> None:
     """Diff CCMM schemas between CURRENT_RELEASE_DIR and the previous release in RELEASES_DIR."""
     previous_release_files = {f.name for f in Path(previous_release_dir).glob("*.xsd")}
     current_release_files = {f.name for f in Path(current_release_dir).glob("*.xsd")}
@@ -31,42 +58,128 @@ def diff_schemas(previous_release_dir: str, current_release_dir: str, diff_name:
 
     diff_lines.extend(
         f"<!-- File {filename} is missing in {current_release_dir} -->"
-        for filename in previous_release_files - current_release_files
+        for filename in sorted(previous_release_files - current_release_files)
     )
 
     diff_lines.extend(
         f"<!-- File {filename} is missing in {previous_release_dir} -->"
-        for filename in current_release_files - previous_release_files
+        for filename in sorted(current_release_files - previous_release_files)
     )
 
-    for filename in previous_release_files & current_release_files:
-        if (Path(previous_release_dir) / filename).read_text() != (Path(current_release_dir) / filename).read_text():
-            diff_lines.append(
-                f"<!-- Files {filename} differ between {previous_release_dir} and {current_release_dir} -->",
-            )
-            # get current python interpreter path
-            xmldiff_path = Path(sys.executable).parent / "xmldiff"
-            data: str | bytes = subprocess.check_output(  # noqa: S603
-                [
-                    str(xmldiff_path),
-                    str(Path(previous_release_dir) / filename),
-                    str(Path(current_release_dir) / filename),
-                    "--best-match",
-                    "--format",
-                    "xml",
-                    "-p",
-                ],
-            )
-            # print data indented for better readability
-            if isinstance(data, bytes):
-                data = data.decode("utf-8")
-            diff_lines.extend("  " + line for line in data.splitlines())
-            diff_lines.append("<!-- End of differences for file -->")
-            diff_lines.append("")
+    changed_files = [
+        filename
+        for filename in sorted(previous_release_files & current_release_files)
+        if file_hash(Path(previous_release_dir) / filename) != file_hash(Path(current_release_dir) / filename)
+    ]
+    previous_paths = [Path(previous_release_dir) / filename for filename in changed_files]
+    current_paths = [Path(current_release_dir) / filename for filename in changed_files]
+    if jobs > 1 and len(changed_files) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(changed_files))) as executor:
+            diffs = list(executor.map(diff_xsd_files, previous_paths, current_paths))
+    else:
+        diffs = list(map(diff_xsd_files, previous_paths, current_paths, strict=True))
+
+    for filename, data in zip(changed_files, diffs, strict=True):
+        diff_lines.append(
+            f"<!-- Files {filename} differ between {previous_release_dir} and {current_release_dir} -->",
+        )
+        # print data indented for better readability
+        diff_lines.extend("  " + line for line in data.splitlines())
+        diff_lines.append("<!-- End of differences for file -->")
+        diff_lines.append("")
     diff_lines.append("</xml>")
 
     Path(diff_name).write_text("\n".join(diff_lines))
 
 
+def file_hash(path: Path) -> bytes:
+    """Return the digest of the file content."""
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").digest()
+
+
+def diff_xsd_files(previous_file: Path, current_file: Path) -> str:
+    """Diff two normalized XML Schema files and return the diff in xmldiff's xml format."""
+    parser = etree.XMLParser(remove_blank_text=True)
+    left = etree.parse(previous_file, parser).getroot()
+    right = etree.parse(current_file, parser).getroot()
+
+    formatter = formatting.XMLFormatter(normalize=formatting.WS_BOTH, pretty_print=True)
+    formatter.prepare(left, right)
+    edit_script = XSDDiffer().diff(left, right)
+    # xmldiff command line prints the result with an extra newline
+    return formatter.format(edit_script, left) + "\n"
+
+
+class XSDDiffer(Differ):
+    """xmldiff differ that matches schema nodes by their tag and identifying attribute.
+
+    Children of matched nodes are matched if they have the same tag and the same
+    value of the first present attribute from IDENTIFYING_ATTRIBUTES (or if both
+    have none of them). The remaining children are matched if they have the same tag
+    and the same other attributes, these are reported as renamed. Multiple children
+    with the same key are matched in the order of appearance. Unmatched nodes
+    are reported as inserted or deleted.
+    """
+
+    def match(self, left: Element | None = None, right: Element | None = None) -> list:
+        """Match nodes of the left and right trees."""
+        if left is not None or right is not None:
+            self.set_trees(left, right)
+
+        if self._matches is not None:
+            # already matched
+            return self._matches
+
+        self._matches = []
+        self._l2rmap = {}
+        self._r2lmap = {}
+        self._inorder = set()
+        self._text_cache = {}
+
+        self.append_match(self.left, self.right, 1.0)
+        pending = [(self.left, self.right)]
+        while pending:
+            lnode, rnode = pending.pop()
+
+            unmatched_lchildren = list(lnode)
+            for key_function in (node_key, renamed_node_key):
+                rchildren: dict[tuple, deque[Element]] = defaultdict(deque)
+                for rchild in rnode:
+                    if id(rchild) not in self._r2lmap:
+                        rchildren[key_function(rchild)].append(rchild)
+                still_unmatched = []
+                for lchild in unmatched_lchildren:
+                    candidates = rchildren.get(key_function(lchild))
+                    if candidates:
+                        rchild = candidates.popleft()
+                        self.append_match(lchild, rchild, 1.0)
+                        pending.append((lchild, rchild))
+                    else:
+                        still_unmatched.append(lchild)
+                unmatched_lchildren = still_unmatched
+
+        return self._matches
+
+
+def node_key(node: Element) -> tuple:
+    """Return the key identifying the node among its siblings."""
+    if not isinstance(node.tag, str):
+        # comments and processing instructions
+        return (node.tag, node.text)
+    for attr in IDENTIFYING_ATTRIBUTES:
+        value = node.get(attr)
+        if value is not None:
+            return (node.tag, attr, value)
+    return (node.tag,)
+
+
+def renamed_node_key(node: Element) -> tuple:
+    """Return the key of the node without its identifying attribute, used to detect renamed nodes."""
+    if not isinstance(node.tag, str):
+        return (node.tag, node.text)
+    return (node.tag, *sorted((k, v) for k, v in node.attrib.items() if k not in IDENTIFYING_ATTRIBUTES))
+
+
 if __name__ == "__main__":
     diff_schemas()
@@ -6,14 +6,16 @@
 # ccmm-versions is free software; you can redistribute it and/or modify it
 # under the terms of the MIT License; see LICENSE file for more details.
 #
-"""Normalize XML Schema files.
+"""Merge XML Schema files into a single schema.
 
-The normalization removes annotations, sorts elements and attributes,
-and cleans namespaces.
+Top-level elements of all the schemas are put into the root element of the first one.
+Duplicate elements are detected by digests of their exclusive canonical (C14N)
+serialization, only duplicate xs:import elements are allowed.
 """
 
+import hashlib
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
 import click
 from lxml import etree
@@ -36,19 +38,24 @@ def merge_schemas(input_dir: str, output_file: str) -> None:
         click.secho(f"Concatenating: {xsd_file}", fg="green")
         root_elements.append(load_xml_schema(str(xsd_file)))
     first_root = root_elements[0]
-    canonical_representations = {
-        make_canonical_string(element) for element in first_root if getattr(element, "tag", None) is not None
+    canonical_digests = {
+        make_canonical_digest(element) for element in first_root if getattr(element, "tag", None) is not None
     }
+    # collect attributes and namespace declarations that are not present in the first root,
+    # so that the root needs to be rebuilt (to add the namespace declarations) at most once
+    nsmap = dict(first_root.nsmap)
     for other_root in root_elements[1:]:
-        # add attributes that are not present in the first root
         for attr_name, attr_value in other_root.attrib.items():
             if attr_name not in first_root.attrib:
                 first_root.attrib[attr_name] = attr_value
-        # add missing namespace declarations
-        for ns_decl in other_root.nsmap.items():
-            if ns_decl[0] not in first_root.nsmap:
-                first_root = duplicate_with_new_namespace(first_root, ns_decl[0], ns_decl[1])
-        merge_children(first_root, other_root, canonical_representations)
+        for prefix, uri in other_root.nsmap.items():
+            if prefix not in nsmap:
+                click.secho(f"Adding namespace declaration: {prefix} -> {uri}", fg="blue")
+                nsmap[prefix] = uri
+    if nsmap != first_root.nsmap:
+        first_root = duplicate_with_nsmap(first_root, nsmap)
+    for other_root in root_elements[1:]:
+        merge_children(first_root, other_root, canonical_digests)
     tree = etree.ElementTree(first_root)
     tree.write(
         output_file,
@@ -58,20 +65,20 @@ def merge_schemas(input_dir: str, output_file: str) -> None:
     )
 
 
-def merge_children(first_root: Element, other_root: Element, canonical_representations: set[str]) -> None:
+def merge_children(first_root: Element, other_root: Element, canonical_digests: set[bytes]) -> None:
     """Merge children of other_root into first_root, avoiding duplicates."""
     for element in other_root:
         if getattr(element, "tag", None) is None:
             continue
         # check if the element is already present
-        canonical_element = make_canonical_string(element)
-        if canonical_element in canonical_representations:
+        canonical_digest = make_canonical_digest(element)
+        if canonical_digest in canonical_digests:
             if element.tag != "{http://www.w3.org/2001/XMLSchema}import":
                 raise ValueError(
                     f"Duplicate element found that is not an import: {etree.tostring(element).decode('utf-8')}"
                 )
             continue
-        canonical_representations.add(canonical_element)
+        canonical_digests.add(canonical_digest)
         # if the element is xs:import, add it to the beginning
         if element.tag == "{http://www.w3.org/2001/XMLSchema}import":
             first_root.insert(0, element)
@@ -79,15 +86,14 @@ def merge_children(first_root: Element, other_root: Element, canonical_represent
             first_root.append(element)
 
 
-def duplicate_with_new_namespace(element: Element, prefix: str | None, uri: str) -> Element:
-    """Duplicate the given element adding a new namespace declaration."""
-    click.secho(f"Adding namespace declaration: {prefix} -> {uri}", fg="blue")
+def duplicate_with_nsmap(element: Element, nsmap: dict[str | None, str]) -> Element:
+    """Duplicate the given element with the given namespace declarations."""
     new_attrib = {**element.attrib}
 
     new_element = etree.Element(
         element.tag,
         attrib=new_attrib,
-        nsmap=({**element.nsmap, prefix: uri} if prefix else {**element.nsmap, None: uri}),
+        nsmap=nsmap,
     )
     for child in element:
         new_element.append(child)
@@ -96,15 +102,19 @@ def duplicate_with_new_namespace(element: Element, prefix: str | None, uri: str)
     return new_element
 
 
-def make_canonical_string(element: Element) -> Any:
-    """Return a canonical string representation of the given XML element."""
-    return etree.tostring(
+def make_canonical_digest(element: Element) -> bytes:
+    """Return a digest of the canonical representation of the given XML element.
+
+    Only the digests are kept for duplicate detection, not the whole canonical strings.
+    """
+    canonical = etree.tostring(
         element,
         method="c14n",
         exclusive=True,
         with_comments=False,
         inclusive_ns_prefixes=None,
-    ).decode("utf-8")
+    )
+    return hashlib.blake2b(canonical, digest_size=32).digest()
 
 
 def load_xml_schema(file_path: str) -> Element:
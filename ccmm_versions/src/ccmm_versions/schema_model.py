@@ -0,0 +1,254 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-versions (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-versions is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Indexed in-memory model of XML Schema files.
+
+Each XSD file is parsed once into a model containing named complex types with
+their fields (type, cardinality and multilingual flag) and elements with anonymous
+types together with their parent paths. The tools working with the schemas
+(create_schema_overview.py, identify_anonymous_types.py) read this model instead
+of querying the XML trees.
+
+Models of the files are cached in a json file inside the schema directory and
+keyed by hashes of the files, so unchanged files are not parsed again. The cache
+file is ignored by git (see .gitignore of ccmm_versions).
+"""
+
+import dataclasses
+import hashlib
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import click
+from lxml import etree
+
+if TYPE_CHECKING:
+    from lxml.etree import _Element as Element
+
+XS = "{http://www.w3.org/2001/XMLSchema}"
+
+CACHE_FILE = ".schema_model.json"
+
+# increase when the model changes, so that all files are parsed again
+MODEL_VERSION = 1
+
+
+@dataclasses.dataclass
+class SchemaField:
+    """Element declared inside of a complex type."""
+
+    name: str
+    type: str | None
+    """Declared type of the element, None if the type is anonymous."""
+    required: bool
+    array: bool
+    multilingual: bool
+    """True if the anonymous type of the element is a string with xml:lang attribute."""
+
+
+@dataclasses.dataclass
+class SchemaType:
+    """Named complex type of the schema."""
+
+    name: str
+    fields: list[SchemaField]
+
+
+@dataclasses.dataclass
+class AnonymousType:
+    """Element with an anonymous (inline) complex or simple type."""
+
+    path: str
+    """Path of names of the ancestors of the element, such as schema/complexType[agent]/sequence."""
+    multilingual: bool
+    xml: str
+    """Serialized element."""
+
+
+@dataclasses.dataclass
+class SchemaModel:
+    """Model of one or more schema files."""
+
+    types: dict[str, SchemaType] = dataclasses.field(default_factory=dict)
+    anonymous_types: list[AnonymousType] = dataclasses.field(default_factory=list)
+
+    def update(self, other: SchemaModel) -> None:
+        """Add types and anonymous types of the other model to this one."""
+        self.types.update(other.types)
+        self.anonymous_types.extend(other.anonymous_types)
+
+    def to_json(self) -> dict[str, Any]:
+        """Convert the model to a json-serializable dictionary."""
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> SchemaModel:
+        """Create the model from a dictionary created by to_json."""
+        return cls(
+            types={
+                name: SchemaType(
+                    name=type_data["name"],
+                    fields=[SchemaField(**field) for field in type_data["fields"]],
+                )
+                for name, type_data in data["types"].items()
+            },
+            anonymous_types=[AnonymousType(**anonymous) for anonymous in data["anonymous_types"]],
+        )
+
+
+def load_schema_model(dirname: str | Path, pattern: str = "*.xsd") -> SchemaModel:
+    """Load the model of all XSD files matching the pattern in the given directory.
+
+    :param dirname: directory with the schema files
+    :param pattern: glob pattern of the schema files, for example name of a single file
+    :return: model of all the files, in the order of their names
+    """
+    cache_path = Path(dirname) / CACHE_FILE
+    cache = load_cache(cache_path)
+    changed = False
+
+    model = SchemaModel()
+    for xsd_file in sorted(Path(dirname).glob(pattern)):
+        file_hash = hashlib.sha256(xsd_file.read_bytes()).hexdigest()
+        cached = cache.get(xsd_file.name)
+        if cached is not None and cached["hash"] == file_hash:
+            click.secho(f"Unchanged: {xsd_file}", fg="yellow")
+            file_model = SchemaModel.from_json(cached["model"])
+        else:
+            click.secho(f"Checking: {xsd_file}", fg="green")
+            file_model = build_file_model(xsd_file)
+            cache[xsd_file.name] = {"hash": file_hash, "model": file_model.to_json()}
+            changed = True
+        model.update(file_model)
+
+    if changed:
+        save_cache(cache_path, cache)
+    return model
+
+
+def load_cache(cache_path: Path) -> dict[str, dict[str, Any]]:
+    """Load file name => {hash, model} mapping from the previous run."""
+    if not cache_path.exists():
+        return {}
+    try:
+        cache = json.loads(cache_path.read_text())
+    except ValueError:
+        # corrupted cache, parse all files again
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != MODEL_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def save_cache(cache_path: Path, files: dict[str, dict[str, Any]]) -> None:
+    """Save file name => {hash, model} mapping for the next run."""
+    cache_path.write_text(json.dumps({"version": MODEL_VERSION, "files": dict(sorted(files.items()))}, indent=1))
+
+
+def build_file_model(xsd_file: str | Path) -> SchemaModel:
+    """Parse an XSD file and build its model."""
+    parser = etree.XMLParser(remove_blank_text=True)
+    root = etree.parse(xsd_file, parser).getroot()
+
+    model = SchemaModel()
+    for ct in root.iterchildren(f"{XS}complexType"):
+        type_name = ct.get("name")
+        if type_name:
+            model.types[type_name] = SchemaType(name=type_name, fields=parse_complextype_fields(ct))
+    collect_anonymous_types(root, [], model.anonymous_types)
+    return model
+
+
+def parse_complextype_fields(ct: Element) -> list[SchemaField]:
+    """Parse fields from the sequence or choice of the given complexType element."""
+    complex_content = ct.find(f"{XS}complexContent")
+    container = ct if complex_content is None else complex_content
+    sequence = container.find(f"{XS}sequence")
+    choice = container.find(f"{XS}choice")
+    # an empty sequence is not used in favour of the choice
+    content = sequence if sequence is not None and len(sequence) else choice
+    if content is None:
+        return []
+
+    fields: list[SchemaField] = []
+    for element in content.iterchildren(f"{XS}element"):
+        max_occurs = element.get("maxOccurs", "1")
+        fields.append(
+            SchemaField(
+                name=element.get("name", ""),
+                type=element.get("type"),
+                required=element.get("minOccurs", "1") != "0",
+                array=max_occurs == "unbounded" or (max_occurs.isdigit() and int(max_occurs) > 1),
+                multilingual=is_multilingual(element),
+            )
+        )
+    return fields
+
+
+def collect_anonymous_types(parent: Element, path: list[str], anonymous_types: list[AnonymousType]) -> None:
+    """Collect elements with anonymous types, in document order, with their ancestor paths.
+
+    :param parent: element whose subtree is searched
+    :param path: path of names of the ancestors of the parent
+    :param anonymous_types: list the anonymous types are appended to
+    """
+    name = parent.get("name")
+    tagname = etree.QName(parent).localname
+    path = [*path, f"{tagname}[{name}]" if name else tagname]
+    for child in parent:
+        if not isinstance(child.tag, str):
+            # comments and processing instructions
+            continue
+        if child.tag == f"{XS}element" and (
+            child.find(f"{XS}complexType") is not None or child.find(f"{XS}simpleType") is not None
+        ):
+            anonymous_types.append(
+                AnonymousType(
+                    path="/".join(path),
+                    multilingual=is_multilingual(child),
+                    xml=etree.tostring(child, pretty_print=True).decode("utf-8"),
+                )
+            )
+        collect_anonymous_types(child, path, anonymous_types)
+
+
+def is_multilingual(element: Element) -> bool:
+    """Check if the given element has a multilingual type.
+
+    Multilingual types look like:
+
+    <xs:element name="..."> ... this is the input element
+      <xs:complexType>
+        <xs:simpleContent>
+          <xs:extension base="xs:string">
+            <xs:attribute ref="xml:lang"/>
+          </xs:extension>
+        </xs:simpleContent>
+      </xs:complexType>
+    </xs:element>
+    """
+    # Check if element has a complexType
+    ct = element.find(f"{XS}complexType")
+    if ct is None or not len(ct):
+        return False
+    # Look for simpleContent child
+    simple_content = ct.find(f"{XS}simpleContent")
+    if simple_content is None:
+        return False
+    # Look for extension child of simpleContent
+    extension = simple_content.find(f"{XS}extension")
+    if extension is None:
+        return False
+    # Check if extension base is xs:string
+    base = extension.get("base")
+    if base not in ("xs:string", "xsd:string"):
+        return False
+    # Look for xml:lang attribute
+    attributes = extension.iterchildren(f"{XS}attribute")
+    return any(attr.get("ref") == "xml:lang" for attr in attributes)
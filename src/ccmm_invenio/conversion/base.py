@@ -10,7 +10,15 @@
 
 from __future__ import annotations
 
-from typing import Any
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any
+
+from .manifest import describe_parameter, file_digest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
 
 
 class VocabularyReader:
@@ -20,6 +28,34 @@ class VocabularyReader:
         """Initialize the reader with a name."""
         self.name = name
 
-    def data(self) -> list[dict[str, Any]]:
-        """Read the data from the source."""
+    def data(self) -> Iterable[dict[str, Any]]:
+        """Read the data from the source (a list or a generator of vocabulary terms)."""
         raise NotImplementedError("Subclasses must implement this method.")
+
+    def input_files(self) -> list[Path]:
+        """Return local files the output of this reader depends on."""
+        return []
+
+    def parameters(self) -> dict[str, Any]:
+        """Return reader parameters that influence the output of this reader."""
+        return {}
+
+    def refresh_sources(self) -> None:
+        """Bring cached copies of remote sources up to date.
+
+        Called before the fingerprint is computed for a conversion. It is not called in check mode,
+        so the fingerprint (and parameters) must not access the network themselves.
+        """
+
+    def fingerprint(self) -> str:
+        """Return a hash of all inputs of this reader.
+
+        If the fingerprint has not changed since the last conversion,
+        the reader would produce the same output.
+        """
+        description = {
+            "reader": f"{type(self).__module__}.{type(self).__qualname__}",
+            "parameters": describe_parameter(self.parameters()),
+            "files": [[path.name, file_digest(path)] for path in self.input_files()],
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode("utf-8")).hexdigest()
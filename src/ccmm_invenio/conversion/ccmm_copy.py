@@ -10,11 +10,10 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
-
-import yaml
+from typing import TYPE_CHECKING, override
 
 from .base import VocabularyReader
+from .yaml_io import load_yaml_all
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -28,7 +27,11 @@ class CopyReader(VocabularyReader):
         super().__init__(name)
         self.input_file = input_file
 
+    @override
+    def input_files(self) -> list[Path]:
+        """Return local files the output of this reader depends on."""
+        return [self.input_file]
+
     def data(self) -> list[dict[str, str]]:
         """Read the vocabulary from the input file."""
-        with self.input_file.open() as f:
-            return list(yaml.safe_load_all(f))
+        return load_yaml_all(self.input_file)
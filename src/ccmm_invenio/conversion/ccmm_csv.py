@@ -11,11 +11,13 @@
 from __future__ import annotations
 
 import csv
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, override
 
 from .base import VocabularyReader
+from .hierarchy import sort_by_hierarchy
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from pathlib import Path
 
 
@@ -28,26 +30,27 @@ class CSVReader(VocabularyReader):
         self.csv_path = csv_path
         self.extra = extra or []
 
-    def data(self) -> list[dict[str, str]]:
-        """Convert CCMM CSV to YAML that can be imported to NRP Invenio."""
-        with self.csv_path.open(encoding="utf-8-sig") as csv_file:
-            reader = csv.DictReader(csv_file, delimiter=";", quotechar='"')
-            rows = list(reader)
+    @override
+    def input_files(self) -> list[Path]:
+        """Return local files the output of this reader depends on."""
+        return [self.csv_path, *self.extra]
 
-        # Remove leading and trailing whitespace from all keys and values
-        converted_data: list[dict[str, str]] = []
-        for _row in rows:
-            row = {key.strip(): value.strip() for key, value in _row.items() if key}
+    def data(self) -> Iterator[dict[str, Any]]:
+        """Convert CCMM CSV to YAML that can be imported to NRP Invenio.
 
+        Rows are converted lazily, the addon columns from the extra files are applied
+        from an index built before the main CSV file is read.
+        """
+        overrides = self._read_overrides()
+        yield from sort_by_hierarchy(self._convert_rows(overrides))
+
+    def _convert_rows(self, overrides: dict[str, list[tuple[tuple[str, ...], str]]]) -> Iterator[dict[str, Any]]:
+        """Convert rows of the main CSV file to vocabulary terms."""
+        for row in _read_rows(self.csv_path):
             # IRI;base IRI;parentId;id;title_cs;title_en;definition_cs;definition_en
-            term_id = row.pop("id")
-            iri = row.pop("IRI")
-            base_iri = row.pop("base IRI")
-            parent_id = row.pop("parentId")
-            title_cs = row.pop("title_cs")
-            title_en = row.pop("title_en")
-            definition_cs = row.pop("definition_cs")
-            definition_en = row.pop("definition_en")
+            term_id = row["id"]
+            title_cs = row["title_cs"]
+            title_en = row["title_en"]
 
             if not term_id or (not title_cs and not title_en):
                 # Skip empty rows
@@ -60,38 +63,53 @@ class CSVReader(VocabularyReader):
                     "en": title_en,
                 },
                 "description": {
-                    "cs": definition_cs,
-                    "en": definition_en,
+                    "cs": row["definition_cs"],
+                    "en": row["definition_en"],
                 },
                 "props": {
-                    "iri": iri,
-                    "base_iri": base_iri,
+                    "iri": row["IRI"],
+                    "base_iri": row["base IRI"],
                 },
             }
-            if parent_id:
+            if row["parentId"]:
                 term["hierarchy"] = {
-                    "parent": parent_id,
+                    "parent": row["parentId"],
                 }
-            converted_data.append(term)
+            for path, value in overrides.get(term_id, ()):
+                _set(term, path, value)
+            yield term
+
+    def _read_overrides(self) -> dict[str, list[tuple[tuple[str, ...], str]]]:
+        """Read the extra files into a mapping of term id to (key path, value) overrides.
 
-        converted_data_by_id = {term["id"]: term for term in converted_data}
+        Overrides are kept in the order of the extra files and their rows, so that
+        later files take precedence. Column names might contain dots that mean nesting,
+        they are split once per column.
+        """
+        overrides: dict[str, list[tuple[tuple[str, ...], str]]] = {}
         for extra_file in self.extra:
-            with extra_file.open(encoding="utf-8-sig") as extra_csv_file:
-                extra_reader = csv.DictReader(extra_csv_file, delimiter=";", quotechar='"')
-                for _extra_row in extra_reader:
-                    extra_row = {key.strip(): value.strip() for key, value in _extra_row.items() if key}
-                    term_id = extra_row.pop("id")
-                    if term_id in converted_data_by_id:
-                        converted = converted_data_by_id[term_id]
-                        for k, v in extra_row.items():
-                            # k might contain a dot that means nesting
-                            _set(converted, k, v)
-        return converted_data
-
-
-def _set(d: dict[str, Any], key: str, value: str) -> None:
-    """Set a value in a nested dictionary based on a dot-separated key."""
-    keys = key.split(".")
-    for k in keys[:-1]:
+            paths: dict[str, tuple[str, ...]] = {}
+            for row in _read_rows(extra_file):
+                term_id = row.pop("id")
+                term_overrides = overrides.setdefault(term_id, [])
+                for key, value in row.items():
+                    path = paths.get(key)
+                    if path is None:
+                        path = paths[key] = tuple(key.split("."))
+                    term_overrides.append((path, value))
+        return overrides
+
+
+def _read_rows(csv_path: Path) -> Iterator[dict[str, str]]:
+    """Read rows of a CCMM CSV file, with whitespace stripped from keys and values."""
+    with csv_path.open(encoding="utf-8-sig") as csv_file:
+        reader = csv.DictReader(csv_file, delimiter=";", quotechar='"')
+        for row in reader:
+            yield {key.strip(): value.strip() for key, value in row.items() if key}
+
+
+def _set(d: dict[str, Any], path: tuple[str, ...], value: str) -> None:
+    """Set a value in a nested dictionary based on a key path."""
+    for k in path[:-1]:
         d = d.setdefault(k, {})
-    d[keys[-1]] = value
+    d[path[-1]] = value
@@ -10,14 +10,17 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
-
-import yaml
+import math
+from collections import deque
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, override
 
 from .base import VocabularyReader
+from .hierarchy import children_index, sort_by_hierarchy
+from .yaml_io import load_yaml
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable
     from pathlib import Path
 
 
@@ -47,10 +50,19 @@ class FilteredReader(VocabularyReader):
         self.input_file = input_file
         self.filter_cls = filter_cls
 
+    @override
+    def input_files(self) -> list[Path]:
+        """Return local files the output of this reader depends on."""
+        return [self.input_file]
+
+    @override
+    def parameters(self) -> dict[str, Any]:
+        """Return reader parameters that influence the output of this reader."""
+        return {"filter_cls": self.filter_cls}
+
     def data(self) -> Any:
         """Read the vocabulary data and apply the filter function."""
-        with self.input_file.open(encoding="utf-8") as file:
-            _data = list(yaml.safe_load(file))
+        _data = list(load_yaml(self.input_file))
 
         # Apply the filter function
         flt = self.filter_cls()
@@ -64,7 +76,7 @@ class FilteredReader(VocabularyReader):
                 if parent not in ids:
                     del item["hierarchy"]
 
-        return data
+        return sort_by_hierarchy(data)
 
 
 class ISO6391LanguageFilter(FilterCls):
@@ -78,28 +90,51 @@ class ISO6391LanguageFilter(FilterCls):
 class DescendantsOfFilter(FilterCls):
     """Filter class to filter items based on descendants."""
 
-    def __init__(self, descendants_of: set[str]):
-        """Initialize the filter with a set of descendants."""
+    def __init__(
+        self,
+        descendants_of: Iterable[str] | Mapping[str, int | None],
+        max_depth: int | None = None,
+    ):
+        """Initialize the filter.
+
+        :param descendants_of: IRIs of the terms whose descendants are kept (the terms themselves
+                               are not kept). If a mapping is passed, its values are depth limits
+                               for the particular root, overriding max_depth.
+        :param max_depth:      Keep only descendants at most this deep (1 = children only),
+                               None means unlimited depth.
+        """
         super().__init__()
-        self.descendants_of = descendants_of
+        if isinstance(descendants_of, Mapping):
+            self.descendants_of: dict[str, int | None] = dict(descendants_of)
+        else:
+            self.descendants_of = dict.fromkeys(descendants_of, max_depth)
 
     def filter(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """Filter items to include only those that are descendants of specified parents."""
-        known_parents: set[str] = set()
+        """Filter items to include only those that are descendants of specified parents.
+
+        The result does not depend on the order of the items.
+        """
+        children = children_index(items)
 
-        # register initial known parents
+        # breadth-first search from the roots, remaining depth is tracked per item because
+        # nested roots may have different depth limits
+        remaining_depth: dict[str, float] = {}
+        queue: deque[tuple[str, float]] = deque()
         for item in items:
             iri = item.get("props", {}).get("iri")
             if iri and iri in self.descendants_of:
-                known_parents.add(item["id"])
+                depth = self.descendants_of[iri]
+                queue.append((item["id"], math.inf if depth is None else depth))
 
-        ret: list[dict[str, Any]] = []
-        for item in items:
-            parent = item.get("hierarchy", {}).get("parent")
-            if not parent:
+        while queue:
+            parent_id, depth = queue.popleft()
+            if depth <= 0:
                 continue
-            if parent in known_parents:
-                known_parents.add(item["id"])
-                ret.append(item)
-
-        return ret
+            for child in children.get(parent_id, []):
+                child_id = child["id"]
+                if remaining_depth.get(child_id, -1) >= depth - 1:
+                    continue
+                remaining_depth[child_id] = depth - 1
+                queue.append((child_id, depth - 1))
+
+        return [item for item in items if item["id"] in remaining_depth]
@@ -11,7 +11,7 @@
 from __future__ import annotations
 
 import csv
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, override
 
 from .base import VocabularyReader
 
@@ -27,6 +27,11 @@ class RDMSubjectsCSVReader(VocabularyReader):
         super().__init__(name)
         self.csv_path = csv_path
 
+    @override
+    def input_files(self) -> list[Path]:
+        """Return local files the output of this reader depends on."""
+        return [self.csv_path]
+
     def data(self) -> list[dict[str, object]]:
         """Convert CCMM CSV to Invenio subjects vocabulary YAML format."""
         with self.csv_path.open(encoding="utf-8-sig") as csv_file:
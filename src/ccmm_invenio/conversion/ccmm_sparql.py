@@ -10,14 +10,16 @@
 
 from __future__ import annotations
 
+import dataclasses
 import logging
 from collections import defaultdict
-from functools import partial
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, override
 from urllib.error import HTTPError, URLError
 
-from rdflib import SKOS, Graph, URIRef
+from rdflib import DC, RDF, RDFS, SKOS, XSD, Graph, Literal, URIRef
 from tenacity import (  # type: ignore[reportMissingImports]
     before_sleep_log,
     retry,
@@ -25,12 +27,18 @@ from tenacity import (  # type: ignore[reportMissingImports]
     stop_after_attempt,
     wait_exponential,
 )
-from tqdm.contrib.concurrent import process_map  # type: ignore[reportMissingImports]
+from tqdm import tqdm  # type: ignore[reportMissingImports]
 
 from .base import VocabularyReader
+from .hierarchy import sort_by_hierarchy
+from .rdf_cache import download
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Iterator
+
+    from rdflib.term import Node
+
+    from .rdf_cache import RDFCache
 
 # Set up logging to see retry attempts
 logging.basicConfig(level=logging.INFO)
@@ -45,15 +53,24 @@ RETRY_CONFIG: dict[str, Any] = {
     "reraise": True,
 }
 
+# Number of concurrent downloads of subgraphs
+SUBGRAPH_DOWNLOAD_WORKERS = 20
+
 
 @retry(**RETRY_CONFIG)
 def parse_source(
     url: str,
     format: str = "xml",  # noqa: A002 shadows built-in format
+    cache: RDFCache | None = None,
 ) -> Graph:
-    """Parse RDF with automatic retries for transient errors."""
-    g = Graph()
+    """Parse RDF with automatic retries for transient errors.
+
+    If cache is given, the RDF is taken from the cache (revalidated if the cache is online).
+    """
     try:
+        if cache is not None:
+            return cache.graph(url, format=format)
+        g = Graph()
         g.parse(url, format=format)
     except Exception as e:
         logger.warning("Attempt failed for %s: %s", url, e)
@@ -62,13 +79,122 @@ def parse_source(
         return g
 
 
+@retry(**RETRY_CONFIG)
+def fetch_source(
+    url: str,
+    cache: RDFCache,
+    format: str = "xml",  # noqa: A002 shadows built-in format
+) -> str:
+    """Make sure the url is cached and up to date and return digest of its content."""
+    try:
+        return cache.fetch(url, format=format)
+    except Exception as e:
+        logger.warning("Attempt failed for %s: %s", url, e)
+        raise  # Re-raise for tenacity to handle
+
+
+@retry(**RETRY_CONFIG)
+def download_source(
+    url: str,
+    format: str = "xml",  # noqa: A002 shadows built-in format
+) -> tuple[bytes, str]:
+    """Download raw RDF with automatic retries for transient errors.
+
+    Returns the content and the final url after redirects (to be used as base IRI when parsing).
+    """
+    try:
+        body, final_url, _ = download(url, format=format)
+    except Exception as e:
+        logger.warning("Attempt failed for %s: %s", url, e)
+        raise  # Re-raise for tenacity to handle
+    else:
+        return body, final_url
+
+
+def map_concurrently[T, R](func: Callable[[T], R], items: Iterable[T], max_workers: int) -> Iterator[R]:
+    """Call func on items in a thread pool and yield the results in the order of completion.
+
+    At most 2 * max_workers calls are in flight, so that results that have not yet been
+    consumed by the caller do not accumulate in memory.
+    """
+    items_iterator = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: set[Future[R]] = {executor.submit(func, item) for item in islice(items_iterator, 2 * max_workers)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                pending.update(executor.submit(func, item) for item in islice(items_iterator, len(done)))
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+@dataclasses.dataclass(frozen=True)
+class ExtraProperty:
+    """Definition of an extra property of a concept that is copied to the term props.
+
+    The predicate and datatype are either full IRIs or prefixed names (prefix:name),
+    using the prefixes of the reader and skos, dc, rdf, rdfs prefixes.
+    """
+
+    predicate: str
+    """Predicate linking the concept to the value."""
+
+    datatype: str | None = None
+    """If set, only literals with this datatype are taken."""
+
+
+DEFAULT_PREFIXES = {
+    "skos": str(SKOS),
+    "dc": str(DC),
+    "rdf": str(RDF),
+    "rdfs": str(RDFS),
+}
+
+
+def _first_with_language(values: Iterable[Node], language: str) -> str | None:
+    """Return the first literal with the given language tag."""
+    return next((str(x) for x in values if isinstance(x, Literal) and x.language == language), None)
+
+
+def _datatype(value: Node) -> URIRef | None:
+    """Return the datatype of the value as SPARQL datatype() function would."""
+    if not isinstance(value, Literal):
+        return None
+    if value.datatype is not None:
+        return value.datatype
+    return RDF.langString if value.language else XSD.string
+
+
+def concept_id(concept: Node) -> str:
+    """Return the term id of a concept without dc:identifier, the last segment of its IRI."""
+    term_id = str(concept).strip("/").split("/")[-1]
+    return term_id.strip("#").split("#")[-1]
+
+
+def merge_concept_term(term: dict[str, Any], concept_term: dict[str, Any]) -> None:
+    """Add the data of a concept to the term, titles, descriptions and iri of earlier concepts are kept."""
+    for language, title in concept_term["title"].items():
+        term["title"].setdefault(language, title)
+    for language, description in concept_term["description"].items():
+        term["description"].setdefault(language, description)
+    if "iri" not in term["props"]:
+        term["props"]["iri"] = {concept_term["iri"]}
+    for prop, values in concept_term["props"].items():
+        term["props"][prop].update(values)
+    if "parent" in concept_term:
+        term["hierarchy"] = {"parent": concept_term["parent"]}
+
+
 def join_with_commas(prop: str, parent: dict[str, Any]) -> None:
     """Join the values of the property with commas."""
     parent[prop] = ", ".join(sorted(parent[prop]))
 
 
 class SPARQLReader(VocabularyReader):
-    """Download rdf locally, enrich it and call sparql to convert the RDF to Invenio YAML format."""
+    """Download rdf locally, enrich it and convert SKOS concepts to Invenio YAML format."""
 
     def __init__(  # noqa: PLR0913, PLR0917
         self,
@@ -78,9 +204,10 @@ class SPARQLReader(VocabularyReader):
         extra: Path | None = None,  # turtle serialization of extra triples
         load_subgraphs: bool = True,
         format: str = "xml",  # noqa: A002 shadows built-in format
-        extra_props: dict[str, str] | None = None,
+        extra_props: dict[str, str | ExtraProperty] | None = None,
         prefixes: dict[str, str] | None = None,
         array_resolution: Callable[[str, dict[str, Any]], None] = join_with_commas,
+        cache: RDFCache | None = None,
     ):
         """Initialize the SPARQL reader.
 
@@ -92,10 +219,11 @@ class SPARQLReader(VocabularyReader):
         :param format: Format of the SPARQL file at the endpoint.
         :param extra_props: Additional properties to include in the results.
                             Keys are the names of the properties,
-                            and values is the sparql query to get the value,
-                            will be wrapped in an OPTIONAL clause.
-        :param prefixes: Prefixes to use in the SPARQL query.
+                            and values are either the predicate (prefixed name or IRI)
+                            or ExtraProperty definitions.
+        :param prefixes: Prefixes to use in predicates and datatypes of extra properties.
         :param array_resolution: Function to resolve array properties (default is to join with commas).
+        :param cache: Cache of downloaded RDF sources, if None, sources are downloaded on every run.
         """
         super().__init__(name)
         self.endpoint = endpoint
@@ -106,206 +234,181 @@ class SPARQLReader(VocabularyReader):
         self.extra_props = extra_props or {}
         self.prefixes = prefixes or {}
         self.array_resolution = array_resolution
-
-    def data(  # noqa: PLR0915, PLR0912, C901 - too complex but temporary
-        self,
-    ) -> list[dict[str, str]]:
-        """Convert CCMM from SPARQL to YAML that can be imported to NRP Invenio."""
-        whole_graph: Graph = parse_source(self.endpoint, format=self.format)
-
-        if self.load_subgraphs:
-            self._load_subgraphs(whole_graph)
-
-        # add extra triples to the graph
-        if self.extra:
-            extra_graph = Graph()
-            with Path(self.extra).open(encoding="utf-8") as extra_file:
-                extra_graph.parse(extra_file, format="turtle")
-            whole_graph += extra_graph
-
-        query = """
-    PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-    PREFIX dc: <http://purl.org/dc/elements/1.1/>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    {{prefixes}}
-
-    SELECT ?concept ?label_cs ?label_en ?description_cs ?description_en ?identifier ?broader {{extra_props}}
-    WHERE {
-    ?concept a skos:Concept ;
-                skos:inScheme ?scheme .
-
-    # Get English label (prefLabel first, then altLabel)
-    OPTIONAL {
-        { ?concept skos:prefLabel ?prefLabel_en FILTER(lang(?prefLabel_en) = "en") }
-        UNION
-        { ?concept skos:altLabel ?altLabel_en }
-        BIND(COALESCE(?prefLabel_en, ?altLabel_en) AS ?label_en)
-    }
-
-    # Get Czech label (prefLabel first, then english label)
-    OPTIONAL {
-        { ?concept skos:prefLabel ?label_cs FILTER(lang(?label_cs) = "cs") }
-    }
-
-    # Get English description (skos:definition)
-    OPTIONAL {
-        { ?concept skos:definition ?description_en FILTER(lang(?description_en) = "en") }
-    }
-
-    # Get Czech description (skos:definition)
-    OPTIONAL {
-        { ?concept skos:definition ?description_cs FILTER(lang(?description_cs) = "cs") }
-    }
-
-    # Get dc:identifier if available
-    OPTIONAL { ?concept dc:identifier ?identifier }
-
-    # Get skos:broader if available
-    OPTIONAL { ?concept skos:broader ?broader }
-
-    # Get extra properties
-    {{extra_props_sparql}}
-
-    }
-
-    ORDER BY ?concept
-                        """
-
-        query = query.replace(
-            "{{prefixes}}",
-            "\n".join(f"PREFIX {key}: <{value}>" for key, value in self.prefixes.items()),
-        )
-        query = query.replace(
-            "{{extra_props}}",
-            " ".join(f"?{key}" for key in self.extra_props),
-        )
-        query = query.replace(
-            "{{extra_props_sparql}}",
-            "\n".join(f"OPTIONAL {{ {value} }}" for value in self.extra_props.values()),
-        )
-        rows = whole_graph.query(
-            query,
-            initBindings={
-                "scheme": URIRef(self.skos_concept),
-            },
-        )
-        converted: dict[str, Any] = {}
+        self.cache = cache
+
+    @override
+    def input_files(self) -> list[Path]:
+        """Return local files the output of this reader depends on."""
+        return [self.extra] if self.extra else []
+
+    @override
+    def refresh_sources(self) -> None:
+        """Revalidate the cached endpoint, so that the fingerprint reflects its current content."""
+        if self.cache is not None:
+            fetch_source(self.endpoint, self.cache, format=self.format)
+
+    @override
+    def parameters(self) -> dict[str, Any]:
+        """Return reader parameters that influence the output of this reader."""
+        # without a cache, remote data are identified only by the endpoint url.
+        # With a cache, the cached validators and content digest of the endpoint are used,
+        # they are revalidated by refresh_sources before a conversion, never here.
+        # Subgraphs are not revalidated, use --force to download them again.
+        return {
+            "endpoint": self.endpoint,
+            "endpoint_content": self.cache.cached_state(self.endpoint) if self.cache else None,
+            "skos_concept": self.skos_concept,
+            "load_subgraphs": self.load_subgraphs,
+            "format": self.format,
+            "extra_props": self.extra_props,
+            "prefixes": self.prefixes,
+            "array_resolution": self.array_resolution,
+        }
+
+    def data(self) -> list[dict[str, str]]:
+        """Convert CCMM from RDF to YAML that can be imported to NRP Invenio."""
+        whole_graph = self._load_graph()
+        extra_props = {name: self._resolve_extra_property(prop) for name, prop in self.extra_props.items()}
+
+        converted: dict[str, dict[str, Any]] = {}
         by_iri: dict[str, str] = {}
-        for _row in cast("tuple[Any, ...]", rows):
-            row = [str(x) if x is not None else None for x in _row]
-            (
-                iri,
-                title_cs,
-                title_en,
-                description_cs,
-                description_en,
-                term_id,
-                broader,
-                *row_props,
-            ) = row
-            # Skip empty rows
-            if not iri:
-                continue
-            # Skip rows without titles
-            if title_cs is None and title_en is None:
+        for concept in self._concepts(whole_graph):
+            concept_term = self._concept_term(whole_graph, concept, extra_props)
+            # Skip concepts without titles
+            if concept_term is None:
                 continue
+            # a concept with several dc:identifiers generates a term for each of them
+            for term_id in [str(x) for x in whole_graph.objects(concept, DC.identifier)] or [concept_id(concept)]:
+                if term_id not in converted:
+                    converted[term_id] = {"id": term_id, "props": defaultdict(set[str]), "title": {}, "description": {}}
+                merge_concept_term(converted[term_id], concept_term)
+                by_iri[str(concept)] = term_id
 
-            # set term_id if it was not provided
-            if not term_id:
-                term_id = iri.strip("/").split("/")[-1]
-                term_id = term_id.strip("#").split("#")[-1]
-
-            if term_id not in converted:
-                term: dict[str, Any] = {"id": term_id}
-                term["props"] = defaultdict(set[str])
-                term["title"] = {}
-                term["description"] = {}
-                converted[term_id] = term
-            else:
-                term = converted[term_id]
-
-            if "cs" not in term["title"]:
-                term["title"]["cs"] = title_cs or title_en
-            if "en" not in term["title"]:
-                term["title"]["en"] = title_en or title_cs
-            if "iri" not in term["props"]:
-                term["props"]["iri"] = {iri}
-            if "cs" not in term["description"] and description_cs:
-                term["description"]["cs"] = description_cs
-            if "en" not in term["description"] and description_en:
-                term["description"]["en"] = description_en
-
-            for prop, value in zip(self.extra_props.keys(), row_props, strict=False):
-                if value is not None:
-                    term["props"][prop].add(str(value))
-
-            if broader:
-                term["hierarchy"] = {"parent": broader}
-
-            by_iri[iri] = term_id
-
-        # Resolve the hierarchy
         for term in converted.values():
+            # Resolve the hierarchy
             if "hierarchy" in term:
-                parent = term["hierarchy"]["parent"]
-                term["hierarchy"]["parent"] = by_iri[parent]
-
-        # Convert sets to comma-separated strings
-        for term in converted.values():
+                term["hierarchy"]["parent"] = by_iri[term["hierarchy"]["parent"]]
+            # Convert sets to comma-separated strings
             term["props"] = dict(term["props"])
             for prop in list(term["props"]):
                 self.array_resolution(prop, term["props"])
-
-        # Remove empty description, the suggester tries to resolve something if description exist in the item
-        # and then it crashes if there is nothing in the object, so we need to remove the empty description
-        for term in converted.values():
+            # Remove empty description, the suggester tries to resolve something if description exist in the item
+            # and then it crashes if there is nothing in the object, so we need to remove the empty description
             if not term["description"]:
                 del term["description"]
 
-        to_sort = [dict(term) for term in converted.values()]
+        return sort_by_hierarchy(dict(term) for term in converted.values())
 
-        ret_ids: set[str] = set()
-        ret: list[dict[str, Any]] = []
+    def _load_graph(self) -> Graph:
+        """Load the endpoint, its subgraphs and the extra triples into a single graph."""
+        whole_graph: Graph = parse_source(self.endpoint, format=self.format, cache=self.cache)
 
-        remaining: list[dict[str, Any]] = []
-        for term in to_sort:
-            # if there is no parent, add the term
-            if "hierarchy" not in term:
-                ret.append(term)
-                ret_ids.add(term["id"])
-                continue
-            remaining.append(term)
+        if self.load_subgraphs:
+            self._load_subgraphs(whole_graph)
 
-        while remaining:
-            to_sort = remaining
-            remaining = []
+        # add extra triples to the graph
+        if self.extra:
+            with Path(self.extra).open(encoding="utf-8") as extra_file:
+                whole_graph.parse(extra_file, format="turtle")
+        return whole_graph
+
+    def _concept_term(
+        self, whole_graph: Graph, concept: Node, extra_props: dict[str, tuple[URIRef, URIRef | None]]
+    ) -> dict[str, Any] | None:
+        """Return titles, descriptions, props and parent of the concept, None if the concept has no title."""
+        # English label (prefLabel first, then any altLabel), Czech label
+        title_en = _first_with_language(whole_graph.objects(concept, SKOS.prefLabel), "en")
+        if title_en is None:
+            title_en = next((str(x) for x in whole_graph.objects(concept, SKOS.altLabel)), None)
+        title_cs = _first_with_language(whole_graph.objects(concept, SKOS.prefLabel), "cs")
+        if title_cs is None and title_en is None:
+            return None
+
+        concept_term: dict[str, Any] = {
+            "iri": str(concept),
+            "title": {"cs": title_cs or title_en, "en": title_en or title_cs},
+            "description": {},
+            "props": {},
+        }
+        for language in ("cs", "en"):
+            description = _first_with_language(whole_graph.objects(concept, SKOS.definition), language)
+            if description:
+                concept_term["description"][language] = description
+        for broader_concept in whole_graph.objects(concept, SKOS.broader):
+            concept_term["parent"] = str(broader_concept)
+        for prop, (predicate, datatype) in extra_props.items():
+            values = {
+                str(value)
+                for value in whole_graph.objects(concept, predicate)
+                if datatype is None or _datatype(value) == datatype
+            }
+            if values:
+                concept_term["props"][prop] = values
+        return concept_term
+
+    def _concepts(self, whole_graph: Graph) -> list[Node]:
+        """Return concepts of the scheme, sorted by their IRI."""
+        scheme = URIRef(self.skos_concept)
+        return sorted(
+            (
+                concept
+                for concept in set(whole_graph.subjects(SKOS.inScheme, scheme))
+                if (concept, RDF.type, SKOS.Concept) in whole_graph
+            ),
+            key=str,
+        )
 
-            for term in to_sort:
-                parent = term["hierarchy"]["parent"]
-                if parent in ret_ids:
-                    ret.append(term)
-                    ret_ids.add(term["id"])
-                else:
-                    remaining.append(term)
-            if len(to_sort) == len(remaining):
-                raise ValueError(f"There is a cycle in the hierarchy, please check the data: {remaining}")
+    def _resolve_extra_property(self, prop: str | ExtraProperty) -> tuple[URIRef, URIRef | None]:
+        """Convert an extra property definition to predicate and datatype IRIs."""
+        if isinstance(prop, str):
+            prop = ExtraProperty(prop)
+        return (
+            self._expand_curie(prop.predicate),
+            self._expand_curie(prop.datatype) if prop.datatype else None,
+        )
 
-        return ret
+    def _expand_curie(self, curie: str) -> URIRef:
+        """Expand prefix:name to a full IRI using the reader's prefixes."""
+        prefix, sep, name = curie.partition(":")
+        namespaces = {**DEFAULT_PREFIXES, **self.prefixes}
+        if sep and prefix in namespaces:
+            return URIRef(namespaces[prefix] + name)
+        return URIRef(curie)
 
     def _load_subgraphs(self, whole_graph: Graph) -> None:
-        """Load all subgraphs from the SKOS concept scheme and merge them into the whole graph."""
+        """Load all subgraphs from the SKOS concept scheme and merge them into the whole graph.
+
+        Downloads are network bound, so they run in a thread pool. Parsing is done
+        in the calling thread directly into the whole graph, so that no intermediate
+        graphs are created and the graph is never modified concurrently.
+        """
         # Get all concepts
         scheme = URIRef(self.skos_concept)
         subjects = [str(x) for x in whole_graph.subjects(SKOS.inScheme, scheme)]
 
-        # enrich graph with all the subjects
-        for subject_graph in process_map(
-            partial(parse_source, format=self.format),
-            subjects,
-            max_workers=20,
-            chunksize=10,
+        if self.cache is not None:
+            cache = self.cache
+            for digest in tqdm(
+                map_concurrently(
+                    lambda url: fetch_source(url, cache, format=self.format),
+                    subjects,
+                    max_workers=SUBGRAPH_DOWNLOAD_WORKERS,
+                ),
+                total=len(subjects),
+                leave=False,
+                unit="subgraph",
+            ):
+                whole_graph.parse(cache.content_path(digest), format="nt")
+            return
+
+        for content, final_url in tqdm(
+            map_concurrently(
+                lambda url: download_source(url, format=self.format),
+                subjects,
+                max_workers=SUBGRAPH_DOWNLOAD_WORKERS,
+            ),
+            total=len(subjects),
             leave=False,
             unit="subgraph",
         ):
-            whole_graph += cast("Graph", subject_graph)
+            whole_graph.parse(data=content, format=self.format, publicID=final_url)
@@ -11,13 +11,13 @@
 from __future__ import annotations
 
 import logging
+import sys
 import traceback
 from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import click
-import yaml
 from tqdm import tqdm  # type: ignore[reportMissingImports]
 
 from ccmm_invenio.conversion.ccmm_copy import CopyReader
@@ -28,9 +28,14 @@ from ccmm_invenio.conversion.ccmm_filtered import (
     ISO6391LanguageFilter,
 )
 from ccmm_invenio.conversion.ccmm_rdm_subjects import RDMSubjectsCSVReader
-from ccmm_invenio.conversion.ccmm_sparql import SPARQLReader
+from ccmm_invenio.conversion.ccmm_sparql import ExtraProperty, SPARQLReader
+from ccmm_invenio.conversion.manifest import BuildManifest
+from ccmm_invenio.conversion.rdf_cache import RDFCache
+from ccmm_invenio.conversion.yaml_io import dump_yaml_list
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from ccmm_invenio.conversion.base import VocabularyReader
 
 log = logging.getLogger(__name__)
@@ -38,11 +43,54 @@ log = logging.getLogger(__name__)
 
 @click.command()
 @click.argument("vocabulary_names", nargs=-1)
-def convert_vocabularies(vocabulary_names: list[str]) -> None:
-    """Convert vocabularies from various sources to YAML fixtures."""
+@click.option("--force", is_flag=True, help="Regenerate vocabularies even if they are up to date.")
+@click.option(
+    "--check",
+    is_flag=True,
+    help="Only report vocabularies that are out of date (against the RDF cache), do not regenerate them.",
+)
+@click.option(
+    "--manifest",
+    "manifest_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Path to the build manifest (default: input/vocabularies.manifest.json).",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path.home() / ".cache" / "ccmm-invenio" / "rdf",
+    show_default=True,
+    help="Directory where downloaded RDF sources are cached.",
+)
+@click.option("--offline", is_flag=True, help="Do not download anything, use only data from the RDF cache.")
+def convert_vocabularies(  # noqa: PLR0913, PLR0917 - long list of converters and options
+    vocabulary_names: list[str],
+    force: bool,
+    check: bool,
+    manifest_path: Path | None,
+    cache_dir: Path,
+    offline: bool,
+) -> None:
+    """Convert vocabularies from various sources to YAML fixtures.
+
+    Vocabularies whose inputs and outputs have not changed since the last
+    conversion (according to the build manifest) are skipped.
+    """
     root_dir = Path(__file__).parent.parent
+    manifest = BuildManifest(manifest_path or root_dir / "input/vocabularies.manifest.json")
+    converters = vocabulary_converters(root_dir, RDFCache(cache_dir, offline=offline))
 
-    converters: list[tuple[VocabularyReader, Path]] = [
+    stale = convert(converters, vocabulary_names, manifest, force=force, check=check)
+    if stale:
+        for name in stale:
+            click.secho(f"Vocabulary {name} is out of date", fg="red")
+        sys.exit(1)
+
+
+def vocabulary_converters(root_dir: Path, rdf_cache: RDFCache) -> list[tuple[VocabularyReader, Path]]:
+    """Return the readers of all vocabularies together with the paths of their YAML fixtures."""
+    return [
         (
             # TODO: the CSV does not include dataCiteCode, we needd to add it there !!!
             CSVReader(
@@ -107,25 +155,16 @@ def convert_vocabularies(vocabulary_names: list[str]) -> None:
                 "http://publications.europa.eu/resource/authority/language",
                 "http://publications.europa.eu/resource/authority/language",
                 extra_props={
-                    "ISO_639_2T": """
-                        ?concept skos:notation ?ISO_639_2T FILTER(datatype(?ISO_639_2T) = euvoc:ISO_639_2T)
-                    """,
-                    "ISO_639_1": """
-                        ?concept skos:notation ?ISO_639_1 FILTER(datatype(?ISO_639_1) = euvoc:ISO_639_1)
-                    """,
-                    "ISO_639_3": """
-                        ?concept skos:notation ?ISO_639_3 FILTER(datatype(?ISO_639_3) = euvoc:ISO_639_3)
-                    """,
-                    "XML_LNG": """
-                        ?concept skos:notation ?XML_LNG FILTER(datatype(?XML_LNG) = euvoc:XML_LNG)
-                    """,
-                    "ISO_639_2B": """
-                        ?concept skos:notation ?ISO_639_2B FILTER(datatype(?ISO_639_2B) = euvoc:ISO_639_2B)
-                    """,
+                    "ISO_639_2T": ExtraProperty("skos:notation", datatype="euvoc:ISO_639_2T"),
+                    "ISO_639_1": ExtraProperty("skos:notation", datatype="euvoc:ISO_639_1"),
+                    "ISO_639_3": ExtraProperty("skos:notation", datatype="euvoc:ISO_639_3"),
+                    "XML_LNG": ExtraProperty("skos:notation", datatype="euvoc:XML_LNG"),
+                    "ISO_639_2B": ExtraProperty("skos:notation", datatype="euvoc:ISO_639_2B"),
                 },
                 prefixes={
                     "euvoc": "http://publications.europa.eu/ontology/euvoc#",
                 },
+                cache=rdf_cache,
             ),
             root_dir / "fixtures/ccmm_languages_all.yaml",
         ),
@@ -146,13 +185,12 @@ def convert_vocabularies(vocabulary_names: list[str]) -> None:
                 load_subgraphs=False,
                 extra=root_dir / "input/addon_access_rights.ttl",
                 extra_props={
-                    "openaire": """
-                        ?concept props:openaire ?openaire
-                    """,
+                    "openaire": "props:openaire",
                 },
                 prefixes={
                     "props": "http://vocabs.ccmm.cz/props/",
                 },
+                cache=rdf_cache,
             ),
             root_dir / "fixtures/ccmm_access_rights.yaml",
         ),
@@ -165,20 +203,15 @@ def convert_vocabularies(vocabulary_names: list[str]) -> None:
                 load_subgraphs=False,
                 extra=root_dir / "input/addon_resource_types.ttl",
                 extra_props={
-                    "zenodo": """
-                        ?concept props:zenodo ?zenodo
-                    """,
-                    "lindat": """
-                        ?concept props:lindat ?lindat
-                    """,
-                    "openaire": """
-                        ?concept props:openaire ?openaire
-                    """,
+                    "zenodo": "props:zenodo",
+                    "lindat": "props:lindat",
+                    "openaire": "props:openaire",
                 },
                 prefixes={
                     "props": "http://vocabs.ccmm.cz/props/",
                 },
                 array_resolution=zenodo_resource_type_array_resolution,
+                cache=rdf_cache,
             ),
             root_dir / "fixtures/ccmm_resource_types.yaml",
         ),
@@ -187,6 +220,7 @@ def convert_vocabularies(vocabulary_names: list[str]) -> None:
                 "File types",
                 "http://publications.europa.eu/resource/authority/file-type",
                 "http://publications.europa.eu/resource/authority/file-type",
+                cache=rdf_cache,
             ),
             root_dir / "fixtures/ccmm_file_types.yaml",
         ),
@@ -217,9 +251,25 @@ def convert_vocabularies(vocabulary_names: list[str]) -> None:
         ),
     ]
 
-    if not vocabulary_names:
-        vocabulary_names = [reader.name for reader, _ in converters]
 
+def convert(
+    converters: list[tuple[VocabularyReader, Path]],
+    vocabulary_names: Iterable[str],
+    manifest: BuildManifest,
+    *,
+    force: bool = False,
+    check: bool = False,
+) -> list[str]:
+    """Convert the named vocabularies (all if no names are given) that are out of date.
+
+    :param force: convert the vocabularies even if they are up to date
+    :param check: do not convert anything, only return the names of the vocabularies that are out of date
+    :return: names of the out of date vocabularies in check mode, an empty list otherwise
+    """
+    vocabulary_names = set(vocabulary_names) or {reader.name for reader, _ in converters}
+
+    stale: list[str] = []
+    stale_outputs: set[Path] = set()
     with_progress = tqdm(converters, leave=False, unit="vocab")
     for reader, output_path in with_progress:
         if reader.name not in vocabulary_names:
@@ -227,18 +277,29 @@ def convert_vocabularies(vocabulary_names: list[str]) -> None:
         try:
             with_progress.set_description(reader.name)
             with_progress.refresh()
-            data = reader.data()
-            with Path(output_path).open("w", encoding="utf-8") as output_file:
-                yaml.safe_dump(
-                    data,
-                    output_file,
-                    allow_unicode=True,
-                    default_flow_style=False,
-                )
+            # check mode uses only the cached state of remote sources, it does not access the network
+            if not check:
+                reader.refresh_sources()
+            fingerprint = reader.fingerprint()
+            # in check mode, outputs of stale vocabularies are not regenerated, so readers
+            # that take them as input are stale as well
+            depends_on_stale = any(path in stale_outputs for path in reader.input_files())
+            if not force and not depends_on_stale and manifest.is_up_to_date(reader.name, fingerprint, output_path):
+                log.info("Vocabulary %s is up to date, skipping", reader.name)
+                continue
+            if check:
+                stale.append(reader.name)
+                stale_outputs.add(output_path)
+                continue
+            dump_yaml_list(reader.data(), Path(output_path))
+            manifest.record(reader.name, fingerprint, output_path)
+            manifest.save()
         except Exception:
             log.exception("Error converting %s", reader.name)
             traceback.print_exc()
 
+    return stale
+
 
 def zenodo_resource_type_array_resolution(prop: str, parent: dict[str, str]) -> None:
     """Set zenodo properties from comma-separated values."""
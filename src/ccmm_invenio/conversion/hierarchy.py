@@ -0,0 +1,98 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Ordering of hierarchical vocabulary terms.
+
+Invenio imports vocabulary terms one by one, so a parent term must always
+precede its children in the fixture file.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+class HierarchyCycleError(ValueError):
+    """Raised when the parent links of vocabulary terms form a cycle."""
+
+    def __init__(self, cycle: list[str]):
+        """Initialize the error with ids of the terms forming the cycle."""
+        super().__init__(f"There is a cycle in the hierarchy, please check the data: {' -> '.join(cycle)}")
+        self.cycle = cycle
+
+
+def get_parent(term: dict[str, Any]) -> str | None:
+    """Return id of the parent of the term or None if the term is a root."""
+    return term.get("hierarchy", {}).get("parent") or None
+
+
+def children_index(terms: Iterable[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """Return mapping of parent id to its child terms (in input order)."""
+    index: dict[str, list[dict[str, Any]]] = {}
+    for term in terms:
+        parent = get_parent(term)
+        if parent is not None:
+            index.setdefault(parent, []).append(term)
+    return index
+
+
+def sort_by_hierarchy(terms: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return the terms ordered so that every parent precedes its children.
+
+    This is Kahn's topological sort specialized for trees (every term has at most
+    one parent), running in O(n). Terms keep their input order, except that a term
+    that appears before its parent is moved right behind the parent. Input that is
+    already ordered is returned unchanged.
+
+    Terms whose parent is not among the terms are considered roots.
+
+    :raises HierarchyCycleError: if parent links form a cycle, with the ids of the terms on the cycle.
+    """
+    terms = list(terms)
+    ids = {term["id"] for term in terms}
+
+    ret: list[dict[str, Any]] = []
+    placed: set[str] = set()
+    # children waiting for their parent to be placed, parent id -> children in input order
+    waiting: dict[str, list[dict[str, Any]]] = {}
+
+    for term in terms:
+        parent = get_parent(term)
+        if parent is not None and parent in ids and parent not in placed:
+            waiting.setdefault(parent, []).append(term)
+            continue
+        # place the term and, transitively, all children that were waiting for it
+        stack = [term]
+        while stack:
+            placed_term = stack.pop()
+            ret.append(placed_term)
+            placed.add(placed_term["id"])
+            stack.extend(reversed(waiting.pop(placed_term["id"], [])))
+
+    if waiting:
+        raise HierarchyCycleError(_find_cycle(terms, waiting))
+    return ret
+
+
+def _find_cycle(terms: list[dict[str, Any]], waiting: dict[str, list[dict[str, Any]]]) -> list[str]:
+    """Return ids of terms on a cycle, given terms that could not be placed."""
+    parents = {term["id"]: get_parent(term) for term in terms}
+    # start at any unplaced term and follow parent links, as every unplaced term is either
+    # on a cycle or a descendant of a term on a cycle, we reach the cycle eventually
+    current = next(iter(waiting.values()))[0]["id"]
+    visited: list[str] = []
+    visited_set: set[str] = set()
+    while current not in visited_set:
+        visited.append(current)
+        visited_set.add(current)
+        current = parents[current]
+    cycle = visited[visited.index(current) :]
+    return [*cycle, current]
@@ -0,0 +1,94 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Build manifest for incremental vocabulary conversion.
+
+The manifest is a JSON file that stores, for each converted vocabulary,
+the hash of the reader's inputs (input files and reader parameters)
+and the hash of the generated output file. A vocabulary is up to date
+when both hashes match the current state on disk.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+MANIFEST_VERSION = 1
+
+
+def file_digest(path: Path) -> str | None:
+    """Return the sha256 hex digest of the file content or None if the file does not exist."""
+    if not path.exists():
+        return None
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def describe_parameter(value: Any) -> Any:
+    """Convert a reader parameter to a stable JSON-serializable representation."""
+    # partials and dataclass instances are described by their content
+    if isinstance(value, partial):
+        value = {"callable": value.func, "args": value.args, "kwargs": value.keywords}
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        value = dataclasses.asdict(value)
+
+    if isinstance(value, dict):
+        return {str(k): describe_parameter(v) for k, v in sorted(value.items())}
+    if isinstance(value, (set, frozenset)):
+        return sorted(describe_parameter(x) for x in value)
+    if isinstance(value, (list, tuple)):
+        return [describe_parameter(x) for x in value]
+    if isinstance(value, Path):
+        return value.name
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+    return value
+
+
+class BuildManifest:
+    """Content hashes of vocabulary inputs and outputs from the previous conversion."""
+
+    def __init__(self, path: Path):
+        """Load the manifest from the given path (an empty manifest is used if it does not exist)."""
+        self.path = path
+        self.entries: dict[str, dict[str, str | None]] = {}
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                content = json.load(f)
+            if content.get("version") == MANIFEST_VERSION:
+                self.entries = content.get("vocabularies", {})
+
+    def is_up_to_date(self, name: str, input_hash: str, output_path: Path) -> bool:
+        """Return True if the output was generated from the same inputs and was not modified since."""
+        entry = self.entries.get(name)
+        if entry is None or entry.get("input") != input_hash:
+            return False
+        output_hash = file_digest(output_path)
+        return output_hash is not None and entry.get("output") == output_hash
+
+    def record(self, name: str, input_hash: str, output_path: Path) -> None:
+        """Record hashes of a freshly generated vocabulary."""
+        self.entries[name] = {
+            "input": input_hash,
+            "output": file_digest(output_path),
+        }
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        with self.path.open("w", encoding="utf-8") as f:
+            json.dump(
+                {"version": MANIFEST_VERSION, "vocabularies": dict(sorted(self.entries.items()))},
+                f,
+                indent=2,
+            )
+            f.write("\n")
@@ -0,0 +1,200 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""On-disk cache of downloaded RDF sources.
+
+The cache directory has the following layout:
+
+    urls/<sha256 of url>.json       metadata of the download (etag, last-modified, content digest)
+    objects/<xx>/<digest>.nt        content of the download normalized to N-Triples
+
+Objects are addressed by the digest of the downloaded body (with its format and the
+url relative IRIs are resolved against), so the same document returned for different
+urls is stored only once. The digest is stable between runs, unlike a digest of the
+serialized graph, whose triple order and blank node labels change on every parse.
+It is used as the fingerprint of the source by the build manifest of convert_vocabularies.
+N-Triples are much faster to parse than RDF/XML or turtle, so rerunning the conversion
+is fast even if nothing is downloaded.
+
+When the cache is online, a cached url is revalidated once per run with
+a conditional request (If-None-Match/If-Modified-Since). In offline mode,
+only cached data are used and a missing url is an error.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from rdflib import Graph
+
+if TYPE_CHECKING:
+    from email.message import Message
+
+# Accept headers for the rdflib format names used by the readers
+ACCEPT_HEADERS = {
+    "xml": "application/rdf+xml, */*;q=0.1",
+    "turtle": "text/turtle, application/n-triples;q=0.9, */*;q=0.1",
+    "nt": "application/n-triples, text/plain;q=0.9, */*;q=0.1",
+}
+
+HTTP_NOT_MODIFIED = 304
+
+DOWNLOAD_TIMEOUT = 60
+
+DOWNLOAD_SCHEMES = ("http", "https")
+
+
+class RDFCacheMissError(LookupError):
+    """Raised in offline mode when the requested url is not cached."""
+
+
+def download(
+    url: str,
+    format: str = "xml",  # noqa: A002 shadows built-in format
+    headers: dict[str, str] | None = None,
+) -> tuple[bytes, str, Message]:
+    """Download the RDF source, return its raw content, final url (after redirects) and response headers.
+
+    :raises ValueError: if the url is not an http(s) url
+    """
+    if urlsplit(url).scheme not in DOWNLOAD_SCHEMES:
+        raise ValueError(f"Only http(s) RDF sources can be downloaded, got {url}")
+    headers = {"Accept": ACCEPT_HEADERS.get(format, "*/*"), **(headers or {})}
+    request = Request(url, headers=headers)  # noqa: S310 - scheme checked above
+    with urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response:  # noqa: S310 - scheme checked above
+        return response.read(), response.geturl(), response.headers
+
+
+def content_digest(body: bytes, format: str, base_url: str) -> str:  # noqa: A002 shadows built-in format
+    """Return the digest of a downloaded RDF document, the same document always has the same digest."""
+    digest = hashlib.sha256()
+    for part in (format.encode("utf-8"), base_url.encode("utf-8"), body):
+        # length prefix, so that the parts can not run into each other
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class RDFCache:
+    """Content-addressed cache of RDF downloads."""
+
+    def __init__(self, cache_dir: Path, offline: bool = False):
+        """Initialize the cache.
+
+        :param cache_dir: Directory where the cached data are stored.
+        :param offline:   If True, never access the network and use only cached data.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.offline = offline
+        # urls that have been downloaded or revalidated during this run
+        self._fresh: set[str] = set()
+
+    def graph(self, url: str, format: str = "xml") -> Graph:  # noqa: A002 shadows built-in format
+        """Return the graph downloaded from the url, using the cached copy if it is still valid."""
+        graph = Graph()
+        graph.parse(self.content_path(self.fetch(url, format=format)), format="nt")
+        return graph
+
+    def content_path(self, digest: str) -> Path:
+        """Return path to the N-Triples file with the cached content of the given digest."""
+        return self._object_path(digest)
+
+    def fetch(self, url: str, format: str = "xml") -> str:  # noqa: A002 shadows built-in format
+        """Make sure that the url is cached and up to date and return the digest of its content."""
+        entry = self._load_entry(url)
+        if entry is not None and (self.offline or url in self._fresh):
+            return str(entry["content"])
+        if self.offline:
+            raise RDFCacheMissError(f"{url} is not cached in {self.cache_dir} and offline mode is enabled")
+
+        headers: dict[str, str] = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            body, final_url, response_headers = download(url, format=format, headers=headers)
+        except HTTPError as e:
+            if e.code == HTTP_NOT_MODIFIED and entry is not None:
+                self._fresh.add(url)
+                return str(entry["content"])
+            raise
+
+        digest = content_digest(body, format, final_url)
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            graph = Graph()
+            graph.parse(data=body, format=format, publicID=final_url)
+            self._atomic_write(object_path, graph.serialize(format="nt", encoding="utf-8"))
+        self._atomic_write(
+            self._entry_path(url),
+            json.dumps(
+                {
+                    "url": url,
+                    "format": format,
+                    "etag": response_headers.get("ETag"),
+                    "last_modified": response_headers.get("Last-Modified"),
+                    "content": digest,
+                },
+                indent=2,
+            ).encode("utf-8"),
+        )
+        self._fresh.add(url)
+        return digest
+
+    def cached_state(self, url: str) -> dict[str, str | None] | None:
+        """Return the validators (etag, last-modified) and digest of the cached url without accessing the network.
+
+        None is returned if the url is not cached.
+        """
+        entry = self._load_entry(url)
+        if entry is None:
+            return None
+        return {
+            "etag": entry.get("etag"),
+            "last_modified": entry.get("last_modified"),
+            "content": str(entry["content"]),
+        }
+
+    def _load_entry(self, url: str) -> dict[str, Any] | None:
+        entry_path = self._entry_path(url)
+        if not entry_path.exists():
+            return None
+        with entry_path.open(encoding="utf-8") as f:
+            entry: dict[str, Any] = json.load(f)
+        if not self._object_path(entry["content"]).exists():
+            return None
+        return entry
+
+    def _entry_path(self, url: str) -> Path:
+        return self.cache_dir / "urls" / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.cache_dir / "objects" / digest[:2] / f"{digest}.nt"
+
+    def _atomic_write(self, path: Path, content: bytes) -> None:
+        """Write the file so that concurrent readers never see a partially written file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            Path(tmp_name).replace(path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,119 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Reading and writing of YAML vocabulary fixtures.
+
+Uses the libyaml based loader and dumper if pyyaml has been compiled with libyaml,
+they are several times faster than the pure python ones. The loaded data are the same,
+but the dumped text may differ: libyaml wraps long double-quoted scalars at different
+places, so regenerated fixtures can differ in formatting only.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import yaml
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.events import SequenceEndEvent, SequenceStartEvent
+from yaml.resolver import Resolver
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+SafeLoader: type[yaml.SafeLoader] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SafeDumper: type[yaml.SafeDumper] = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+try:
+    from yaml._yaml import CParser as _Parser  # type: ignore[import-not-found]
+except ImportError:
+    from yaml.parser import Parser as _Parser
+    from yaml.reader import Reader
+    from yaml.scanner import Scanner
+
+    class _ListItemParser(Reader, Scanner, _Parser):
+        """Pure python parser, used when pyyaml is compiled without libyaml."""
+
+        def __init__(self, stream: Any):
+            """Initialize the parser."""
+            Reader.__init__(self, stream)
+            Scanner.__init__(self)
+            _Parser.__init__(self)
+
+else:
+    _ListItemParser = _Parser
+
+
+class _ListItemLoader(_ListItemParser, Composer, SafeConstructor, Resolver):
+    """Safe loader that can compose the items of a top-level list one by one.
+
+    The libyaml loader composes only whole documents, so the events from the (C) parser
+    are composed to nodes by the python composer.
+    """
+
+    def __init__(self, stream: Any):
+        """Initialize the loader."""
+        _ListItemParser.__init__(self, stream)
+        Composer.__init__(self)
+        SafeConstructor.__init__(self)
+        Resolver.__init__(self)
+
+
+def load_yaml(path: Path) -> Any:
+    """Load a single YAML document from the file."""
+    with path.open(encoding="utf-8") as f:
+        return yaml.load(f, Loader=SafeLoader)  # noqa: S506 - safe loader
+
+
+def load_yaml_all(path: Path) -> list[Any]:
+    """Load all YAML documents from the file."""
+    with path.open(encoding="utf-8") as f:
+        return list(yaml.load_all(f, Loader=SafeLoader))
+
+
+def iter_yaml_list(path: Path) -> Iterator[Any]:
+    """Iterate over items of a YAML file containing a single list, without loading the whole list.
+
+    :raises ValueError: if the document in the file is not a list.
+    """
+    with path.open(encoding="utf-8") as f:
+        loader = _ListItemLoader(f)
+        try:
+            loader.get_event()  # stream start
+            loader.get_event()  # document start
+            if not loader.check_event(SequenceStartEvent):
+                raise ValueError(f"Expected a list in {path}")
+            loader.get_event()
+            while not loader.check_event(SequenceEndEvent):
+                yield loader.construct_document(loader.compose_node(None, None))  # type: ignore[arg-type]
+        finally:
+            loader.dispose()
+
+
+def dump_yaml_list(items: Iterable[Any], path: Path) -> None:
+    """Write items to the file as a YAML list.
+
+    Items are serialized one at a time, so the whole serialized document is never
+    held in memory and items can be produced lazily. The output is the same as
+    yaml.safe_dump(list(items)).
+    """
+    empty = True
+    with path.open("w", encoding="utf-8") as f:
+        for item in items:
+            yaml.dump(
+                [item],
+                f,
+                Dumper=SafeDumper,
+                allow_unicode=True,
+                default_flow_style=False,
+            )
+            empty = False
+        if empty:
+            f.write("[]\n")
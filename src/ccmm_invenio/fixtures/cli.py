@@ -0,0 +1,76 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Command line interface for loading CCMM fixtures and importing CCMM datasets."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import click
+from flask.cli import with_appcontext
+
+from .loader import DEFAULT_BATCH_SIZE, BulkVocabularyLoader
+
+
+@click.group()
+def ccmm() -> None:
+    """CCMM commands."""
+
+
+@ccmm.command("load-vocabularies")
+@click.argument("vocabulary_types", nargs=-1)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_BATCH_SIZE,
+    show_default=True,
+    help="Number of terms written in a single database transaction.",
+)
+@click.option("--force", is_flag=True, help="Load vocabularies even if their content has not changed.")
+@with_appcontext
+def load_vocabularies(vocabulary_types: tuple[str, ...], batch_size: int, force: bool) -> None:
+    """Bulk load CCMM vocabularies (all of them if no vocabulary types are given)."""
+    loader = BulkVocabularyLoader(batch_size=batch_size)
+    for result in loader.load(vocabulary_types or None, force=force):
+        if result.skipped:
+            click.secho(f"{result.type}: unchanged, skipped", fg="yellow")
+        else:
+            click.secho(f"{result.type}: {result.created} created, {result.updated} updated", fg="green")
+
+
+@ccmm.command("import-datasets")
+@click.argument("service_id")
+@click.argument("files", nargs=-1, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--publish", is_flag=True, help="Publish the created drafts.")
+@with_appcontext
+def import_datasets(service_id: str, files: tuple[Path, ...], publish: bool) -> None:
+    """Import CCMM XML files into the records service SERVICE_ID.
+
+    Each file contains either a single dataset element or an element with multiple datasets,
+    such as the CCMM XML export of a search. Vocabularies are resolved once for each file.
+    """
+    from invenio_records_resources.proxies import current_service_registry
+
+    from ccmm_invenio.models import CCMMProductionDeserializer, import_batch, invenio_vocabulary_loader
+    from ccmm_invenio.parsers.production_1_1_0 import CCMMXMLProductionParser
+
+    service = current_service_registry.get(service_id)
+    deserializer = CCMMProductionDeserializer(
+        parser=CCMMXMLProductionParser, vocabulary_loader=invenio_vocabulary_loader
+    )
+    failed = 0
+    for file in files:
+        for item in import_batch(service, deserializer, file.read_bytes(), publish=publish):
+            if item.error is not None:
+                failed += 1
+                click.secho(f"{file}, dataset {item.index}: {item.error}", fg="red")
+            else:
+                click.secho(f"{file}, dataset {item.index}: imported as {item.id}", fg="green")
+    if failed:
+        raise click.ClickException(f"{failed} datasets could not be imported")
@@ -0,0 +1,257 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Bulk loader of CCMM vocabulary fixtures.
+
+The standard invenio_rdm_records fixtures create and index vocabulary terms one
+by one. This loader reads the data files listed in vocabularies.yaml item by item,
+writes the terms in batches (one database transaction per batch) and indexes each
+vocabulary with a single bulk reindex after all its terms have been written.
+
+Content hashes of the loaded data files are kept in a state file, a vocabulary
+whose data files did not change since the last load (and whose terms are still
+in the database) is skipped.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import itertools
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, override
+
+from flask import current_app
+from invenio_access.permissions import system_identity
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_records_resources.proxies import current_service_registry
+from invenio_records_resources.services.uow import RecordCommitOp, UnitOfWork
+from invenio_vocabularies.proxies import current_service as vocabulary_service
+from invenio_vocabularies.records.models import VocabularyScheme, VocabularyType
+
+from ccmm_invenio.conversion.yaml_io import iter_yaml_list, load_yaml
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from flask_principal import Identity
+    from invenio_records_resources.services import RecordService
+    from invenio_records_resources.services.uow import Operation
+
+log = logging.getLogger(__name__)
+
+FIXTURES_DIR = Path(__file__).parent
+DEFAULT_BATCH_SIZE = 500
+STATE_VERSION = 1
+
+SPECIFIC_VOCABULARY_SERVICES = {
+    "subjects": "subjects",
+}
+"""Vocabulary types that are not stored in the generic vocabularies, mapped to their service names."""
+
+
+@dataclasses.dataclass
+class VocabularyFixture:
+    """A vocabulary from the vocabularies.yaml fixtures file."""
+
+    type: str
+    pid_type: str
+    data_files: list[Path]
+    schemes: list[dict[str, str]] = dataclasses.field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, vocabulary_type: str, config: dict[str, Any], fixtures_dir: Path) -> VocabularyFixture:
+        """Create the fixture from its entry in vocabularies.yaml."""
+        schemes = [{k: v for k, v in scheme.items() if k != "data-file"} for scheme in config.get("schemes", [])]
+        data_files = [fixtures_dir / scheme["data-file"] for scheme in config.get("schemes", [])]
+        if "data-file" in config:
+            data_files.insert(0, fixtures_dir / config["data-file"])
+        return cls(
+            type=vocabulary_type,
+            pid_type=config["pid-type"],
+            data_files=data_files,
+            schemes=schemes,
+        )
+
+    @property
+    def is_generic(self) -> bool:
+        """Return True if the terms are stored by the generic vocabularies service."""
+        return self.type not in SPECIFIC_VOCABULARY_SERVICES
+
+    @property
+    def service(self) -> RecordService:
+        """Return the service that stores the terms of this vocabulary."""
+        if self.is_generic:
+            return vocabulary_service
+        return current_service_registry.get(SPECIFIC_VOCABULARY_SERVICES[self.type])
+
+    def content_hash(self) -> str:
+        """Return the sha256 hex digest of the vocabulary configuration and its data files."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([self.type, self.pid_type, self.schemes], sort_keys=True).encode("utf-8"))
+        for data_file in self.data_files:
+            with data_file.open("rb") as f:
+                digest.update(hashlib.file_digest(f, "sha256").digest())
+        return digest.hexdigest()
+
+    def items(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the terms of the vocabulary, reading the data files lazily."""
+        for data_file in self.data_files:
+            for item in iter_yaml_list(data_file):
+                if self.is_generic:
+                    item["type"] = self.type
+                yield item
+
+    def term_id(self, item: dict[str, Any]) -> Any:
+        """Return the identifier of the term as expected by the service's update method."""
+        if self.is_generic:
+            return (self.type, item["id"])
+        return item["id"]
+
+
+@dataclasses.dataclass
+class LoadResult:
+    """Outcome of loading a single vocabulary."""
+
+    type: str
+    skipped: bool = False
+    created: int = 0
+    updated: int = 0
+
+
+class _DeferredIndexingUnitOfWork(UnitOfWork):
+    """Unit of work that writes records to the database but does not index them on commit.
+
+    The records are indexed in bulk after the whole vocabulary has been loaded.
+    """
+
+    @override
+    def register(self, op: Operation) -> None:
+        """Register an operation, record commit operations are only applied to the session."""
+        if isinstance(op, RecordCommitOp):
+            op.on_register(self)
+            return
+        super().register(op)
+
+
+class BulkVocabularyLoader:
+    """Load CCMM vocabulary fixtures in batches with a single bulk reindex per vocabulary."""
+
+    def __init__(
+        self,
+        fixtures_file: Path = FIXTURES_DIR / "vocabularies.yaml",
+        state_file: Path | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        identity: Identity = system_identity,
+    ):
+        """Initialize the loader.
+
+        :param fixtures_file:   vocabularies.yaml with the vocabulary types and their data files
+        :param state_file:      JSON file with content hashes of the loaded vocabularies,
+                                defaults to ccmm_vocabularies.json in the instance path
+        :param batch_size:      number of terms written in a single database transaction
+        :param identity:        identity used to create the terms
+        """
+        self.fixtures = {
+            vocabulary_type: VocabularyFixture.from_config(vocabulary_type, config, fixtures_file.parent)
+            for vocabulary_type, config in load_yaml(fixtures_file).items()
+        }
+        self.state_file = state_file or Path(current_app.instance_path) / "ccmm_vocabularies.json"
+        self.batch_size = batch_size
+        self.identity = identity
+
+    def load(self, vocabulary_types: Iterable[str] | None = None, *, force: bool = False) -> list[LoadResult]:
+        """Load the vocabularies and index them.
+
+        :param vocabulary_types:    types to load, all types from the fixtures file if not given
+        :param force:               load the vocabularies even if their content has not changed
+        :raises KeyError:           if a vocabulary type is not in the fixtures file
+        """
+        if vocabulary_types is None:
+            vocabulary_types = list(self.fixtures)
+        fixtures = [self.fixtures[vocabulary_type] for vocabulary_type in vocabulary_types]
+        state = self._load_state()
+        results: list[LoadResult] = []
+        services: list[RecordService] = []
+        for fixture in fixtures:
+            result = self.load_vocabulary(fixture, state, force=force)
+            results.append(result)
+            if not result.skipped:
+                if fixture.service not in services:
+                    services.append(fixture.service)
+                self._save_state(state)
+        for service in services:
+            service.indexer.process_bulk_queue()
+            service.indexer.refresh()
+        return results
+
+    def load_vocabulary(self, fixture: VocabularyFixture, state: dict[str, Any], *, force: bool = False) -> LoadResult:
+        """Write terms of a single vocabulary and queue them for bulk indexing.
+
+        :param fixture: the vocabulary to load
+        :param state:   content hashes and term counts of loaded vocabularies, updated in place
+        :param force:   load the vocabulary even if its content has not changed
+        """
+        content_hash = fixture.content_hash()
+        pids = PersistentIdentifier.query.filter_by(pid_type=fixture.pid_type, status=PIDStatus.REGISTERED)
+        previous = state.get(fixture.type)
+        if not force and previous == {"hash": content_hash, "count": pids.count()}:
+            log.info("Vocabulary %s has not changed, skipping", fixture.type)
+            return LoadResult(type=fixture.type, skipped=True)
+
+        self._create_type(fixture)
+        existing = {pid_value for (pid_value,) in pids.with_entities(PersistentIdentifier.pid_value)}
+        service = fixture.service
+        result = LoadResult(type=fixture.type)
+        for batch in itertools.batched(fixture.items(), self.batch_size, strict=False):
+            with _DeferredIndexingUnitOfWork(db.session) as uow:
+                for item in batch:
+                    if item["id"] in existing:
+                        service.update(self.identity, fixture.term_id(item), item, uow=uow)
+                        result.updated += 1
+                    else:
+                        service.create(self.identity, item, uow=uow)
+                        result.created += 1
+                uow.commit()
+
+        record_ids = [object_uuid for (object_uuid,) in pids.with_entities(PersistentIdentifier.object_uuid)]
+        service.indexer.bulk_index(record_ids)
+        state[fixture.type] = {"hash": content_hash, "count": pids.count()}
+        log.info("Vocabulary %s loaded: %s created, %s updated", fixture.type, result.created, result.updated)
+        return result
+
+    def _create_type(self, fixture: VocabularyFixture) -> None:
+        """Create the vocabulary type (or the schemes of a specific vocabulary) if it does not exist."""
+        if fixture.is_generic:
+            if db.session.get(VocabularyType, fixture.type) is None:
+                vocabulary_service.create_type(self.identity, fixture.type, fixture.pid_type)
+            return
+        for scheme in fixture.schemes:
+            if VocabularyScheme.query.filter_by(id=scheme["id"], parent_id=fixture.type).one_or_none() is None:
+                db.session.add(VocabularyScheme(parent_id=fixture.type, **scheme))
+        db.session.commit()
+
+    def _load_state(self) -> dict[str, Any]:
+        """Load hashes of previously loaded vocabularies."""
+        if not self.state_file.exists():
+            return {}
+        with self.state_file.open(encoding="utf-8") as f:
+            content = json.load(f)
+        if content.get("version") != STATE_VERSION:
+            return {}
+        return content.get("vocabularies", {})
+
+    def _save_state(self, state: dict[str, Any]) -> None:
+        """Save hashes of loaded vocabularies."""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with self.state_file.open("w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "vocabularies": dict(sorted(state.items()))}, f, indent=2)
+            f.write("\n")
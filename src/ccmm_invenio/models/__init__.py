@@ -10,10 +10,11 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, override
+import dataclasses
+import logging
+from typing import TYPE_CHECKING, Any, ClassVar, Literal, override
 
 from flask_resources.deserializers import DeserializerMixin
-from invenio_access.permissions import system_identity
 from invenio_i18n import lazy_gettext as _
 from invenio_rdm_records.resources.config import csl_url_args_retriever
 from invenio_rdm_records.resources.serializers import (
@@ -21,9 +22,7 @@ from invenio_rdm_records.resources.serializers import (
     StringCitationSerializer,  # type: ignore[reportAttributeAccessIssue]
 )
 from invenio_records_resources.services.records.components import ServiceComponent
-from invenio_vocabularies.proxies import current_service as vocabulary_service
-from lxml.etree import fromstring
-from oarepo_model import from_yaml
+from lxml.etree import QName, fromstring
 from oarepo_model.api import FunctionalPreset
 from oarepo_model.customizations import (
     AddMetadataExport,
@@ -40,47 +39,55 @@ from oarepo_rdm.model.presets.rdm.services.records.rdm_record_ui_schema import (
 )
 from oarepo_rdm.model.presets.rdm_metadata import merge_metadata
 
-from ccmm_invenio.parsers.production_1_1_0 import CCMMXMLProductionParser
-
+from ..parsers.base import CachingVocabularyLoader
+from ..parsers.registry import CCMM_NAMESPACES, CCMMParserRegistry
 from ..serializers import (
     CCMMNMADataCiteJSONSerializer_1_1_0,
+    CCMMNMAXMLSerializer_1_1_0,
     CCMMProductionDataCiteJSONSerializer_1_1_0,
+    CCMMProductionXMLSerializer_1_1_0,
 )
+from .type_registry import LazyTypes, load_types
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Generator, Sequence
 
     from flask_principal import Identity
     from invenio_records.api import Record
+    from invenio_records_resources.services import RecordService
     from oarepo_model.builder import InvenioModelBuilder
     from oarepo_model.model import InvenioModel
 
+    from ccmm_invenio.parsers.production_1_1_0 import CCMMXMLProductionParser
+
+log = logging.getLogger(__name__)
+
 
 def ccmm_1_1_0() -> dict[str, Any]:
     """Return RDM specific model types."""
-    return {
-        **from_yaml("1.1.0-2026-01-29/ccmm.yaml", __file__),
-        **from_yaml("1.1.0-2026-01-29/ccmm-vocabularies.yaml", __file__),
-        **from_yaml("1.1.0-2026-01-29/geojson-1.1.0.yaml", __file__),
-        **from_yaml("1.1.0-2026-01-29/gml-1.1.0.yaml", __file__),
-    }
+    return load_types(
+        "1.1.0-2026-01-29/ccmm.yaml",
+        "1.1.0-2026-01-29/ccmm-vocabularies.yaml",
+        "1.1.0-2026-01-29/geojson-1.1.0.yaml",
+        "1.1.0-2026-01-29/gml-1.1.0.yaml",
+    )
 
 
 def ccmm_production_1_1_0() -> dict[str, Any]:
     """Return RDM specific model types."""
-    return {
-        **from_yaml("1.1.0-2026-01-29/ccmm.yaml", __file__),
-        **from_yaml("1.1.0-2026-01-29/ccmm-invenio.yaml", __file__),
-        **from_yaml("1.1.0-2026-01-29/ccmm-vocabularies.yaml", __file__),
-        **from_yaml("1.1.0-2026-01-29/geojson-1.1.0.yaml", __file__),
-        **from_yaml("1.1.0-2026-01-29/gml-1.1.0.yaml", __file__),
-    }
+    return load_types(
+        "1.1.0-2026-01-29/ccmm.yaml",
+        "1.1.0-2026-01-29/ccmm-invenio.yaml",
+        "1.1.0-2026-01-29/ccmm-vocabularies.yaml",
+        "1.1.0-2026-01-29/geojson-1.1.0.yaml",
+        "1.1.0-2026-01-29/gml-1.1.0.yaml",
+    )
 
 
 class CCMMBaseMetadataPreset(FunctionalPreset):
     """Preset for CCMM metadata."""
 
-    types: dict[str, Any]
+    types: ClassVar[LazyTypes]
     metadata_type: str
 
     @override
@@ -123,6 +130,12 @@ class CCMMProductionCustomizationPreset(Preset):
             mimetype="application/vnd.datacite.datacite+json",
             serializer=CCMMProductionDataCiteJSONSerializer_1_1_0(),
         )
+        yield AddMetadataExport(
+            code="ccmm-xml",
+            name=_("CCMM XML export"),
+            mimetype="application/vnd.ccmm+xml",
+            serializer=CCMMProductionXMLSerializer_1_1_0(),
+        )
         yield AddMetadataExport(
             code="citation",
             name=_("Citation"),
@@ -138,23 +151,124 @@ class CCMMProductionCustomizationPreset(Preset):
         )
 
 
+@dataclasses.dataclass
+class DeserializedItem:
+    """Result of deserializing a single dataset from a batch payload."""
+
+    index: int
+    """Position of the dataset element in the payload."""
+
+    record: dict[str, Any] | None = None
+    error: str | None = None
+    id: str | None = None
+    """Id of the record created from the dataset by import_batch."""
+
+    @property
+    def status(self) -> Literal["ok", "error"]:
+        """Return "ok" if the dataset was deserialized, "error" otherwise."""
+        return "error" if self.error is not None else "ok"
+
+
 class CCMMProductionDeserializer(DeserializerMixin):
-    """CCMM Invenio metadata deserializer."""
+    """CCMM Invenio metadata deserializer.
 
-    def __init__(self, parser: type[CCMMXMLProductionParser], vocabulary_loader: Any):
+    The parser class reads records in all the given namespaces (CCMM releases),
+    the parser of a record is selected by the namespace of its root element.
+    """
+
+    def __init__(
+        self,
+        parser: type[CCMMXMLProductionParser],
+        vocabulary_loader: Any,
+        namespaces: Sequence[str] = CCMM_NAMESPACES,
+    ):
         """Construct."""
         self.parser = parser
         self.vocabulary_loader = vocabulary_loader
+        self.parsers = CCMMParserRegistry(vocabulary_loader=vocabulary_loader)
+        for namespace in namespaces:
+            self.parsers.register(parser, namespace)
         super().__init__()
 
     def deserialize(self, data: bytes) -> dict:
-        """Deserialize data."""
+        """Deserialize data.
+
+        Records of unsupported versions are rejected before the whole document is parsed.
+        """
+        parser = self.parsers.parser_for_data(data)
+        root_el = fromstring(data)
+        return parser.parse(root_el)
+
+    def deserialize_batch(self, data: bytes) -> list[DeserializedItem]:
+        """Deserialize a payload containing multiple datasets.
+
+        The payload is either a single dataset element or an element (of any name) whose
+        children are dataset elements. The datasets may be of different CCMM versions,
+        each one is parsed by the parser of its version. Vocabulary IRIs are resolved
+        only once for the whole batch. A dataset that fails to parse (or is of an
+        unsupported version) does not stop the batch, the error is returned in its item instead.
+        """
         root_el = fromstring(data)
-        return self.parser(vocabulary_loader=self.vocabulary_loader).parse(root_el)
+        loader = CachingVocabularyLoader(self.vocabulary_loader)
+        if QName(root_el).localname == "dataset":
+            dataset_els = [root_el]
+        else:
+            dataset_els = [child for child in root_el.iterchildren() if isinstance(child.tag, str)]
+
+        ret: list[DeserializedItem] = []
+        for index, dataset_el in enumerate(dataset_els):
+            if QName(dataset_el).localname != "dataset":
+                ret.append(DeserializedItem(index=index, error=f"Expected a dataset element, got {dataset_el.tag}"))
+                continue
+            # do not keep the whitespace between datasets in the stored xml
+            dataset_el.tail = None
+            try:
+                ret.append(DeserializedItem(index=index, record=self.parsers.parse(dataset_el, loader)))
+            except Exception as e:
+                log.warning("Failed to deserialize dataset %s of the batch", index, exc_info=True)
+                ret.append(DeserializedItem(index=index, error=str(e) or type(e).__name__))
+        return ret
+
+
+def import_batch(
+    service: RecordService,
+    deserializer: CCMMProductionDeserializer,
+    data: bytes,
+    identity: Identity | None = None,
+    publish: bool = False,
+) -> list[DeserializedItem]:
+    """Create drafts (and publish them if requested) from a payload with multiple CCMM datasets.
+
+    The payload is deserialized by deserialize_batch. A dataset that can not be deserialized
+    or created does not stop the import, the error is returned in its item instead. The id
+    of the created record is set on the items that were imported.
+
+    :param service: service of the model the records are created in
+    :param identity: identity creating the records, system identity by default
+    """
+    from invenio_access.permissions import system_identity
+
+    identity = identity or system_identity
+    items = deserializer.deserialize_batch(data)
+    for item in items:
+        if item.record is None:
+            continue
+        try:
+            draft = service.create(identity, data=item.record)
+            item.id = draft.id
+            if publish:
+                service.publish(identity, draft.id)
+        except Exception as e:
+            log.warning("Failed to import dataset %s of the batch", item.index, exc_info=True)
+            item.error = str(e) or type(e).__name__
+    return items
 
 
 def invenio_vocabulary_loader(vocabulary_type: str, iri: str) -> str:
     """Load vocabulary from IRI."""
+    from invenio_access.permissions import system_identity
+    from invenio_vocabularies.proxies import current_service as vocabulary_service
+
     if vocabulary_type == "resourcerelationtypes":
         vocabulary_type = "relationtypes"
 
@@ -204,6 +318,8 @@ class CCMMImportPreset(Preset):
         dependencies: dict[str, Any],
     ) -> Generator[Customization]:
         """Apply the preset."""
+        from ccmm_invenio.parsers.production_1_1_0 import CCMMXMLProductionParser
+
         yield SetCCMMImport(parser=CCMMXMLProductionParser, vocabulary_loader=invenio_vocabulary_loader)
 
 
@@ -226,6 +342,12 @@ class CCMMNMACustomizationPreset(Preset):
             mimetype="application/vnd.datacite.datacite+json",
             serializer=CCMMNMADataCiteJSONSerializer_1_1_0(),
         )
+        yield AddMetadataExport(
+            code="ccmm-xml",
+            name=_("CCMM XML export"),
+            mimetype="application/vnd.ccmm+xml",
+            serializer=CCMMNMAXMLSerializer_1_1_0(),
+        )
 
 
 class CCMMRootRecordComponentPreset(Preset):
@@ -262,14 +384,14 @@ class CCMMRootRecordComponentPreset(Preset):
 class CCMMProductionPreset(CCMMBaseMetadataPreset):
     """Preset for CCMM production metadata."""
 
-    types = ccmm_production_1_1_0()
+    types = LazyTypes(ccmm_production_1_1_0)
     metadata_type = "CCMMDataset"
 
 
 class CCMMNMAPreset(CCMMBaseMetadataPreset):
     """Preset for CCMM production metadata."""
 
-    types = ccmm_1_1_0()
+    types = LazyTypes(ccmm_1_1_0)
     metadata_type = "CCMMDataSet"
 
 
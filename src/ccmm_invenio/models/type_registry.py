@@ -0,0 +1,126 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Lazily loaded, cached model type definitions.
+
+Parsing the model yaml files (ccmm.yaml alone has more than 80 kB) is slow,
+so each file is parsed at most once per process, on the first access.
+The parsed types are kept marshalled: every caller gets its own copy
+(presets might modify the types they get) and the marshalled form is also
+stored in an on-disk cache keyed by the hash of the yaml file, so that
+subsequent processes do not need to parse the yaml at all.
+
+The cache directory is taken from the CCMM_INVENIO_MODEL_CACHE environment
+variable (set it to an empty string to disable the on-disk cache) and defaults
+to ~/.cache/ccmm-invenio/models.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib.metadata
+import logging
+import marshal
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from oarepo_model import from_yaml
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+log = logging.getLogger(__name__)
+
+MODEL_CACHE_ENV = "CCMM_INVENIO_MODEL_CACHE"
+DEFAULT_MODEL_CACHE_DIR = Path.home() / ".cache" / "ccmm-invenio" / "models"
+
+
+def model_cache_dir() -> Path | None:
+    """Return the directory of the on-disk cache or None if the cache is disabled."""
+    cache_dir = os.environ.get(MODEL_CACHE_ENV)
+    if cache_dir is None:
+        return DEFAULT_MODEL_CACHE_DIR
+    return Path(cache_dir) if cache_dir else None
+
+
+@functools.cache
+def _marshalled_types(file_name: str) -> bytes:
+    """Return marshalled types from a model yaml file (relative to this package)."""
+    content = (Path(__file__).parent / file_name).read_bytes()
+    cache_key = hashlib.sha256(content)
+    # the output of from_yaml might change with oarepo-model
+    cache_key.update(importlib.metadata.version("oarepo-model").encode("utf-8"))
+    cache_key.update(marshal.version.to_bytes(4, "big"))
+
+    cache_dir = model_cache_dir()
+    cache_file = cache_dir / f"{cache_key.hexdigest()}.marshal" if cache_dir else None
+    if cache_file is not None:
+        try:
+            marshalled = cache_file.read_bytes()
+            marshal.loads(marshalled)  # noqa: S302 - check that the cache file is not corrupted
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            log.debug("Could not read model cache file %s: %s", cache_file, e)
+        else:
+            return marshalled
+
+    marshalled = marshal.dumps(from_yaml(file_name, __file__))
+    if cache_file is not None:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=cache_file.parent, delete=False) as f:
+                f.write(marshalled)
+            Path(f.name).replace(cache_file)
+        except OSError as e:
+            log.debug("Could not write model cache file %s: %s", cache_file, e)
+    return marshalled
+
+
+def load_types(*file_names: str) -> dict[str, Any]:
+    """Return merged types from the model yaml files, later files take precedence.
+
+    The returned dictionary is a fresh copy that the caller is free to modify.
+    """
+    ret: dict[str, Any] = {}
+    for file_name in file_names:
+        ret.update(marshal.loads(_marshalled_types(file_name)))  # noqa: S302 - produced by this module
+    return ret
+
+
+class LazyTypes:
+    """Class attribute that loads model types on access.
+
+    ```python
+    class MyPreset(FunctionalPreset):
+        types = LazyTypes(my_model_types)
+    ```
+
+    An instance loads the types on the first access and keeps them, every access
+    on the class returns a fresh copy.
+    """
+
+    def __init__(self, loader: Callable[[], dict[str, Any]]):
+        """Initialize the attribute with a function returning the types."""
+        self.loader = loader
+        self.name: str | None = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        """Remember the name of the attribute, the loaded types are stored on instances under it."""
+        self.name = name
+
+    def __get__(self, instance: object, owner: type | None = None) -> dict[str, Any]:
+        """Load the types."""
+        types = self.loader()
+        if instance is not None and self.name is not None and hasattr(instance, "__dict__"):
+            # this is a non-data descriptor, so the instance attribute is used on the next access
+            instance.__dict__[self.name] = types
+        return types
@@ -10,14 +10,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import dataclasses
-from collections.abc import Callable
-from functools import partial, wraps
+import logging
+from collections.abc import Callable, Iterable, Sequence
+from contextvars import ContextVar
+from functools import lru_cache, partial, wraps
 from typing import Any, Literal, Protocol, cast, overload
 
 from lxml.etree import QName, tostring
 from lxml.etree import _Element as Element
 
+log = logging.getLogger(__name__)
+
+DEFAULT_VOCABULARY_LOOKUP_CONCURRENCY = 16
+
 
 class ParseError(Exception):
     """Exception raised for errors during parsing."""
@@ -35,14 +43,54 @@ class VocabularyLoader(Protocol):
         raise NotImplementedError
 
 
-@dataclasses.dataclass(frozen=True)
+class AsyncVocabularyLoader(Protocol):
+    """Protocol for an asynchronous vocabulary loader callable."""
+
+    async def __call__(self, vocabulary_type: str, iri: str) -> str:
+        """Protocol for an asynchronous vocabulary loader callable.
+
+        Resolve the given IRI to its internal invenio identifier based on the vocabulary type.
+        Raises KeyError if the IRI is not found.
+        """
+        raise NotImplementedError
+
+
+class CachingVocabularyLoader:
+    """Vocabulary loader that resolves each (vocabulary type, IRI) pair only once.
+
+    Useful when many records are parsed at once, as they usually share most of
+    the vocabulary terms. Failed lookups are remembered as well.
+    """
+
+    def __init__(self, vocabulary_loader: VocabularyLoader):
+        """Initialize the caching loader with the loader that performs the lookups."""
+        self.vocabulary_loader = vocabulary_loader
+        self.resolved: dict[tuple[str, str], str | KeyError] = {}
+
+    def __call__(self, vocabulary_type: str, iri: str) -> str:
+        """Resolve the IRI, raise KeyError if it is not found."""
+        key = (vocabulary_type, iri)
+        if key not in self.resolved:
+            try:
+                self.resolved[key] = self.vocabulary_loader(vocabulary_type, iri)
+            except KeyError as e:
+                self.resolved[key] = e
+        ret = self.resolved[key]
+        if isinstance(ret, KeyError):
+            raise KeyError(*ret.args)
+        return ret
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class QualifiedTag:
     """Helper class for qualified XML tag names.
 
-    from encodings.cp857 import StreamWriter
     A QualifiedTag represents an XML element or attribute with its namespace URI and local name.
     They can be hashed and used as dictionary keys. The `get_all_children` and `get_single_child` methods
     help to find child elements with the given tag in an lxml Element.
+
+    Every element of a parsed document is looked up by its QualifiedTag several times,
+    so the instances are slotted and the tags of elements are cached (see `from_element`).
     """
 
     namespace: str
@@ -85,9 +133,20 @@ class QualifiedTag:
 
     @staticmethod
     def from_element(el: Element) -> QualifiedTag:
-        """Create a QualifiedTag from an lxml Element."""
-        qname = QName(el)
-        return QualifiedTag(namespace=qname.namespace, tag=qname.localname)
+        """Create a QualifiedTag from an lxml Element.
+
+        The same instance is returned for all elements with the same tag.
+        """
+        return _qualified_tag(el.tag)
+
+
+@lru_cache(maxsize=4096)
+def _qualified_tag(clark_tag: str) -> QualifiedTag:
+    """Create a QualifiedTag from a tag in the lxml (Clark) notation, "{namespace}localname"."""
+    if clark_tag.startswith("{"):
+        namespace, _, localname = clark_tag[1:].partition("}")
+        return QualifiedTag(namespace=namespace, tag=localname)
+    return QualifiedTag(namespace=None, tag=clark_tag)  # type: ignore[arg-type]
 
 
 class XMLNamespace:
@@ -110,14 +169,29 @@ class XMLNamespace:
     def __init__(self, uri: str):
         """Initialize the XMLNamespace with the given URI."""
         self.uri = uri
+        self._tags: dict[str, QualifiedTag] = {}
 
     def __getattr__(self, name: str) -> QualifiedTag:
         """Get the fully qualified name for the given XML element or attribute name."""
-        return QualifiedTag(namespace=self.uri, tag=name)
+        if name.startswith("_"):
+            # private and special attributes (used by copy, pickle, ...) are never tags
+            raise AttributeError(name)
+        return self[name]
 
     def __getitem__(self, name: str) -> QualifiedTag:
         """Get the fully qualified name for the given XML element or attribute name."""
-        return QualifiedTag(namespace=self.uri, tag=name)
+        tag = self._tags.get(name)
+        if tag is None:
+            tag = self._tags[name] = QualifiedTag(namespace=self.uri, tag=name)
+        return tag
+
+
+class ConverterFunction(Protocol):
+    """Protocol for converter functions, see `datatype_converter`."""
+
+    def __call__(self, value: Any) -> Any:
+        """Convert the parsed value."""
+        raise NotImplementedError
 
 
 class ParserFunction(Protocol):
@@ -134,7 +208,7 @@ class ParserFunction(Protocol):
         raise NotImplementedError
 
 
-@dataclasses.dataclass(frozen=True, kw_only=True)
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class VocabularyTag(QualifiedTag):
     """QualifiedTag subclass for vocabulary elements."""
 
@@ -296,11 +370,54 @@ def datatype_parser(
     return wrapper
 
 
+def datatype_converter(datatype: QualifiedTag | str, path: Sequence[str] | None = None) -> Callable:
+    """Mark a specific function as being a converter of parsed values of the given datatype.
+
+    The name of the function must start with `convert_`. It is called with the value
+    returned by the parser of the datatype and its return value is used instead. This
+    lets subclasses emit values in a different shape while the element is parsed,
+    without a second pass over the whole parsed record.
+
+    If path is given (local names of the elements from the root element, without it),
+    the converter is applied only to values at this path. Otherwise it is applied
+    wherever the datatype is used.
+    """
+
+    def wrapper[T: Callable](f: T) -> T:
+        """Mark the function as a converter for the given datatype."""
+        f.__converts__ = (datatype, tuple(path) if path is not None else None)  # type: ignore[attr-defined]
+        return f
+
+    return wrapper
+
+
 internal = XMLNamespace("http://cesnet.cz/ccmm/invenio/internal")
 
+# vocabulary loader used instead of parser.vocabulary_loader within the current context,
+# set by the async parse to serve prefetched vocabulary terms
+_vocabulary_loader_override: ContextVar[VocabularyLoader | None] = ContextVar(
+    "vocabulary_loader_override",
+    default=None,
+)
+
+
+# set when only the vocabulary terms are collected and the parsed values are thrown away
+_converters_disabled: ContextVar[bool] = ContextVar("converters_disabled", default=False)
+
+
+def _not_prefetched(vocabulary_type: str, iri: str) -> str:
+    """Vocabulary loader for async parsing without a synchronous fallback."""
+    raise KeyError(f"iri {iri} of {vocabulary_type} has not been prefetched")
+
 
 class CCMMXMLParser:
-    """Parser for CCMM XML records."""
+    """Parser for CCMM XML records.
+
+    Parsed records are plain dicts and lists in the shape of the record JSON. The conversions of
+    subclasses (such as the production parser) and the Invenio services work on them directly,
+    there is no typed intermediate representation of the CCMM types. Most of the parsing cost is
+    in the per-element machinery instead, so the tags it uses are slotted and shared.
+    """
 
     ns: XMLNamespace
     vocabulary_ns = XMLNamespace("http://vocabs.ccmm.cz/registry/")
@@ -317,8 +434,19 @@ class CCMMXMLParser:
             self.i18ndict_datatype: self.parse_i18ndict_content,  # type: ignore[dict-item]
         }
 
+        self.converter_functions: dict[QualifiedTag, list[tuple[tuple[str, ...] | None, ConverterFunction]]] = {}
+
         # iterate over all methods of the class and register those marked as datatype parsers
+        # and datatype converters
         for attr_name in dir(self):
+            if attr_name.startswith("convert_"):
+                attr = getattr(self, attr_name)
+                if callable(attr) and hasattr(attr, "__converts__"):
+                    datatype, path = attr.__converts__
+                    if isinstance(datatype, str):
+                        datatype = self.ns[datatype]
+                    self.converter_functions.setdefault(datatype, []).append((path, attr))
+                continue
             if not attr_name.startswith("parse_"):
                 continue
             attr = getattr(self, attr_name)
@@ -340,6 +468,103 @@ class CCMMXMLParser:
         """Parse the given CCMM XML root element into a dictionary."""
         raise NotImplementedError
 
+    async def parse_async(
+        self,
+        xml_root: Element,
+        vocabulary_loader: AsyncVocabularyLoader | None = None,
+    ) -> dict[str, Any]:
+        """Parse the given CCMM XML root element, resolving all its vocabulary terms concurrently.
+
+        See parse_many_async for details.
+        """
+        [ret] = await self.parse_many_async([xml_root], vocabulary_loader)
+        return ret
+
+    async def parse_many_async(
+        self,
+        xml_roots: Sequence[Element],
+        vocabulary_loader: AsyncVocabularyLoader | None = None,
+        max_concurrency: int = DEFAULT_VOCABULARY_LOOKUP_CONCURRENCY,
+    ) -> list[dict[str, Any]]:
+        """Parse the given CCMM XML root elements, resolving all their vocabulary terms concurrently.
+
+        At first, copies of the elements are parsed with a loader that just records the requested
+        vocabulary terms. Then all the terms are resolved concurrently and finally the elements
+        are parsed with a loader that serves the resolved terms. This relies on the requested
+        terms not depending on the values returned by the vocabulary loader.
+
+        Without an async loader, the elements are just parsed one by one with the synchronous
+        loader of this parser, sharing its cache. The lookups stay in the calling thread, as the
+        synchronous loader (such as invenio_vocabulary_loader) needs its application context and
+        database session, which can not be used from worker threads.
+
+        :param xml_roots:           the elements to parse
+        :param vocabulary_loader:   async loader used to resolve vocabulary terms, if not given,
+                                    the synchronous loader of this parser is used
+        :param max_concurrency:     maximum number of concurrent vocabulary lookups
+        """
+        if vocabulary_loader is None:
+            caching_loader = CachingVocabularyLoader(self.vocabulary_loader)
+            return [self.parse_with_loader(xml_root, caching_loader) for xml_root in xml_roots]
+
+        requested: set[tuple[str, str]] = set()
+
+        def record_request(vocabulary_type: str, iri: str) -> str:
+            requested.add((vocabulary_type, iri))
+            return iri
+
+        token = _vocabulary_loader_override.set(record_request)
+        converters_token = _converters_disabled.set(True)
+        try:
+            for xml_root in xml_roots:
+                try:
+                    self.collect_vocabulary_terms(copy.deepcopy(xml_root))
+                except Exception as e:  # noqa: BLE001 - the error is raised again when the element is really parsed
+                    log.debug("Error when collecting vocabulary terms: %s", e)
+        finally:
+            _converters_disabled.reset(converters_token)
+            _vocabulary_loader_override.reset(token)
+
+        loader = CachingVocabularyLoader(self.vocabulary_loader or _not_prefetched)
+        loader.resolved.update(
+            await self._resolve_vocabulary_terms(requested, vocabulary_loader, max_concurrency),
+        )
+        return [self.parse_with_loader(xml_root, loader) for xml_root in xml_roots]
+
+    def collect_vocabulary_terms(self, xml_root: Element) -> None:
+        """Parse the element (a copy of it) only to call the vocabulary loader for all its vocabulary terms.
+
+        Datatype converters are not called here and subclasses that post-process the parsed
+        record may skip the post-processing as well.
+        """
+        self.parse(xml_root)
+
+    def parse_with_loader(self, xml_root: Element, vocabulary_loader: VocabularyLoader) -> dict[str, Any]:
+        """Parse the given CCMM XML root element, resolving vocabulary terms with the given loader."""
+        token = _vocabulary_loader_override.set(vocabulary_loader)
+        try:
+            return self.parse(xml_root)
+        finally:
+            _vocabulary_loader_override.reset(token)
+
+    async def _resolve_vocabulary_terms(
+        self,
+        terms: Iterable[tuple[str, str]],
+        vocabulary_loader: AsyncVocabularyLoader,
+        max_concurrency: int,
+    ) -> dict[tuple[str, str], str | KeyError]:
+        """Resolve (vocabulary type, iri) pairs concurrently, KeyError is returned for unknown terms."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def resolve(term: tuple[str, str]) -> tuple[tuple[str, str], str | KeyError]:
+            async with semaphore:
+                try:
+                    return term, await vocabulary_loader(*term)
+                except KeyError as e:
+                    return term, e
+
+        return dict(await asyncio.gather(*(resolve(term) for term in terms)))
+
     #
     # Helper methods to be used by subclasses
     #
@@ -387,7 +612,12 @@ class CCMMXMLParser:
         if not parser_func:
             raise ValueError(f"No parser function registered for datatype '{dt}' at path '{path}'")
         try:
-            return parser_func(el, path, **kwargs)
+            ret = parser_func(el, path, **kwargs)
+            converters = self.converter_functions.get(dt)
+            if converters and not _converters_disabled.get():
+                for converter_path, converter in converters:
+                    if converter_path is None or converter_path == tuple(tag.tag for tag in path):
+                        ret = converter(ret)
         except ParseError:
             raise
         except Exception as e:
@@ -397,6 +627,7 @@ class CCMMXMLParser:
                 f"Failed to parse content for {getattr(parser_func, '__name__', parser_func)}: {e}\n"
                 f"{tostring(el, encoding='unicode', pretty_print=True)}"
             ).with_traceback(e.__traceback__) from e
+        return ret
 
     def parse_field(
         self,
@@ -408,24 +639,82 @@ class CCMMXMLParser:
         **kwargs: Any,
     ) -> Any:
         """Find a child element with the given tag and parse its content."""
-        selected_children = children.get(tag, [])
-        for child_el in selected_children:
-            child_el.getparent().remove(child_el)
-
         if cardinality == "single":
-            return self._parse_single_required_child(selected_children, tag, path, datatype, **kwargs)
+            return self.parse_single_field(tag, children, path, datatype, **kwargs)
         if cardinality == "optional":
-            return self._parse_single_optional_child(selected_children, tag, path, datatype, **kwargs)
-        if cardinality in ("array", "optional_array"):
-            ret = [
-                self.parse_content(child_el, [*path, tag], datatype=datatype, **kwargs)
-                for child_el in selected_children
-            ]
-            if cardinality == "array" and not ret:
-                raise ValueError(f"Missing required child elements '{tag}' at path '{path}'")
-            return ret
+            return self.parse_optional_field(tag, children, path, datatype, **kwargs)
+        if cardinality == "array":
+            return self.parse_array_field(tag, children, path, datatype, **kwargs)
+        if cardinality == "optional_array":
+            return self.parse_optional_array_field(tag, children, path, datatype, **kwargs)
         raise ValueError(f"Unknown cardinality '{cardinality}' for tag '{tag}'")
 
+    #
+    # Field parsers specialized for a cardinality. These are equivalent to parse_field with the given
+    # cardinality, but do not dispatch on it at runtime - generated parsers call them directly.
+    #
+
+    def parse_single_field(
+        self,
+        tag: QualifiedTag,
+        children: dict[QualifiedTag, list[Element]],
+        path: list[QualifiedTag],
+        datatype: QualifiedTag | str | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Parse the single, required child element with the given tag."""
+        return self._parse_single_required_child(self._take_children(tag, children), tag, path, datatype, **kwargs)
+
+    def parse_optional_field(
+        self,
+        tag: QualifiedTag,
+        children: dict[QualifiedTag, list[Element]],
+        path: list[QualifiedTag],
+        datatype: QualifiedTag | str | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Parse the optional child element with the given tag, return None if it is not present."""
+        return self._parse_single_optional_child(self._take_children(tag, children), tag, path, datatype, **kwargs)
+
+    def parse_array_field(
+        self,
+        tag: QualifiedTag,
+        children: dict[QualifiedTag, list[Element]],
+        path: list[QualifiedTag],
+        datatype: QualifiedTag | str | None = None,
+        **kwargs: Any,
+    ) -> list[Any]:
+        """Parse all child elements with the given tag, at least one is required."""
+        ret = self.parse_optional_array_field(tag, children, path, datatype, **kwargs)
+        if not ret:
+            raise ValueError(f"Missing required child elements '{tag}' at path '{path}'")
+        return ret
+
+    def parse_optional_array_field(
+        self,
+        tag: QualifiedTag,
+        children: dict[QualifiedTag, list[Element]],
+        path: list[QualifiedTag],
+        datatype: QualifiedTag | str | None = None,
+        **kwargs: Any,
+    ) -> list[Any]:
+        """Parse all child elements with the given tag."""
+        child_path = [*path, tag]
+        return [
+            self.parse_content(child_el, child_path, datatype=datatype, **kwargs)
+            for child_el in self._take_children(tag, children)
+        ]
+
+    def _take_children(self, tag: QualifiedTag, children: dict[QualifiedTag, list[Element]]) -> list[Element]:
+        """Return child elements with the given tag and remove them from their parent.
+
+        Removed elements are not reported as unexpected by the datatype_parser decorator.
+        """
+        selected_children = children.get(tag, [])
+        for child_el in selected_children:
+            child_el.getparent().remove(child_el)
+        return selected_children
+
     def _parse_single_required_child(
         self,
         selected_children: list[Element],
@@ -514,7 +803,15 @@ class CCMMXMLParser:
         children = self.children(el)
         iri_value = self.parse_text_field(self.ns.iri, children, path, cardinality="single")
 
-        return {"id": self.vocabulary_loader(vocabulary_type, iri_value)}
+        return {"id": self.vocabulary_id(vocabulary_type, iri_value)}
+
+    def vocabulary_id(self, vocabulary_type: str, iri: str) -> str:
+        """Return the id of the vocabulary term with the loader of the record being parsed.
+
+        Raises KeyError if the term is not in the vocabulary.
+        """
+        vocabulary_loader = _vocabulary_loader_override.get() or self.vocabulary_loader
+        return vocabulary_loader(vocabulary_type, iri)
 
     #
     # Text parsers
@@ -715,6 +1012,16 @@ class CCMMXMLParser:
         except ValueError as e:
             raise ValueError(f"Failed to parse double at path '{path}': '{text}'") from e
 
+    @datatype_parser()
+    def parse_boolean(self, el: Element, path: list[QualifiedTag]) -> bool:
+        """Parse a boolean element (xs:boolean, "true", "false", "1" or "0")."""
+        text = self.parse_text_content(el, path)
+        if text in ("true", "1"):
+            return True
+        if text in ("false", "0"):
+            return False
+        raise ValueError(f"Failed to parse boolean at path '{path}': '{text}'")
+
     @datatype_parser()
     def parse_date(self, el: Element, path: list[QualifiedTag]) -> str:
         """Parse a date element (ISO 8601 format)."""
@@ -778,7 +1085,7 @@ class CCMMXMLParser:
                 self.ns.wkt,
                 children,
                 path,
-                cardinality="single",
+                cardinality="optional",
                 datatype="ccmmwkt",
             ),
         }
@@ -0,0 +1,218 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Generate a parser of CCMM XML directly from the merged CCMM XML Schema.
+
+Unlike generate_parser.py, which needs the YAML models of the invenio records,
+this script reads the merged schema (see ccmm_versions/merged or ccmm_invenio/schemas)
+and writes a complete parser class, including registration of the vocabulary parsers.
+
+The schema is read by xsd_schema.load_schema, see there for the naming of the fields
+and the vocabulary types.
+
+Each field is parsed by a call specialized for its cardinality with a datatype resolved
+at import time, so there is no dispatch on cardinality at runtime. Optional fields
+are skipped without any call when their element is not present.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import click
+
+from ccmm_invenio.parsers.xsd_schema import datatype_name, load_schema, snake_case
+
+if TYPE_CHECKING:
+    from ccmm_invenio.parsers.xsd_schema import Schema, SchemaField, SchemaType
+
+MAX_LINE_LENGTH = 120
+
+
+@click.command()
+@click.argument("xsd_file", type=click.Path(exists=True, file_okay=True, dir_okay=False))
+@click.argument("output_parser_file", type=click.Path())
+@click.option("--class-name", default="CCMMXMLGeneratedParser", show_default=True, help="Name of the parser class.")
+@click.option("--namespace", help="Namespace of the parsed elements, target namespace of the schema by default.")
+@click.option("--root-type", default="dataset", show_default=True, help="Type of the root element.")
+def generate_xsd_parser(
+    xsd_file: str,
+    output_parser_file: str,
+    class_name: str,
+    namespace: str | None,
+    root_type: str,
+) -> None:
+    """Generate a parser class for CCMM XML from the merged XML Schema."""
+    source = generate_parser_source(xsd_file, class_name, namespace=namespace, root_type=root_type)
+    Path(output_parser_file).write_text(source, encoding="utf-8")
+
+
+def generate_parser_source(
+    xsd_file: str | Path,
+    class_name: str,
+    namespace: str | None = None,
+    root_type: str = "dataset",
+) -> str:
+    """Generate source code of a module with the parser class for the given schema.
+
+    :param xsd_file: merged CCMM XML Schema
+    :param class_name: name of the generated parser class
+    :param namespace: namespace of the parsed elements, target namespace of the schema by default
+    :param root_type: name of the complex type of the root element
+    """
+    schema = load_schema(xsd_file)
+    return render_module(schema, Path(xsd_file).name, class_name, namespace or schema.target_namespace, root_type)
+
+
+def constant_name(name: str) -> str:
+    """Return name of the module-level constant for a tag or datatype."""
+    return "".join(c if c.isalnum() else "_" for c in name).upper()
+
+
+#
+# Rendering of the parser
+#
+
+
+def render_module(schema: Schema, schema_name: str, class_name: str, namespace: str, root_type: str) -> str:
+    """Render the module with the parser class."""
+    generated_types = [schema_type for schema_type in schema.types.values() if schema_type.generate]
+    fields = [field for schema_type in generated_types for field in schema_type.fields]
+
+    tags = sorted({field.element for field in fields})
+    datatypes = sorted({field.datatype for field in fields if field.kind == "datatype" and field.datatype})
+    vocabularies = sorted({field.vocabulary for field in fields if field.vocabulary})
+
+    lines = [
+        *MODULE_HEADER.format(schema_name=schema_name, class_name=class_name).splitlines(),
+        f'ns = XMLNamespace("{namespace}")',
+        "",
+        "TEXT = CCMMXMLParser.text_datatype",
+        "",
+        "# tags of the elements",
+        *(f"{constant_name(tag)} = ns.{tag}" for tag in tags),
+        "",
+        "# datatypes of the elements",
+        *(f'{constant_name(datatype)} = ns["{datatype}"]' for datatype in datatypes),
+        "",
+        "",
+        f"class {class_name}(CCMMXMLParser):",
+        f'    """Parser for CCMM XML generated from {schema_name}."""',
+        "",
+        "    ns = ns",
+        "",
+        "    def __init__(self, vocabulary_loader: VocabularyLoader):",
+        '        """Initialize the parser with the given vocabulary loader."""',
+        "        super().__init__(vocabulary_loader)",
+        "",
+        *(
+            f'        self.{vocabulary}_parser = self.register_vocabulary_parser("{vocabulary}")'
+            for vocabulary in vocabularies
+        ),
+        "",
+        "    @override",
+        "    def parse(self, xml_root: Element) -> dict[str, Any]:",
+        '        """Parse the root element of the CCMM XML record."""',
+        f'        return {{"metadata": self.parse_{datatype_name(root_type)}(xml_root, [])}}',
+    ]
+    for schema_type in generated_types:
+        lines.append("")
+        lines.extend(render_type_parser(schema_type))
+    return "\n".join(lines) + "\n"
+
+
+def render_type_parser(schema_type: SchemaType) -> list[str]:
+    """Render the parser method of a complex type."""
+    lines = [
+        "    @datatype_parser()",
+        f"    def parse_{schema_type.datatype}(self, el: Element, path: list[QualifiedTag]) -> dict[str, Any]:",
+        f'        """Parse an element of type {schema_type.name}."""',
+    ]
+    if schema_type.simple_content:
+        lines.append("        return {")
+        lines.append('            "value": self.parse_text_content(el, path),')
+        lines.extend(
+            f'            "{snake_case(attribute)}": el.get("{attribute}"),' for attribute in schema_type.attributes
+        )
+        lines.append("        }")
+        return lines
+
+    lines.append("        children = self.children(el)")
+    lines.append("        ret: dict[str, Any] = {}")
+    for field in schema_type.fields:
+        lines.extend(render_field(field))
+    lines.append("        return ret")
+    return lines
+
+
+def render_field(field: SchemaField) -> list[str]:
+    """Render parsing of a field, optional fields are parsed only if their element is present."""
+    tag = constant_name(field.element)
+    if field.kind in ("multilingual", "i18n"):
+        cardinality = field.cardinality
+        if field.kind == "multilingual" and cardinality.endswith("array"):
+            # multilingual field is a single list of all the language variants
+            cardinality = "single" if field.required else "optional"
+        call = f'self.parse_{field.kind}({tag}, children, path, cardinality="{cardinality}")'
+    else:
+        if field.kind == "vocabulary":
+            datatype = f"self.{field.vocabulary}_parser"
+        elif field.kind == "datatype":
+            datatype = constant_name(field.datatype or "")
+        else:
+            datatype = "TEXT"
+        call = f"self.parse_{field.cardinality}_field({tag}, children, path, {datatype})"
+
+    if field.required:
+        return render_assignment("        ", field.key, call)
+    return [f"        if {tag} in children:", *render_assignment("            ", field.key, call)]
+
+
+def render_assignment(indent: str, key: str, call: str) -> list[str]:
+    """Render assignment of the call result to ret[key], wrapping the arguments if the line is too long."""
+    line = f'{indent}ret["{key}"] = {call}'
+    if len(line) <= MAX_LINE_LENGTH:
+        return [line]
+    function, _, arguments = call.partition("(")
+    return [
+        f'{indent}ret["{key}"] = {function}(',
+        f"{indent}    {arguments.removesuffix(')')}",
+        f"{indent})",
+    ]
+
+
+MODULE_HEADER = '''#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""{class_name} - parser for CCMM XML generated from {schema_name}.
+
+Generated by ccmm_invenio/parsers/generate_xsd_parser.py, do not edit.
+"""
+
+# parsers of types with many optional fields have a branch for each of them
+# ruff: noqa: C901, PLR0912
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, override
+
+from ccmm_invenio.parsers.base import CCMMXMLParser, QualifiedTag, VocabularyLoader, XMLNamespace, datatype_parser
+
+if TYPE_CHECKING:
+    from lxml.etree import _Element as Element
+
+'''
+
+if __name__ == "__main__":
+    generate_xsd_parser()
@@ -30,20 +30,24 @@ Notes:
    an exception should be raised.
 5. do not leave null values in dictionaries or lists - remove them using
     remove_empty_from_dict and remove_empty_from_list methods.
+6. heavy dependencies (langdetect, pycountry, invenio services) are imported
+   inside the methods that need them, so that importing the parser (which is
+   done by the model presets on every application start) stays cheap.
+7. parts of the record that can be converted to the RDM format on their own are
+   converted by convert_* methods marked with @datatype_converter, right after
+   they are parsed. Only conversions that need several parts of the record
+   (publication date, creators, ...) are done on the whole parsed metadata.
 
 """
 
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, override
 
-import langdetect
-import pycountry
-from invenio_access.permissions import system_identity
-from invenio_vocabularies.proxies import current_service as vocabulary_service
 from lxml import etree  # pyright: ignore[reportAttributeAccessIssue]
 
+from .base import datatype_converter
 from .nma_1_1_0 import CCMMXMLNMAParser
 
 if TYPE_CHECKING:
@@ -63,6 +67,8 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
 
     def lang2_to_lang3(self, lang_obj: dict) -> dict:
         """Convert lang2 code to lang3."""
+        import pycountry
+
         lang2 = lang_obj.get("id", "").lower()
         lang = pycountry.languages.get(alpha_2=lang2)
 
@@ -71,10 +77,22 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
 
         return {"id": lang.alpha_3.upper()}
 
+    @override
+    def collect_vocabulary_terms(self, xml_root: Element) -> None:
+        """Run only the NMA part of the parsing and request the license of the terms of use.
+
+        The license is the only vocabulary term looked up by the conversions.
+        """
+        metadata = super().parse(xml_root)["metadata"]
+        self.license_id(metadata.get("terms_of_use"))
+
     def parse(self, xml_root: Element) -> dict[str, Any]:
         """Parse the root element of the CCMM XML record.
 
-        The convert methods used below transform the metadata dictionary in-place.
+        Items of the dataset that can be converted on their own (identifiers, titles,
+        descriptions, subjects, fundings, related resources and locations) are converted
+        to the RDM format by datatype converters while they are parsed. The convert methods
+        used below then transform the metadata dictionary in-place.
         """
         xml_string = etree.tostring(
             xml_root,
@@ -89,8 +107,6 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
         self.convert_additional_titles(metadata)
         self.convert_additional_descriptions(metadata)
 
-        self.convert_metadata_identifiers(metadata)
-
         qualified_relations = metadata.pop("qualified_relations", [])
         qualified_relations = self.convert_publisher(metadata, qualified_relations)
         qualified_relations = self.convert_creators(metadata, qualified_relations)
@@ -105,7 +121,6 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
 
         self.convert_funding(metadata)
 
-        self.convert_related_resources(metadata)
         self.convert_resource_type(metadata)
         self.convert_languages(metadata)
 
@@ -153,79 +168,78 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
 
     from typing import Any
 
-    def convert_locations(self, metadata: dict[str, Any]) -> None:  # noqa: PLR0912, C901
-        """Convert locations from old format to RDMLocations (without geometry)."""
-        locations = metadata.pop("locations", [])
-        if not locations:
-            return
+    def convert_locations(self, metadata: dict[str, Any]) -> None:
+        """Wrap the locations (converted by convert_location) into RDMLocations."""
+        features = metadata.pop("locations", [])
+        if features:
+            metadata["locations"] = {"features": features}
+
+    @datatype_converter("ccmmlocation")
+    def convert_location(self, loc: dict[str, Any]) -> dict[str, Any]:  # noqa: C901
+        """Convert a location from NMA format to a feature of RDMLocations."""
+        place = None
+        # or???
+        names = loc.get("names", [])
+        if isinstance(names, list) and names:
+            place = names[0]
+
+        related_objects = loc.get("related_objects", []) or []
+        if not place and related_objects:
+            place = related_objects[0].get("title")
+
+        identifiers = []
+        for ro in related_objects:
+            iri = ro.get("iri")
+            if iri:
+                identifiers.append(
+                    {
+                        "scheme": "iri",
+                        "identifier": iri,
+                    }
+                )
 
-        converted_features = []
-        for loc in locations:
-            place = None
-            # or???
-            names = loc.get("names", [])
-            if isinstance(names, list) and names:
-                place = names[0]
-
-            related_objects = loc.get("related_objects", []) or []
-            if not place and related_objects:
-                place = related_objects[0].get("title")
-
-            identifiers = []
-            for ro in related_objects:
-                iri = ro.get("iri")
-                if iri:
-                    identifiers.append(
-                        {
-                            "scheme": "iri",
-                            "identifier": iri,
-                        }
-                    )
-
-            geometry_value = None
-
-            geom_container = loc.get("geometry", {}) or {}
-            raw_geom = geom_container.get("geometry")
-            if isinstance(raw_geom, dict) and raw_geom.get("type") and raw_geom.get("coordinates") is not None:
-                geometry_value = raw_geom
-
-            if geometry_value is None:
-                bboxes = loc.get("bounding_boxes", []) or []
-                if bboxes:
-                    bbox = bboxes[0]
-                    lower = bbox.get("lowerCorner")
-                    upper = bbox.get("upperCorner")
-                    if lower and upper:
-                        minx, miny = lower
-                        maxx, maxy = upper
-
-                        geometry_value = {
-                            "type": "Polygon",
-                            "coordinates": [
-                                [
-                                    [minx, miny],
-                                    [maxx, miny],
-                                    [maxx, maxy],
-                                    [minx, maxy],
-                                    [minx, miny],
-                                ]
-                            ],
-                        }
-            relation_type = loc.get("relation_type", {})
-
-            converted_feature = {}
-            if place:
-                converted_feature["place"] = place
-            if identifiers:
-                converted_feature["identifiers"] = identifiers
-            if geometry_value:
-                converted_feature["geometry"] = geometry_value
-            if relation_type:
-                converted_feature["description"] = relation_type["id"]
-
-            converted_features.append(converted_feature)
-
-        metadata["locations"] = {"features": converted_features}
+        geometry_value = None
+
+        geom_container = loc.get("geometry", {}) or {}
+        raw_geom = geom_container.get("geometry")
+        if isinstance(raw_geom, dict) and raw_geom.get("type") and raw_geom.get("coordinates") is not None:
+            geometry_value = raw_geom
+
+        if geometry_value is None:
+            bboxes = loc.get("bounding_boxes", []) or []
+            if bboxes:
+                bbox = bboxes[0]
+                lower = bbox.get("lowerCorner")
+                upper = bbox.get("upperCorner")
+                if lower and upper:
+                    minx, miny = lower
+                    maxx, maxy = upper
+
+                    geometry_value = {
+                        "type": "Polygon",
+                        "coordinates": [
+                            [
+                                [minx, miny],
+                                [maxx, miny],
+                                [maxx, maxy],
+                                [minx, maxy],
+                                [minx, miny],
+                            ]
+                        ],
+                    }
+        relation_type = loc.get("relation_type", {})
+
+        converted_feature = {}
+        if place:
+            converted_feature["place"] = place
+        if identifiers:
+            converted_feature["identifiers"] = identifiers
+        if geometry_value:
+            converted_feature["geometry"] = geometry_value
+        if relation_type:
+            converted_feature["description"] = relation_type["id"]
+
+        return converted_feature
 
     def convert_time_references(self, metadata: dict[str, Any]) -> None:
         """Convert time_references to RDM dates."""
@@ -241,8 +255,8 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
             temporal = ref.get("temporal_representation", {}) or {}
 
             time_instant = temporal.get("time_instant")
-            if isinstance(time_instant, dict) and time_instant.get("date_time"):
-                dt = time_instant.get("date_time")
+            if isinstance(time_instant, dict):
+                dt = time_instant.get("date_time") or time_instant.get("date")
                 if dt:
                     date_value = dt.split("T", 1)[0]
 
@@ -264,32 +278,34 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
         if converted_dates:
             metadata["dates"] = converted_dates
 
+    def license_id(self, terms_of_use: dict[str, Any] | None) -> str | None:
+        """Return the id of the license of the terms of use in the licenses vocabulary.
+
+        None is returned if the license is not there or can not be looked up (for example
+        the licenses vocabulary does not exist), the license is then stored as a link.
+        The license is optional, so a failed lookup must not fail the import of the dataset.
+        """
+        iri = (terms_of_use or {}).get("license", {}).get("iri")
+        if not iri:
+            return None
+        # TODO: add IRIs to the licenses vocabularies
+        try:
+            return self.vocabulary_id("licenses", iri)
+        except KeyError:
+            log.debug("License %s not found in the licenses vocabulary", iri)
+        except Exception:
+            log.warning("Lookup of license %s failed, it is stored as a link", iri, exc_info=True)
+        return None
+
     def convert_terms_of_use(self, metadata: dict[str, Any]) -> None:
-        """Convert terms_of_use to RDM dates."""
+        """Convert terms_of_use to RDM rights."""
         terms_of_use = metadata.pop("terms_of_use", None)
 
         if terms_of_use is not None:
-            hits = None
-            # TODO: add IRIs to the licenses vocabularies
-            try:
-                hits = vocabulary_service.search(
-                    identity=system_identity,
-                    type="licenses",
-                    params={"q": f'props.iri:"{terms_of_use["license"]["iri"]}"'},
-                )
-            except Exception as e:  # noqa: BLE001
-                log.debug(
-                    "License vocabulary lookup failed for iri=%s: %s",
-                    terms_of_use.get("license", {}).get("iri"),
-                    e,
-                )
-            if hits and hits.total is not None and hits.total > 0:
-                voc = next(hits.hits)
-                _id = voc["id"]
-
-                metadata["rights"] = [{"id": _id}]
+            license_id = self.license_id(terms_of_use)
+            if license_id is not None:
+                metadata["rights"] = [{"id": license_id}]
             else:
-                # TODO: now this will always ended up here
                 link = terms_of_use["license"]["iri"]
                 labels = terms_of_use["license"]["label"]
                 title = {}
@@ -305,20 +321,22 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
         if not alternate_titles:
             return
 
-        # in NMA, it is a list of alternate_title_type and title which has lang and value
-        # in RDM, it is a list of title, type and lang
+        # each alternate title has already been converted to a list of titles by convert_alternate_title
+        metadata["additional_titles"] = [title for titles in alternate_titles for title in titles]
 
-        converted_additional_titles = []
-        for title in alternate_titles:
-            for title_with_lang in title.get("title", []):
-                converted_title = {
-                    "title": title_with_lang.get("value"),
-                    "type": title.get("alternate_title_type"),
-                    "lang": self.lang2_to_lang3(title_with_lang.get("lang")),
-                }
-                converted_additional_titles.append(converted_title)
-
-        metadata["additional_titles"] = converted_additional_titles
+    @datatype_converter("ccmmalternatetitle", path=["alternate_title"])
+    def convert_alternate_title(self, title: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert an alternate title from NMA format to a list of RDM additional titles."""
+        # in NMA, it is alternate_title_type and title which has lang and value
+        # in RDM, it is a list of title, type and lang
+        return [
+            {
+                "title": title_with_lang.get("value"),
+                "type": title.get("alternate_title_type"),
+                "lang": self.lang2_to_lang3(title_with_lang.get("lang")),
+            }
+            for title_with_lang in title.get("title", [])
+        ]
 
     def convert_provenances(self, metadata: dict[str, Any]) -> None:
         """Remove provenances."""
@@ -335,46 +353,41 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
         if not descriptions:
             return
 
-        # in NMA, it is a list of description_type and description_text which has lang and value
-        # in RDM, it is a list of description, type and lang
-
-        converted_additional_descriptions = []
-        for desc in descriptions:
-            for desc_with_lang in desc.get("description_text", []):
-                converted_desc = {
-                    "description": desc_with_lang.get("value"),
-                    "type": desc.get("description_type"),
-                    "lang": self.lang2_to_lang3(desc_with_lang.get("lang")),
-                }
-                converted_additional_descriptions.append(converted_desc)
+        # each description has already been converted to a list of descriptions by convert_description
+        metadata["additional_descriptions"] = [desc for descs in descriptions for desc in descs]
 
-        metadata["additional_descriptions"] = converted_additional_descriptions
-
-    def convert_metadata_identifiers(self, metadata: dict[str, Any]) -> None:
-        """Convert identifiers from NMA format to RDM format."""
-        identifiers = metadata.pop("identifiers", [])
-        converted_identifiers = self.convert_identifiers(identifiers)
-        if converted_identifiers:
-            metadata["identifiers"] = converted_identifiers
+    @datatype_converter("ccmmdescription", path=["description"])
+    def convert_description(self, desc: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert a description from NMA format to a list of RDM additional descriptions."""
+        # in NMA, it is description_type and description_text which has lang and value
+        # in RDM, it is a list of description, type and lang
+        return [
+            {
+                "description": desc_with_lang.get("value"),
+                "type": desc.get("description_type"),
+                "lang": self.lang2_to_lang3(desc_with_lang.get("lang")),
+            }
+            for desc_with_lang in desc.get("description_text", [])
+        ]
 
     def convert_identifiers(self, identifiers: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Convert identifiers from NMA format to RDM format."""
-        if not identifiers:
-            return []
+        return [self.convert_identifier(ident) for ident in identifiers]
 
-        # in NMA, it is a list of iri, value and scheme, scheme is a dictionary item with id
-        # in RDM, it is a list of identifier (string), scheme (string), iri is not present
-        # note: iri has been converted to the id and checked, so we know that the scheme exists
-
-        converted_identifiers = []
-        for ident in identifiers:
-            converted_ident = {
-                "identifier": ident.get("value"),
-                "scheme": ident.get("scheme", {}).get("id"),
-            }
-            converted_identifiers.append(converted_ident)
+    @datatype_converter("ccmmidentifier", path=["identifier"])
+    def convert_identifier(self, ident: dict[str, Any]) -> dict[str, Any]:
+        """Convert an identifier from NMA format to RDM format.
 
-        return converted_identifiers
+        Identifiers of the dataset are converted while parsed, other identifiers
+        (of persons, organizations, ...) are converted together with their owners.
+        """
+        # in NMA, it is iri, value and scheme, scheme is a dictionary item with id
+        # in RDM, it is identifier (string), scheme (string), iri is not present
+        # note: iri has been converted to the id and checked, so we know that the scheme exists
+        return {
+            "identifier": ident.get("value"),
+            "scheme": ident.get("scheme", {}).get("id"),
+        }
 
     def convert_resource_type(self, metadata: dict[str, Any]) -> None:
         """Convert resource type from NMA format to RDM format."""
@@ -608,34 +621,32 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
 
         subjects = metadata.pop("subjects", [])
 
+        # each subject has already been converted to a list of subjects by convert_subject
+        if subjects:
+            metadata["subjects"] = [subj for subjs in subjects for subj in subjs]
+
+    @datatype_converter("ccmmsubject", path=["subject"])
+    def convert_subject(self, subj: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert a subject from NMA format to a list of RDM subjects (one per title translation)."""
         # as invenio ids for subjects must be unique accross subject schemes,
         # we can not map classification_code alone to id
         # what we do is to prepend the scheme id to the classification_code
         # to create a unique id
-
-        converted_subjects = []
-        for subj in subjects:
-            classification_code = subj.get("classification_code")
-            subject_scheme = subj.get("subject_scheme", {}).get("id")
-            multilingual_title = subj.get("title", [])
-            vocabulary_id = (
-                f"{subject_scheme}:{classification_code}" if classification_code and subject_scheme else None
-            )
-            for translated_title in multilingual_title:
-                converted_subj = (
-                    {
-                        "id": vocabulary_id,
-                        "subject": translated_title.get("value"),
-                    }
-                    if vocabulary_id
-                    else {
-                        "subject": translated_title.get("value"),
-                    }
-                )
-                converted_subjects.append(converted_subj)
-
-        if subjects:
-            metadata["subjects"] = converted_subjects
+        classification_code = subj.get("classification_code")
+        subject_scheme = subj.get("subject_scheme", {}).get("id")
+        multilingual_title = subj.get("title", [])
+        vocabulary_id = f"{subject_scheme}:{classification_code}" if classification_code and subject_scheme else None
+        return [
+            {
+                "id": vocabulary_id,
+                "subject": translated_title.get("value"),
+            }
+            if vocabulary_id
+            else {
+                "subject": translated_title.get("value"),
+            }
+            for translated_title in multilingual_title
+        ]
 
     def convert_funding(self, metadata: dict[str, Any]) -> None:
         """Convert funding from NMA format to RDM format."""
@@ -644,88 +655,84 @@ class CCMMXMLProductionParser(CCMMXMLNMAParser):
         # where funding_program is an IRI
         # in RDM, funding is a a list of funder (id and name)
         # and award, which has title, number, id and identifiers
-
         fundings = metadata.pop("funding_references", [])
-        converted_fundings: list[dict[str, Any]] = []
-        for fund in fundings:
-            funders = fund.get("funders", [])
-            converted_funders = []
-            for funder in funders:
-                organization = funder.get("organization", {})
-                person = funder.get("person", {})
-                if organization:
-                    funder_name = organization.get("name")
-                    funder_id = self.get_affiliation_by_identifiers(organization.get("identifiers", []))
-                    converted_funders.append(
-                        {
-                            "id": funder_id,
-                            "name": funder_name,
-                        }
-                        if funder_id
-                        else {
-                            "name": funder_name,
-                        }
-                    )
-                elif person:
-                    # not correct, will get errors later
-                    # but user will know that something was wrong
-                    converted_funders.append(person)
-            award_title = fund.get("award_title")
-            local_identifier = fund.get("local_identifier")
-            # TODO: CCMM's award title is not multilingual, but we need a multilingual title in RDM
-            lang = langdetect.detect(award_title) if award_title else "en"
-            if not lang:
-                lang = "en"  # fallback to english
-            award = {
-                "title": {lang: award_title},
-                "number": local_identifier,
-            }
-            converted_fundings.extend(
-                {
-                    "funder": f,
-                    "award": award,
-                }
-                for f in converted_funders
-            )
+        # each funding reference has already been converted to a list of fundings by convert_funding_reference
+        converted_fundings = [funding for funds in fundings for funding in funds]
         if converted_fundings:
             metadata["funding"] = converted_fundings
 
-    def convert_related_resources(self, metadata: dict[str, Any]) -> None:
-        """Convert related_resources to CCMMInvenioRelatedResource format."""
-        related_resources = metadata.pop("related_resources", [])
-        if not related_resources:
-            return
-
-        converted_resources = []
-        for res in related_resources:
-            title = res.get("title", None)
-            resource_type = res.get("resource_type", None)
-            relation_type = res.get("resource_relation_type", None)
-
-            identifiers = []
-            seen = set()
-
-            iri = res.get("iri", None)
-            if iri and iri not in seen:
-                identifiers.append({"identifier": iri})
-                seen.add(iri)
-
-            resource_url = res.get("resource_url", None)
-            if resource_url and resource_url not in seen:
-                identifiers.append({"identifier": resource_url})
-                seen.add(resource_url)
-
-            converted_resource = {
-                "title": title,
-                "identifiers": identifiers,
+    @datatype_converter("ccmmfundingreference", path=["funding_reference"])
+    def convert_funding_reference(self, fund: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert a funding reference from NMA format to a list of RDM fundings (one per funder)."""
+        import langdetect
+
+        funders = fund.get("funders", [])
+        converted_funders = []
+        for funder in funders:
+            organization = funder.get("organization", {})
+            person = funder.get("person", {})
+            if organization:
+                funder_name = organization.get("name")
+                funder_id = self.get_affiliation_by_identifiers(organization.get("identifiers", []))
+                converted_funders.append(
+                    {
+                        "id": funder_id,
+                        "name": funder_name,
+                    }
+                    if funder_id
+                    else {
+                        "name": funder_name,
+                    }
+                )
+            elif person:
+                # not correct, will get errors later
+                # but user will know that something was wrong
+                converted_funders.append(person)
+        award_title = fund.get("award_title")
+        local_identifier = fund.get("local_identifier")
+        # TODO: CCMM's award title is not multilingual, but we need a multilingual title in RDM
+        lang = langdetect.detect(award_title) if award_title else "en"
+        if not lang:
+            lang = "en"  # fallback to english
+        award = {
+            "title": {lang: award_title},
+            "number": local_identifier,
+        }
+        return [
+            {
+                "funder": f,
+                "award": award,
             }
-            if relation_type:
-                converted_resource["relation_type"] = relation_type
-            if resource_type:
-                converted_resource["resource_type"] = resource_type
-
-            if converted_resource:
-                converted_resources.append(converted_resource)
+            for f in converted_funders
+        ]
+
+    @datatype_converter("ccmmrelatedresource", path=["related_resource"])
+    def convert_related_resource(self, res: dict[str, Any]) -> dict[str, Any]:
+        """Convert a related resource of the dataset to CCMMInvenioRelatedResource format."""
+        title = res.get("title")
+        resource_type = res.get("resource_type")
+        relation_type = res.get("resource_relation_type")
+
+        identifiers = []
+        seen = set()
+
+        iri = res.get("iri")
+        if iri and iri not in seen:
+            identifiers.append({"identifier": iri})
+            seen.add(iri)
+
+        resource_url = res.get("resource_url")
+        if resource_url and resource_url not in seen:
+            identifiers.append({"identifier": resource_url})
+            seen.add(resource_url)
+
+        converted_resource = {
+            "title": title,
+            "identifiers": identifiers,
+        }
+        if relation_type:
+            converted_resource["relation_type"] = relation_type
+        if resource_type:
+            converted_resource["resource_type"] = resource_type
 
-        if converted_resources:
-            metadata["related_resources"] = converted_resources
+        return converted_resource
@@ -0,0 +1,161 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Registry of parsers for different versions of CCMM XML.
+
+Releases of CCMM are distinguished by the namespace of the root element
+(see ccmm_versions/ccmm-xml-releases), a release may be further distinguished
+by the version attribute of the root element. The registry maps these to parser
+classes, so that the parser of a record is found by a single dictionary lookup.
+
+Each parser class is instantiated only once, when the first record of its version
+is parsed, and the instance is reused for all the following records. Parsers do not
+keep any state between records; a vocabulary loader specific to a batch of records
+is passed to the parse call instead.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from lxml import etree
+
+from .base import ParseError, XMLNamespace
+
+if TYPE_CHECKING:
+    from lxml.etree import _Element as Element
+
+    from .base import CCMMXMLParser, VocabularyLoader
+
+# namespaces of the CCMM releases that are read by the 1.1.0 parsers
+CCMM_NAMESPACES = (
+    # 1.0.1 up to 1.1.0-2025-11-03
+    "https://schema.ccmm.cz/research-data/1.0",
+    # 1.1.0-2026-01-29
+    "https://schema.ccmm.cz/research-data/1.1",
+)
+
+# size of the pieces of a serialized record read when looking for the root element
+DETECTION_CHUNK_SIZE = 1024
+
+type VersionKey = tuple[str, str | None]
+
+
+class UnsupportedVersionError(ParseError):
+    """Raised when there is no parser for the namespace and version of the root element."""
+
+
+class CCMMParserRegistry:
+    """Parsers of CCMM XML records selected by the namespace and version of the root element."""
+
+    def __init__(self, vocabulary_loader: VocabularyLoader):
+        """Initialize an empty registry, parsers will be created with the given vocabulary loader."""
+        self.vocabulary_loader = vocabulary_loader
+        self._parser_classes: dict[VersionKey, type[CCMMXMLParser]] = {}
+        self._parsers: dict[VersionKey, CCMMXMLParser] = {}
+
+    def register(
+        self,
+        parser_class: type[CCMMXMLParser],
+        namespace: str | None = None,
+        version: str | None = None,
+    ) -> None:
+        """Register a parser class for records in the given namespace.
+
+        :param parser_class: class of the parser
+        :param namespace: namespace of the root element, the namespace of the parser class by default.
+                          If it differs from the namespace of the parser class, a subclass reading
+                          elements from this namespace is registered instead.
+        :param version: value of the version attribute of the root element, None for any version
+        """
+        if namespace is None:
+            namespace = parser_class.ns.uri
+        elif namespace != parser_class.ns.uri:
+            parser_class = parser_class_for_namespace(parser_class, namespace)
+        self._parser_classes[namespace, version] = parser_class
+        # parsers of more specific versions might have fallen back to the previous registration
+        for key in [key for key in self._parsers if key[0] == namespace]:
+            del self._parsers[key]
+
+    def detect_version(self, data: bytes) -> VersionKey:
+        """Return the namespace and version of the root element, reading only its start tag.
+
+        The data are fed to the parser in small chunks and the parsing stops as soon
+        as the start tag of the root element has been read.
+        """
+        parser = etree.XMLPullParser(events=("start",))
+        for start in range(0, len(data), DETECTION_CHUNK_SIZE):
+            parser.feed(data[start : start + DETECTION_CHUNK_SIZE])
+            for _event, el in parser.read_events():
+                return root_version(el)
+        raise ParseError("Document without a root element")
+
+    def parser_for_data(self, data: bytes) -> CCMMXMLParser:
+        """Return the parser for a serialized record without parsing more than its root element.
+
+        Raises UnsupportedVersionError if there is no parser for the record.
+        """
+        return self.get_parser(*self.detect_version(data))
+
+    def parser_for(self, xml_root: Element) -> CCMMXMLParser:
+        """Return the parser for the given root element.
+
+        Raises UnsupportedVersionError if there is no parser for the element.
+        """
+        return self.get_parser(*root_version(xml_root))
+
+    def get_parser(self, namespace: str, version: str | None = None) -> CCMMXMLParser:
+        """Return the parser for the given namespace and version, creating it on the first call.
+
+        Versions without a registration of their own fall back to the registration for any version
+        and share its parser, so the cache holds at most one parser per registration.
+        """
+        key: VersionKey = (namespace, version)
+        parser = self._parsers.get(key)
+        if parser is None:
+            if key not in self._parser_classes and version is not None:
+                key = (namespace, None)
+                parser = self._parsers.get(key)
+                if parser is not None:
+                    return parser
+            parser_class = self._parser_classes.get(key)
+            if parser_class is None:
+                raise UnsupportedVersionError(
+                    f"Unsupported CCMM XML version: namespace '{namespace}', version '{version}'"
+                )
+            parser = self._parsers[key] = parser_class(vocabulary_loader=self.vocabulary_loader)
+        return parser
+
+    def parse(self, xml_root: Element, vocabulary_loader: VocabularyLoader | None = None) -> dict[str, Any]:
+        """Parse the root element with the parser of its version.
+
+        :param xml_root: root element of the record
+        :param vocabulary_loader: loader used instead of the loader of the registry for this record
+        """
+        parser = self.parser_for(xml_root)
+        if vocabulary_loader is None:
+            return parser.parse(xml_root)
+        return parser.parse_with_loader(xml_root, vocabulary_loader)
+
+
+def root_version(xml_root: Element) -> VersionKey:
+    """Return the namespace and the version attribute of the root element."""
+    return etree.QName(xml_root).namespace or "", xml_root.get("version")
+
+
+def parser_class_for_namespace(parser_class: type[CCMMXMLParser], namespace: str) -> type[CCMMXMLParser]:
+    """Return a subclass of the parser class that reads elements from the given namespace."""
+    return type(
+        parser_class.__name__,
+        (parser_class,),
+        {
+            "ns": XMLNamespace(namespace),
+            "__module__": parser_class.__module__,
+            "__doc__": f"{parser_class.__doc__} Reads elements from {namespace}.",
+        },
+    )
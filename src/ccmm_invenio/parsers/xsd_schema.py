@@ -0,0 +1,311 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Model of the merged CCMM XML Schema.
+
+The complex types of the schema are read into SchemaType and SchemaField instances.
+The model drives both the parser generator (generate_xsd_parser.py) and the CCMM XML
+serializer, which reads it at runtime.
+
+Names of the fields follow the conventions of the invenio model - repeatable
+elements are pluralized. Vocabularies can not be recognized from the schema,
+so the types representing vocabularies are listed in VOCABULARY_TYPES and the few
+places where the invenio model deviates from the schema are listed in FIELD_OVERRIDES.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import logging
+from typing import TYPE_CHECKING, Any, Literal
+
+from lxml import etree
+
+from ccmm_invenio.parsers.base import CCMMXMLParser
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from lxml.etree import _Element as Element
+
+log = logging.getLogger(__name__)
+
+XS_NAMESPACE = "http://www.w3.org/2001/XMLSchema"
+XS = f"{{{XS_NAMESPACE}}}"
+GML_NAMESPACE = "http://www.opengis.net/gml/3.2"
+
+# complex type of the schema => vocabulary type
+VOCABULARY_TYPES = {
+    "access_rights": "accessrights",
+    "alternate_title_type": "titletypes",
+    "checksum_algorithm": "checksumalgorithms",
+    "date_type": "datetypes",
+    "description_type": "descriptiontypes",
+    "format": "fileformats",
+    "identifier_scheme": "identifierschemes",
+    "language_system": "languages",
+    "media_type": "mediatypes",
+    "relation_type": "locationrelationtypes",
+    "resource_agent_role_type": "resourceagentroletypes",
+    "resource_relation_type": "resourcerelationtypes",
+    "resource_type": "resourcetypes",
+    "subject_scheme": "subjectschemes",
+}
+
+# simple types of XML Schema => parser datatype, None for text
+XSD_DATATYPES: dict[str, str | None] = {
+    "string": None,
+    "anyURI": None,
+    "hexBinary": None,
+    "boolean": "boolean",
+    "date": "date",
+    "dateTime": "datetime",
+    "double": "double",
+    "gYear": "int",
+    "int": "int",
+    "integer": "long",
+    "long": "long",
+}
+
+# (complex type, element) => properties of the field that differ from the schema
+# in the invenio model (see models/<version>/ccmm.yaml)
+FIELD_OVERRIDES: dict[tuple[str, str], dict[str, Any]] = {
+    ("application_profile", "iri"): {"required": False},
+    ("application_profile", "label"): {"required": True},
+    ("checksum", "checksum_value"): {"required": False},
+    ("data_service", "iri"): {"required": False},
+    ("distribution_data_service", "title"): {"required": False},
+    ("distribution_downloadable_file", "title"): {"required": False},
+    ("metadata_record", "conforms_to_standard"): {"required": False},
+    ("metadata_record", "date_updated"): {"array": False},
+    ("organization", "alternate_name"): {"kind": "i18n"},
+    ("time_reference", "date_type"): {"required": False},
+    ("time_reference", "date_information"): {"kind": "i18n"},
+}
+
+# prefix of datatypes of complex types defined in the schema
+DATATYPE_PREFIX = "ccmm"
+
+type FieldKind = Literal["text", "multilingual", "i18n", "vocabulary", "datatype"]
+
+
+@dataclasses.dataclass
+class SchemaField:
+    """Element of a complex type and the way it is parsed."""
+
+    element: str
+    """Local name of the element."""
+    kind: FieldKind
+    required: bool
+    array: bool
+    datatype: str | None = None
+    """Registered datatype of the element if kind is "datatype"."""
+    vocabulary: str | None = None
+    """Vocabulary type of the element if kind is "vocabulary"."""
+    choice: int | None = None
+    """Elements with the same choice number are alternatives (of an xs:choice)."""
+
+    @property
+    def key(self) -> str:
+        """Name of the field in the parsed record, repeatable elements are pluralized."""
+        if self.array and self.kind != "multilingual":
+            return pluralize(self.element)
+        return self.element
+
+    @property
+    def cardinality(self) -> Literal["single", "optional", "array", "optional_array"]:
+        """Cardinality of the field, as used by CCMMXMLParser.parse_field."""
+        if self.array:
+            return "array" if self.required else "optional_array"
+        return "single" if self.required else "optional"
+
+
+@dataclasses.dataclass
+class SchemaType:
+    """Complex type of the schema, either named or anonymous type of an element."""
+
+    name: str
+    datatype: str
+    fields: list[SchemaField] = dataclasses.field(default_factory=list)
+    simple_content: bool = False
+    """True if the type has a text content (xs:simpleContent), the attributes are then in attributes."""
+    attributes: list[str] = dataclasses.field(default_factory=list)
+    generate: bool = True
+    """False if the type is parsed by CCMMXMLParser itself."""
+
+
+@dataclasses.dataclass
+class Schema:
+    """Complex types of the schema that are parsed, by their datatype."""
+
+    target_namespace: str
+    types: dict[str, SchemaType]
+
+
+def load_schema(xsd_file: str | Path) -> Schema:
+    """Load complex types of the schema with their fields."""
+    parser = etree.XMLParser(remove_blank_text=True, remove_comments=True)
+    root = etree.parse(xsd_file, parser).getroot()
+    target_namespace = root.get("targetNamespace", "")
+
+    types: dict[str, SchemaType] = {}
+    for ct in root.iterchildren(f"{XS}complexType"):
+        name = ct.get("name")
+        if not name or name in VOCABULARY_TYPES:
+            continue
+        load_complex_type(name, ct, target_namespace, types)
+    return Schema(target_namespace=target_namespace, types=dict(sorted(types.items())))
+
+
+def load_complex_type(name: str, ct: Element, target_namespace: str, types: dict[str, SchemaType]) -> SchemaType:
+    """Load a named or anonymous complex type and add it (and anonymous types of its elements) to types."""
+    schema_type = SchemaType(
+        name=name,
+        datatype=datatype_name(name),
+    )
+    schema_type.generate = not hasattr(CCMMXMLParser, f"parse_{schema_type.datatype}")
+    types[schema_type.datatype] = schema_type
+
+    extension = ct.find(f"{XS}simpleContent/{XS}extension")
+    if extension is not None:
+        schema_type.simple_content = True
+        schema_type.attributes = [
+            attribute.get("name", "") for attribute in extension.iterchildren(f"{XS}attribute") if attribute.get("name")
+        ]
+        return schema_type
+
+    content = ct
+    complex_content = ct.find(f"{XS}complexContent")
+    if complex_content is not None:
+        content = complex_content
+    choices = itertools.count()
+    for particle in content:
+        if particle.tag in (f"{XS}sequence", f"{XS}choice"):
+            load_particle(schema_type, particle, target_namespace, types, choices, None)
+    return schema_type
+
+
+def load_particle(  # noqa: PLR0913, PLR0917 - recursive walk over the content model
+    schema_type: SchemaType,
+    particle: Element,
+    target_namespace: str,
+    types: dict[str, SchemaType],
+    choices: Iterator[int],
+    choice: int | None,
+) -> None:
+    """Load elements of an xs:sequence or xs:choice, elements of a choice are optional."""
+    if particle.tag == f"{XS}choice":
+        choice = next(choices)
+    for child in particle:
+        if child.tag in (f"{XS}sequence", f"{XS}choice"):
+            load_particle(schema_type, child, target_namespace, types, choices, choice)
+        elif child.tag == f"{XS}element":
+            if child.get("ref"):
+                log.warning(
+                    "Skipping element reference %s in %s, it must be handled by a hand-written parser",
+                    child.get("ref"),
+                    schema_type.name,
+                )
+                continue
+            schema_type.fields.append(load_field(schema_type, child, target_namespace, types, choice))
+
+
+def load_field(
+    schema_type: SchemaType,
+    element: Element,
+    target_namespace: str,
+    types: dict[str, SchemaType],
+    choice: int | None,
+) -> SchemaField:
+    """Create the field for an element of the complex type."""
+    name = element.get("name", "")
+    max_occurs = element.get("maxOccurs", "1")
+    field = SchemaField(
+        element=name,
+        kind="text",
+        required=element.get("minOccurs", "1") != "0" and choice is None,
+        array=max_occurs == "unbounded" or int(max_occurs) > 1,
+        choice=choice,
+    )
+
+    type_name = element.get("type")
+    if type_name is None:
+        anonymous_type = element.find(f"{XS}complexType")
+        if anonymous_type is None:
+            # anonymous simple type (a restriction of a string) or no type at all
+            pass
+        elif is_multilingual(anonymous_type):
+            field.kind = "multilingual"
+        else:
+            field.kind = "datatype"
+            field.datatype = load_complex_type(name, anonymous_type, target_namespace, types).datatype
+    else:
+        load_named_type(field, element, type_name, schema_type.name, target_namespace)
+
+    for attr, value in FIELD_OVERRIDES.get((schema_type.name, name), {}).items():
+        setattr(field, attr, value)
+    return field
+
+
+def load_named_type(
+    field: SchemaField, element: Element, type_name: str, parent_type: str, target_namespace: str
+) -> None:
+    """Set kind and datatype (or vocabulary) of the field from the named type of its element."""
+    type_namespace, type_localname = resolve_qname(element, type_name)
+    if type_namespace == XS_NAMESPACE:
+        if type_localname not in XSD_DATATYPES:
+            raise ValueError(f"Unsupported type {type_name} of element {field.element} in {parent_type}")
+        field.datatype = XSD_DATATYPES[type_localname]
+        if field.datatype is not None:
+            field.kind = "datatype"
+    elif type_namespace == target_namespace and type_localname in VOCABULARY_TYPES:
+        field.kind = "vocabulary"
+        field.vocabulary = VOCABULARY_TYPES[type_localname]
+    elif type_namespace == target_namespace:
+        field.kind = "datatype"
+        field.datatype = datatype_name(type_localname)
+    elif type_namespace == GML_NAMESPACE:
+        field.kind = "datatype"
+        field.datatype = "gml" + type_localname.lower()
+    else:
+        raise ValueError(f"Unsupported type {type_name} of element {field.element} in {parent_type}")
+
+
+def datatype_name(type_name: str) -> str:
+    """Return the name of the datatype the parser of a complex type of the schema is registered for."""
+    return DATATYPE_PREFIX + type_name.replace("_", "").replace("-", "").lower()
+
+
+def resolve_qname(element: Element, qname: str) -> tuple[str | None, str]:
+    """Resolve a prefixed name (such as xs:string) to a namespace and local name."""
+    prefix, _, localname = qname.rpartition(":")
+    return element.nsmap.get(prefix or None), localname
+
+
+def is_multilingual(ct: Element) -> bool:
+    """Check if the anonymous complex type is a string with xml:lang attribute."""
+    extension = ct.find(f"{XS}simpleContent/{XS}extension")
+    if extension is None or extension.get("base") not in ("xs:string", "xsd:string"):
+        return False
+    return any(attr.get("ref") == "xml:lang" for attr in extension.iterchildren(f"{XS}attribute"))
+
+
+def pluralize(name: str) -> str:
+    """Return the plural of an element name (or of its last word)."""
+    if name.endswith(("s", "x", "z", "ch", "sh")):
+        return name + "es"
+    if name.endswith("y") and name[-2:-1] not in ("a", "e", "i", "o", "u"):
+        return name[:-1] + "ies"
+    return name + "s"
+
+
+def snake_case(name: str) -> str:
+    """Convert a camelCase attribute name to snake_case."""
+    return "".join(f"_{c.lower()}" if c.isupper() else c for c in name).lstrip("_")
@@ -10,10 +10,14 @@
 
 from __future__ import annotations
 
+from .nma.ccmm_xml import CCMMNMAXMLSerializer_1_1_0
 from .nma.datacite import CCMMNMADataCiteJSONSerializer_1_1_0
+from .production.ccmm_xml import CCMMProductionXMLSerializer_1_1_0
 from .production.datacite import CCMMProductionDataCiteJSONSerializer_1_1_0
 
 __all__ = [
     "CCMMNMADataCiteJSONSerializer_1_1_0",
+    "CCMMNMAXMLSerializer_1_1_0",
     "CCMMProductionDataCiteJSONSerializer_1_1_0",
+    "CCMMProductionXMLSerializer_1_1_0",
 ]
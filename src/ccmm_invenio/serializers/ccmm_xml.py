@@ -0,0 +1,392 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Streaming CCMM XML serialization.
+
+Records are written by the incremental XML writer of lxml (etree.xmlfile) directly
+into the output, without building element trees. A list of records is serialized
+to an iterator of byte chunks, one chunk per record, so that a page of results
+is streamed to the client record by record.
+
+CCMMXMLWriter writes metadata in the form returned by the NMA parser (elements
+of the schema mapped to fields of the same name, repeatable elements pluralized).
+It is driven by the complex types that xsd_schema.py reads from the merged schema,
+that is by the same type metadata the parser is generated from.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from abc import abstractmethod
+from functools import cache, partial
+from importlib.resources import files
+from typing import TYPE_CHECKING, Any
+
+from flask import has_request_context, stream_with_context
+from flask_resources.serializers import BaseSerializer
+from lxml import etree
+
+from ccmm_invenio.parsers.base import CachingVocabularyLoader
+from ccmm_invenio.parsers.xsd_schema import XSD_DATATYPES, datatype_name, load_schema, snake_case
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from lxml.etree import _IncrementalFileWriter as IncrementalWriter
+
+    from ccmm_invenio.parsers.base import VocabularyLoader
+    from ccmm_invenio.parsers.xsd_schema import Schema, SchemaField
+
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+XML_LANG = f"{{{XML_NAMESPACE}}}lang"
+GML_NAMESPACE = "http://www.opengis.net/gml/3.2"
+
+# merged schema of the CCMM version written by the serializers
+CCMM_SCHEMA = "ccmm-1.1.0-2026-01-29.xsd"
+
+# datatypes of the parser that are written as a text content of the element
+TEXT_DATATYPES = frozenset(datatype for datatype in XSD_DATATYPES.values() if datatype is not None)
+
+type ItemWriter = Callable[[IncrementalWriter, str, Any, VocabularyLoader], None]
+
+
+@cache
+def ccmm_schema() -> Schema:
+    """Load the complex types of the CCMM schema, only once per process."""
+    return load_schema(str(files("ccmm_invenio.schemas") / CCMM_SCHEMA))
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class FieldWriter:
+    """Writer of a single field of a complex type, prepared for the type once."""
+
+    key: str
+    """Key of the field in the metadata."""
+    tag: str
+    """Tag of the element in the lxml notation."""
+    array: bool
+    """True if the value is a list of items, each written as a separate element."""
+    write_item: ItemWriter
+    empty_if_missing: bool = False
+    """Write an empty element if the value is missing (the parser drops empty required elements)."""
+
+
+class CCMMXMLWriter:
+    """Writer of CCMM metadata (in the form returned by the NMA parser) as CCMM XML."""
+
+    def __init__(self, schema: Schema, namespace: str | None = None, root_type: str = "dataset"):
+        """Initialize the writer.
+
+        :param schema: complex types of the schema, see xsd_schema.load_schema
+        :param namespace: namespace of the written elements, target namespace of the schema by default
+        :param root_type: name of the complex type of the root element (and name of the root element)
+        """
+        self.schema = schema
+        self.namespace = namespace or schema.target_namespace
+        # etree.xmlfile binds the xml namespace to a generated prefix if it is not declared
+        self.nsmap = {None: self.namespace, "gml": GML_NAMESPACE, "xml": XML_NAMESPACE}
+        self.root_tag = self.tag(root_type)
+        self.root_datatype = datatype_name(root_type)
+        self._field_writers: dict[str, list[FieldWriter]] = {}
+
+    def tag(self, name: str) -> str:
+        """Return the tag of an element of the CCMM namespace."""
+        return f"{{{self.namespace}}}{name}"
+
+    def write(
+        self,
+        xf: IncrementalWriter,
+        metadata: dict[str, Any],
+        iri_loader: VocabularyLoader,
+    ) -> None:
+        """Write the metadata as the root element.
+
+        :param xf: incremental writer created by etree.xmlfile
+        :param metadata: metadata of the record
+        :param iri_loader: called with vocabulary type and id of a vocabulary item, returns its IRI
+        """
+        with xf.element(self.root_tag, nsmap=self.nsmap):
+            self.write_fields(xf, self.field_writers(self.root_datatype), metadata, iri_loader)
+
+    def write_fields(
+        self,
+        xf: IncrementalWriter,
+        field_writers: Iterable[FieldWriter],
+        value: dict[str, Any],
+        iri_loader: VocabularyLoader,
+    ) -> None:
+        """Write fields of a complex type in the order of the schema."""
+        for field_writer in field_writers:
+            item = value.get(field_writer.key)
+            if item is None:
+                if field_writer.empty_if_missing:
+                    with xf.element(field_writer.tag):
+                        pass
+                continue
+            if field_writer.array:
+                for array_item in item:
+                    field_writer.write_item(xf, field_writer.tag, array_item, iri_loader)
+            else:
+                field_writer.write_item(xf, field_writer.tag, item, iri_loader)
+
+    def field_writers(self, datatype: str) -> list[FieldWriter]:
+        """Return writers of the fields of the complex type, they are prepared on the first call."""
+        field_writers = self._field_writers.get(datatype)
+        if field_writers is None:
+            field_writers = self._field_writers[datatype] = [
+                self.make_field_writer(field) for field in self.schema.types[datatype].fields
+            ]
+        return field_writers
+
+    def make_field_writer(self, field: SchemaField) -> FieldWriter:
+        """Prepare the writer of the field, so that its kind is not checked for each written value."""
+        write_item: ItemWriter
+        empty_if_missing = False
+        if field.kind == "multilingual":
+            write_item = self.write_multilingual
+        elif field.kind == "i18n":
+            write_item = self.write_i18n
+        elif field.kind == "vocabulary":
+            write_item = partial(self.write_vocabulary, vocabulary_type=field.vocabulary)
+        elif field.kind == "datatype" and field.datatype in TEXT_DATATYPES:
+            write_item = self.write_text
+        elif field.kind == "datatype":
+            assert field.datatype is not None  # noqa: S101 - set for all datatype fields
+            write_item = getattr(self, f"write_{field.datatype}", None) or partial(
+                self.write_complex,
+                datatype=field.datatype,
+            )
+            empty_if_missing = field.required
+        else:
+            write_item = self.write_text
+        return FieldWriter(
+            key=field.key,
+            tag=self.tag(field.element),
+            # multilingual fields are lists even if the element is not repeatable
+            array=field.array or field.kind == "multilingual",
+            write_item=write_item,
+            empty_if_missing=empty_if_missing,
+        )
+
+    #
+    # Writers of a single element
+    #
+    def write_text(
+        self,
+        xf: IncrementalWriter,
+        tag: str,
+        value: Any,
+        iri_loader: VocabularyLoader,  # noqa: ARG002
+    ) -> None:
+        """Write a text element, booleans and numbers are converted to their xml schema representation."""
+        with xf.element(tag):
+            if isinstance(value, bool):
+                xf.write("true" if value else "false")
+            else:
+                xf.write(str(value))
+
+    def write_multilingual(
+        self,
+        xf: IncrementalWriter,
+        tag: str,
+        value: dict[str, Any],
+        iri_loader: VocabularyLoader,  # noqa: ARG002
+    ) -> None:
+        """Write an item of a multilingual field, {"lang": {"id": ...}, "value": ...}."""
+        with xf.element(tag, {XML_LANG: value["lang"]["id"]}):
+            xf.write(value["value"])
+
+    def write_i18n(
+        self,
+        xf: IncrementalWriter,
+        tag: str,
+        value: dict[str, Any],
+        iri_loader: VocabularyLoader,  # noqa: ARG002
+    ) -> None:
+        """Write an i18n string, {"lang": ..., "value": ...}."""
+        with xf.element(tag, {XML_LANG: value["lang"]}):
+            xf.write(value["value"])
+
+    def write_vocabulary(
+        self,
+        xf: IncrementalWriter,
+        tag: str,
+        value: dict[str, Any],
+        iri_loader: VocabularyLoader,
+        *,
+        vocabulary_type: str,
+    ) -> None:
+        """Write a vocabulary item as an element with its IRI."""
+        iri = value.get("props", {}).get("iri") or iri_loader(vocabulary_type, value["id"])
+        with xf.element(tag), xf.element(self.tag("iri")):
+            xf.write(iri)
+
+    def write_complex(
+        self,
+        xf: IncrementalWriter,
+        tag: str,
+        value: dict[str, Any],
+        iri_loader: VocabularyLoader,
+        *,
+        datatype: str,
+    ) -> None:
+        """Write an element of a complex type of the schema."""
+        schema_type = self.schema.types[datatype]
+        if schema_type.simple_content:
+            attributes = {
+                attribute: value[snake_case(attribute)]
+                for attribute in schema_type.attributes
+                if value.get(snake_case(attribute)) is not None
+            }
+            with xf.element(tag, attributes):
+                xf.write(value.get("value", ""))
+            return
+        with xf.element(tag):
+            self.write_fields(xf, self.field_writers(datatype), value, iri_loader)
+
+    def write_ccmmgeometry(
+        self,
+        xf: IncrementalWriter,
+        tag: str,
+        value: dict[str, Any],
+        iri_loader: VocabularyLoader,
+    ) -> None:
+        """Write a geometry element, the gml geometry is kept in the metadata as a serialized xml."""
+        field_writers = self.field_writers("ccmmgeometry")
+        # the gml geometry is placed before the wkt element in the schema
+        split = [field_writer.key for field_writer in field_writers].index("wkt")
+        with xf.element(tag):
+            self.write_fields(xf, field_writers[:split], value, iri_loader)
+            if value.get("geometry"):
+                xf.write(etree.fromstring(value["geometry"]))
+            self.write_fields(xf, field_writers[split:], value, iri_loader)
+
+    def write_gmlenvelopetype(
+        self,
+        xf: IncrementalWriter,
+        tag: str,
+        value: dict[str, Any],
+        iri_loader: VocabularyLoader,  # noqa: ARG002
+    ) -> None:
+        """Write a gml envelope, the corners are lists of coordinates."""
+        with xf.element(tag):
+            for corner in ("lowerCorner", "upperCorner"):
+                with xf.element(f"{{{GML_NAMESPACE}}}{corner}"):
+                    xf.write(" ".join(str(coordinate) for coordinate in value[corner]))
+
+
+class ChunkBuffer:
+    """File-like object collecting the output of etree.xmlfile until it is taken."""
+
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self.chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        """Append data written by etree.xmlfile."""
+        self.chunks.append(data)
+
+    def take(self) -> bytes:
+        """Return the collected data and empty the buffer."""
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_xml_list[T](
+    items: Iterable[T],
+    write_item: Callable[[IncrementalWriter, T], None],
+    list_tag: str,
+    nsmap: dict[str | None, str] | None = None,
+) -> Iterator[bytes]:
+    """Write items inside a list element, yield the output after each item is written.
+
+    :param items: items to write
+    :param write_item: writes a single item to the incremental writer
+    :param list_tag: tag of the root element containing the items
+    :param nsmap: namespaces declared on the root element
+    """
+    buffer = ChunkBuffer()
+    with etree.xmlfile(buffer, encoding="utf-8") as xf:
+        xf.write_declaration()
+        with xf.element(list_tag, nsmap=nsmap):
+            for item in items:
+                write_item(xf, item)
+                xf.flush()
+                yield buffer.take()
+    yield buffer.take()
+
+
+def write_xml(write: Callable[[IncrementalWriter], None]) -> bytes:
+    """Write a single xml document and return it."""
+    buffer = ChunkBuffer()
+    with etree.xmlfile(buffer, encoding="utf-8") as xf:
+        xf.write_declaration()
+        write(xf)
+    return buffer.take()
+
+
+class CCMMXMLSerializer(BaseSerializer):
+    """Base class of CCMM XML serializers, a list of records is streamed record by record.
+
+    The list is serialized as a "datasets" element with a dataset element for each record,
+    the format accepted by batch import (see CCMMProductionDeserializer.deserialize_batch).
+    """
+
+    # namespace of the written elements and of the datasets element of a list
+    namespace = "https://schema.ccmm.cz/research-data/1.1"
+
+    def __init__(self, iri_loader: VocabularyLoader | None = None):
+        """Create the serializer.
+
+        :param iri_loader: returns the IRI of a vocabulary item given its vocabulary type and id,
+                           results are cached for each serialized object or list
+        """
+        self.iri_loader = iri_loader
+
+    @abstractmethod
+    def write_record(self, xf: IncrementalWriter, obj: dict[str, Any], iri_loader: VocabularyLoader) -> None:
+        """Write the dataset element of a record."""
+
+    def serialize_object(self, obj: dict[str, Any]) -> bytes:
+        """Serialize a single record to CCMM XML."""
+        iri_loader = CachingVocabularyLoader(self.iri_loader or invenio_vocabulary_iri_loader)
+        return write_xml(lambda xf: self.write_record(xf, obj, iri_loader))
+
+    def serialize_object_list(self, obj_list: dict[str, Any]) -> Iterator[bytes]:
+        """Serialize a list of records, the output is generated while the response is sent."""
+        iri_loader = CachingVocabularyLoader(self.iri_loader or invenio_vocabulary_iri_loader)
+        chunks = stream_xml_list(
+            obj_list["hits"]["hits"],
+            lambda xf, obj: self.write_record(xf, obj, iri_loader),
+            f"{{{self.namespace}}}datasets",
+            nsmap={None: self.namespace},
+        )
+        # vocabulary lookups need the application context while the response is streamed
+        return stream_with_context(chunks) if has_request_context() else chunks
+
+
+def invenio_vocabulary_iri_loader(vocabulary_type: str, vocabulary_id: str) -> str:
+    """Return IRI of a vocabulary item, the inverse of models.invenio_vocabulary_loader."""
+    from invenio_access.permissions import system_identity
+    from invenio_vocabularies.proxies import current_service as vocabulary_service
+
+    if vocabulary_type == "resourcerelationtypes":
+        vocabulary_type = "relationtypes"
+
+    # mediatypes are stored by their IRI
+    if vocabulary_type == "mediatypes":
+        return vocabulary_id
+    if vocabulary_type == "fileformats":
+        vocabulary_type = "filetypes"
+
+    item = vocabulary_service.read(system_identity, (vocabulary_type, vocabulary_id)).to_dict()
+    iri = item.get("props", {}).get("iri")
+    if not iri:
+        raise KeyError(f"vocabulary item {vocabulary_id} of {vocabulary_type} has no iri")
+    return str(iri)
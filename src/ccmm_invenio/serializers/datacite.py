@@ -0,0 +1,466 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Parts shared by the DataCite serializers of CCMM records.
+
+DataCite codes of vocabulary items are taken from the ``datacite`` property of the
+CCMM vocabularies (see the fixtures). Geolocations are converted from GeoJSON features
+of production records and from bounding boxes and gml geometries of NMA records.
+
+DataCite JSON of a record is generated on every export, so the exported documents are
+cached for each revision of a record (and of its parent). Unchanged records are then
+served from the cache without running the marshmallow schema again. dump_obj, which the
+DOI providers call (also for the parent record, with the DOIs of all its versions),
+always runs the schema.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, override
+
+from flask import has_request_context, stream_with_context
+from flask_resources import BaseListSchema, MarshmallowSerializer
+from flask_resources.serializers import JSONSerializer
+from lxml import etree
+
+from ccmm_invenio.parsers.base import CachingVocabularyLoader
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping, Sequence
+
+    from lxml.etree import _Element as Element
+    from marshmallow import Schema
+
+    from ccmm_invenio.parsers.base import VocabularyLoader
+
+# number of serialized records kept in the revision cache
+DATACITE_CACHE_SIZE = 1024
+
+# keys of a serialized list of records besides the hits, in the order of BaseListSchema
+LIST_KEYS = ("aggregations", "links", "sortBy")
+
+GML_NAMESPACE = "http://www.opengis.net/gml/3.2"
+
+# reference systems of gml geometries that can be converted to DataCite geolocations,
+# mapped to True if the coordinates are in the latitude, longitude order
+WGS84_SRS_NAMES = {
+    "http://www.opengis.net/def/crs/EPSG/0/4326": True,
+    "urn:ogc:def:crs:EPSG::4326": True,
+    "http://www.opengis.net/def/crs/OGC/1.3/CRS84": False,
+    "urn:ogc:def:crs:OGC:1.3:CRS84": False,
+}
+
+# vocabulary types of the CCMM model that are stored under a different name in invenio
+INVENIO_VOCABULARY_TYPES = {"resourcerelationtypes": "relationtypes"}
+
+# CCMM title types do not have the datacite property, DataCite title types are a closed list
+TITLE_TYPES = {
+    "alternativetitle": "AlternativeTitle",
+    "subtitle": "Subtitle",
+    "translatedtitle": "TranslatedTitle",
+    "other": "Other",
+}
+
+
+def invenio_datacite_code_loader(vocabulary_type: str, vocabulary_id: str) -> str:
+    """Return the DataCite code of a vocabulary item, raise KeyError if it does not have one."""
+    from invenio_access.permissions import system_identity
+    from invenio_pidstore.errors import PIDDoesNotExistError
+    from invenio_vocabularies.proxies import current_service as vocabulary_service
+
+    vocabulary_type = INVENIO_VOCABULARY_TYPES.get(vocabulary_type, vocabulary_type)
+    try:
+        item = vocabulary_service.read(system_identity, (vocabulary_type, vocabulary_id)).to_dict()
+    except PIDDoesNotExistError as e:
+        raise KeyError(f"vocabulary item {vocabulary_id} of {vocabulary_type} not found") from e
+    code = item.get("props", {}).get("datacite")
+    if not code:
+        raise KeyError(f"vocabulary item {vocabulary_id} of {vocabulary_type} has no datacite code")
+    return str(code)
+
+
+def invenio_datacite_codes(items: Iterable[tuple[str, str]]) -> dict[tuple[str, str], str]:
+    """Return the DataCite codes of vocabulary items, all items of a vocabulary type are read at once.
+
+    Items without a DataCite code are left out of the returned dictionary.
+    """
+    from invenio_access.permissions import system_identity
+    from invenio_vocabularies.proxies import current_service as vocabulary_service
+
+    ids_by_type: dict[str, set[str]] = defaultdict(set)
+    for vocabulary_type, vocabulary_id in items:
+        ids_by_type[vocabulary_type].add(vocabulary_id)
+
+    codes: dict[tuple[str, str], str] = {}
+    for vocabulary_type, ids in ids_by_type.items():
+        result = vocabulary_service.read_many(
+            system_identity, INVENIO_VOCABULARY_TYPES.get(vocabulary_type, vocabulary_type), sorted(ids)
+        )
+        for item in result.hits:
+            code = item.get("props", {}).get("datacite")
+            if code:
+                codes[vocabulary_type, item["id"]] = str(code)
+    return codes
+
+
+@lru_cache(maxsize=256)
+def datacite_language(language: str | None) -> str | None:
+    """Convert a language code of a record (ISO 639-1 or 639-3) to the code used by DataCite."""
+    if not language or language.lower() in ("und", "zxx"):
+        return None
+    if len(language) == 3:  # noqa: PLR2004 - ISO 639-3 code
+        import pycountry
+
+        lang = pycountry.languages.get(alpha_3=language.lower())
+        if lang is not None and hasattr(lang, "alpha_2"):
+            return str(lang.alpha_2)
+    return language.lower()
+
+
+class DataCiteCodesMixin:
+    """Mixin for DataCite schemas that looks up DataCite codes of vocabulary items.
+
+    The codes are resolved by the code loader passed to the schema,
+    invenio_datacite_code_loader by default.
+    """
+
+    def __init__(self, *args: Any, code_loader: VocabularyLoader | None = None, **kwargs: Any):
+        """Create the schema with the given loader of DataCite codes."""
+        super().__init__(*args, **kwargs)
+        self.code_loader = code_loader or invenio_datacite_code_loader
+
+    def datacite_code(
+        self, vocabulary_type: str, item: Mapping[str, Any] | None, default: str | None = None
+    ) -> str | None:
+        """Return the DataCite code of a vocabulary item ({"id": ...}) or the default if it has none."""
+        if not item or not item.get("id"):
+            return default
+        try:
+            return self.code_loader(vocabulary_type, item["id"])
+        except KeyError:
+            return default
+
+    def vocabulary_items(self, obj: Mapping[str, Any]) -> Iterator[tuple[str, Mapping[str, Any] | None]]:
+        """Return the vocabulary types and items ({"id": ...}) whose DataCite codes the schema looks up.
+
+        Used to resolve the codes of a whole page of records at once. Items that are not listed
+        here are still looked up, just one by one.
+        """
+        raise NotImplementedError
+
+    def title_type(self, item: Mapping[str, Any] | None) -> str | None:
+        """Return the DataCite title type of a title type vocabulary item."""
+        title_type = self.datacite_code("titletypes", item)
+        if title_type is None and item and item.get("id"):
+            title_type = TITLE_TYPES.get(item["id"].replace("-", "").lower())
+        return title_type
+
+
+def geolocation_point(longitude: float, latitude: float) -> dict[str, str]:
+    """Return a DataCite point, the DataCite 4.3 JSON schema types the coordinates as strings."""
+    return {"pointLongitude": str(longitude), "pointLatitude": str(latitude)}
+
+
+def geolocation_box(west: float, south: float, east: float, north: float) -> dict[str, str]:
+    """Return a DataCite box, the DataCite 4.3 JSON schema types the bounds as strings."""
+    return {
+        "westBoundLongitude": str(west),
+        "eastBoundLongitude": str(east),
+        "southBoundLatitude": str(south),
+        "northBoundLatitude": str(north),
+    }
+
+
+def ring_box(ring: Sequence[Sequence[float]]) -> dict[str, str] | None:
+    """Return the box of a closed ring if the ring is a rectangle aligned with the axes.
+
+    Bounding boxes of CCMM locations are stored as such rectangles in production records.
+    """
+    if len(ring) != 5 or list(ring[0]) != list(ring[4]):  # noqa: PLR2004 - four corners of a closed ring
+        return None
+    longitudes = {position[0] for position in ring}
+    latitudes = {position[1] for position in ring}
+    if len(longitudes) != 2 or len(latitudes) != 2:  # noqa: PLR2004 - two distinct values of each coordinate
+        return None
+    # each side of the rectangle changes only one of the coordinates
+    for start, end in itertools.pairwise(ring):
+        if start[0] != end[0] and start[1] != end[1]:
+            return None
+    return geolocation_box(min(longitudes), min(latitudes), max(longitudes), max(latitudes))
+
+
+def polygon_geolocation(ring: Sequence[Sequence[float]]) -> dict[str, Any]:
+    """Convert the exterior ring of a polygon (longitude, latitude positions) to a geolocation."""
+    box = ring_box(ring)
+    if box is not None:
+        return {"geoLocationBox": box}
+    return {"geoLocationPolygons": [{"polygonPoints": [geolocation_point(p[0], p[1]) for p in ring]}]}
+
+
+def geojson_geolocations(geometry: Mapping[str, Any] | None) -> list[dict[str, Any]]:
+    """Convert a GeoJSON geometry to DataCite geolocations, unsupported geometries are skipped."""
+    if not geometry:
+        return []
+    coordinates = geometry.get("coordinates")
+    points: list = []
+    polygons: list = []
+    match geometry.get("type"):
+        case "Point":
+            points = [coordinates]
+        case "MultiPoint":
+            points = coordinates
+        case "Polygon":
+            polygons = [coordinates]
+        case "MultiPolygon":
+            polygons = coordinates
+        case "GeometryCollection":
+            return [
+                geolocation for part in geometry.get("geometries", []) for geolocation in geojson_geolocations(part)
+            ]
+    return [{"geoLocationPoint": geolocation_point(point[0], point[1])} for point in points] + [
+        polygon_geolocation(polygon[0]) for polygon in polygons
+    ]
+
+
+def gml_positions(el: Element, lat_lon: bool) -> list[tuple[float, float]]:
+    """Return the (longitude, latitude) positions inside the gml element."""
+    values = [
+        float(value)
+        for position in el.iter(f"{{{GML_NAMESPACE}}}pos", f"{{{GML_NAMESPACE}}}posList")
+        for value in (position.text or "").split()
+    ]
+    pairs = zip(values[::2], values[1::2], strict=False)
+    if lat_lon:
+        return [(longitude, latitude) for latitude, longitude in pairs]
+    return list(pairs)
+
+
+def gml_geolocations(gml: str | bytes | None) -> list[dict[str, Any]]:
+    """Convert gml points and polygons in WGS84 to DataCite geolocations.
+
+    Geometries in other reference systems are skipped, DataCite accepts only WGS84 coordinates.
+    """
+    if not gml:
+        return []
+    try:
+        el = etree.fromstring(gml)
+    except etree.XMLSyntaxError:
+        return []
+    lat_lon = WGS84_SRS_NAMES.get(el.get("srsName", ""))
+    if lat_lon is None:
+        return []
+    geolocations: list[dict[str, Any]] = [
+        {"geoLocationPoint": geolocation_point(*positions[0])}
+        for point in el.iter(f"{{{GML_NAMESPACE}}}Point")
+        if (positions := gml_positions(point, lat_lon))
+    ]
+    for polygon in el.iter(f"{{{GML_NAMESPACE}}}Polygon"):
+        exterior = polygon.find(f"{{{GML_NAMESPACE}}}exterior")
+        if exterior is not None and (ring := gml_positions(exterior, lat_lon)):
+            geolocations.append(polygon_geolocation(ring))
+    return geolocations
+
+
+def with_place(place: str | None, geolocations: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Add the place name to the first of the geolocations of a location."""
+    if not place:
+        return geolocations
+    if not geolocations:
+        return [{"geoLocationPlace": place}]
+    return [{"geoLocationPlace": place, **geolocations[0]}, *geolocations[1:]]
+
+
+class DataCiteRevisionCache:
+    """Cache of serialized DataCite documents keyed by the revision of a record.
+
+    The documents are stored as JSON strings, so every caller of get gets its own copy
+    that it may modify. The least recently used documents are dropped when the cache is full.
+    """
+
+    def __init__(self, maxsize: int = DATACITE_CACHE_SIZE):
+        """Create an empty cache."""
+        self.maxsize = maxsize
+        self.documents: OrderedDict[Hashable, str] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> dict[str, Any] | None:
+        """Return a copy of the cached document or None."""
+        serialized = self.get_serialized(key)
+        return json.loads(serialized) if serialized is not None else None
+
+    def get_serialized(self, key: Hashable) -> str | None:
+        """Return the cached document as a JSON string or None."""
+        with self.lock:
+            serialized = self.documents.get(key)
+            if serialized is not None:
+                self.documents.move_to_end(key)
+            return serialized
+
+    def put(self, key: Hashable, document: dict[str, Any]) -> str:
+        """Store the document, return it serialized to a JSON string."""
+        serialized = json.dumps(document)
+        with self.lock:
+            self.documents[key] = serialized
+            self.documents.move_to_end(key)
+            while len(self.documents) > self.maxsize:
+                self.documents.popitem(last=False)
+        return serialized
+
+    def clear(self) -> None:
+        """Drop all the cached documents."""
+        with self.lock:
+            self.documents.clear()
+
+
+datacite_cache = DataCiteRevisionCache()
+
+
+def revision_key(obj: Mapping[str, Any]) -> tuple[Any, ...] | None:
+    """Return the key of the revision of a dumped record.
+
+    The DataCite document contains the DOI and the communities of the parent record, which
+    change without a new revision of the record, so the key includes a digest of the parent.
+    Returns None if the record does not have an id or a revision id, such records are not cached.
+    """
+    record_id = obj.get("id")
+    revision_id = obj.get("revision_id")
+    if record_id is None or revision_id is None:
+        return None
+    # drafts and published records share the id, the update time tells them apart
+    parent = json.dumps(obj.get("parent"), sort_keys=True, default=str)
+    return (record_id, revision_id, str(obj.get("updated")), hashlib.sha256(parent.encode("utf-8")).hexdigest())
+
+
+type BulkCodeLoader = Callable[[Iterable[tuple[str, str]]], dict[tuple[str, str], str]]
+
+
+class CCMMDataCiteJSONSerializer(MarshmallowSerializer):
+    """Marshmallow based DataCite serializer caching the exported records by their revision.
+
+    A list of records is serialized with a single schema instance. DataCite codes of all the vocabulary
+    items referenced by the records are resolved at once before the records are dumped, and the JSON
+    is streamed record by record.
+    """
+
+    def __init__(
+        self,
+        object_schema_cls: type[Schema],
+        code_loader: VocabularyLoader | None = None,
+        bulk_code_loader: BulkCodeLoader | None = None,
+        **options: Any,
+    ):
+        """Create a new instance of the serializer.
+
+        :param object_schema_cls: DataCite schema of a single record
+        :param code_loader: returns the DataCite code of a vocabulary item given its vocabulary type and id
+        :param bulk_code_loader: returns the DataCite codes of many vocabulary items at once. If only
+                                 code_loader is given, the items of a list are looked up one by one.
+        """
+        super().__init__(
+            format_serializer_cls=JSONSerializer,
+            object_schema_cls=object_schema_cls,
+            list_schema_cls=BaseListSchema,
+            schema_kwargs={"code_loader": code_loader},
+            **options,
+        )
+        self.object_schema_cls = object_schema_cls
+        self.code_loader = code_loader or invenio_datacite_code_loader
+        if bulk_code_loader is None and code_loader is None:
+            bulk_code_loader = invenio_datacite_codes
+        self.bulk_code_loader = bulk_code_loader
+
+    def cache_key(self, obj: Mapping[str, Any]) -> tuple[Any, ...] | None:
+        """Return the key of the record in the revision cache."""
+        key = revision_key(obj)
+        return (self.object_schema_cls, self.code_loader, *key) if key is not None else None
+
+    @override
+    def serialize_object(self, obj: Mapping[str, Any]) -> str:
+        """Serialize a record, unchanged revisions are taken from the cache.
+
+        Pretty printed output (the prettyprint request argument) is not cached.
+        """
+        if self.format_serializer.dumps_options:
+            return super().serialize_object(obj)
+        return "".join(self.serialize_hits([obj]))
+
+    def page_code_loader(self, hits: Iterable[Mapping[str, Any]]) -> CachingVocabularyLoader:
+        """Return a code loader with the codes of all the vocabulary items referenced by the records."""
+        items = {
+            (vocabulary_type, item["id"])
+            for hit in hits
+            for vocabulary_type, item in self.object_schema.vocabulary_items(hit)
+            if item and item.get("id")
+        }
+        code_loader = CachingVocabularyLoader(self.code_loader)
+        if self.bulk_code_loader is not None and items:
+            codes = self.bulk_code_loader(items)
+            for item in items:
+                code_loader.resolved[item] = codes[item] if item in codes else KeyError(item)
+        return code_loader
+
+    def serialize_hits(self, hits: list[Mapping[str, Any]]) -> Iterator[str]:
+        """Serialize the records to JSON strings, records not found in the revision cache are dumped."""
+        keys = [self.cache_key(hit) for hit in hits]
+        cached = [datacite_cache.get_serialized(key) if key is not None else None for key in keys]
+        missing_hits = [hit for hit, serialized in zip(hits, cached, strict=True) if serialized is None]
+        if missing_hits:
+            schema = self.object_schema_cls(code_loader=self.page_code_loader(missing_hits))
+        for hit, key, serialized in zip(hits, keys, cached, strict=True):
+            if serialized is not None:
+                yield serialized
+                continue
+            document = schema.dump(hit)
+            yield datacite_cache.put(key, document) if key is not None else json.dumps(document)
+
+    @override
+    def dump_list(self, obj_list: Mapping[str, Any]) -> dict[str, Any]:
+        """Dump a page of records in the format of BaseListSchema."""
+        hits = obj_list["hits"]
+        ret: dict[str, Any] = {
+            "hits": {**hits, "hits": [json.loads(serialized) for serialized in self.serialize_hits(hits["hits"])]}
+        }
+        for key in LIST_KEYS:
+            if obj_list.get(key):
+                ret[key] = obj_list[key]
+        return ret
+
+    @override
+    def serialize_object_list(self, obj_list: Mapping[str, Any]) -> str | Iterator[str]:
+        """Serialize a page of records, the JSON is generated while the response is sent.
+
+        Pretty printed output (the prettyprint request argument) is not streamed.
+        """
+        if self.format_serializer.dumps_options:
+            return super().serialize_object_list(obj_list)
+        chunks = self.stream_list(obj_list)
+        # vocabulary lookups need the application context while the response is streamed
+        return stream_with_context(chunks) if has_request_context() else chunks
+
+    def stream_list(self, obj_list: Mapping[str, Any]) -> Iterator[str]:
+        """Write the JSON of a page of records, with a chunk for each of the records."""
+        encoder = self.format_serializer.encoder
+        hits = obj_list["hits"]
+        yield '{"hits": {"hits": ['
+        for index, serialized in enumerate(self.serialize_hits(hits["hits"])):
+            yield f", {serialized}" if index else serialized
+        yield "]"
+        for key, value in hits.items():
+            if key != "hits":
+                yield f", {json.dumps(key)}: {json.dumps(value, cls=encoder)}"
+        yield "}"
+        for key in LIST_KEYS:
+            if obj_list.get(key):
+                yield f", {json.dumps(key)}: {json.dumps(obj_list[key], cls=encoder)}"
+        yield "}"
@@ -0,0 +1,41 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""CCMM XML serializer for CCMM NMA records."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, override
+
+from ..ccmm_xml import CCMMXMLSerializer, CCMMXMLWriter, ccmm_schema
+
+if TYPE_CHECKING:
+    from lxml.etree import _IncrementalFileWriter as IncrementalWriter
+
+    from ccmm_invenio.parsers.base import VocabularyLoader
+
+
+class CCMMNMAXMLSerializer_1_1_0(CCMMXMLSerializer):  # noqa: N801
+    """CCMM XML serializer for records with metadata in the form returned by CCMMXMLNMAParser."""
+
+    def __init__(self, iri_loader: VocabularyLoader | None = None):
+        """Create the serializer, the schema is loaded when the first record is serialized."""
+        super().__init__(iri_loader)
+        self._writer: CCMMXMLWriter | None = None
+
+    @property
+    def writer(self) -> CCMMXMLWriter:
+        """Writer of the metadata."""
+        if self._writer is None:
+            self._writer = CCMMXMLWriter(ccmm_schema(), namespace=self.namespace)
+        return self._writer
+
+    @override
+    def write_record(self, xf: IncrementalWriter, obj: dict[str, Any], iri_loader: VocabularyLoader) -> None:
+        """Write the metadata of the record."""
+        self.writer.write(xf, obj["metadata"], iri_loader)
@@ -12,35 +12,347 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, override
 
-from flask_resources import BaseListSchema, MarshmallowSerializer
-from flask_resources.serializers import JSONSerializer
 from invenio_rdm_records.resources.serializers.datacite import DataCite43Schema
+from marshmallow import fields, missing
+
+from ..datacite import (
+    CCMMDataCiteJSONSerializer,
+    DataCiteCodesMixin,
+    datacite_language,
+    geolocation_box,
+    gml_geolocations,
+    with_place,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Iterator, Mapping
+
+    from ccmm_invenio.parsers.base import VocabularyLoader
+
+DOI_PREFIX = "https://doi.org/"
+ROR_PREFIX = "https://ror.org/"
 
 
-class CCMMNMADataCiteJSONSerializer_1_1_0(MarshmallowSerializer):  # noqa: N801
+class CCMMNMADataCiteJSONSerializer_1_1_0(CCMMDataCiteJSONSerializer):  # noqa: N801
     """Marshmallow based DataCite serializer for records."""
 
-    def __init__(self, **options: Any):
+    def __init__(self, code_loader: VocabularyLoader | None = None, **options: Any):
         """Create a new instance of the serializer."""
-        super().__init__(
-            format_serializer_cls=JSONSerializer,
-            object_schema_cls=NMADataCiteSchema,
-            list_schema_cls=BaseListSchema,
-            schema_kwargs={},
-            **options,
-        )
+        super().__init__(NMADataCiteSchema, code_loader=code_loader, **options)
+
+
+def translations(values: list[dict[str, Any]] | None) -> Iterator[tuple[str, str | None]]:
+    """Return the values and DataCite languages of a multilingual field."""
+    for value in values or []:
+        if value.get("value"):
+            yield value["value"], datacite_language(value.get("lang", {}).get("id"))
 
 
-class NMADataCiteSchema(DataCite43Schema):
-    """Schema for DataCite serialization of CCMM production records.
+def with_lang(item: dict[str, Any], lang: str | None) -> dict[str, Any]:
+    """Add the language to the item if it is known."""
+    if lang:
+        item["lang"] = lang
+    return item
 
-    TODO: this will not work correctly !!!
+
+def date_value(value: Mapping[str, Any] | None) -> str | None:
+    """Return the date or date time of a time instant."""
+    if not value:
+        return None
+    return value.get("date_time") or value.get("date")
+
+
+class NMADataCiteSchema(DataCiteCodesMixin, DataCite43Schema):
+    """Schema for DataCite serialization of CCMM NMA records.
+
+    Metadata of NMA records mirror the CCMM XML, so all the fields of DataCite43Schema
+    are mapped from the CCMM fields here. Creators, contributors and the publisher are
+    taken from the qualified relations of the dataset by their role.
     """
 
+    creators = fields.Method("get_creators")
+    contributors = fields.Method("get_contributors")
+    publisher = fields.Method("get_publisher")
+
+    @override
+    def vocabulary_items(self, obj: Mapping[str, Any]) -> Iterator[tuple[str, Mapping[str, Any] | None]]:
+        """Return the vocabulary items of the record that are mapped to DataCite codes."""
+        metadata = obj["metadata"]
+        yield "resourcetypes", metadata.get("resource_type")
+        for alternate_title in metadata.get("alternate_titles", []):
+            yield "titletypes", alternate_title.get("alternate_title_type")
+        for qualified_relation in metadata.get("qualified_relations", []):
+            yield "resourceagentroletypes", qualified_relation.get("role")
+            relation = qualified_relation.get("relation", {})
+            party = relation.get("person") or relation.get("organization") or {}
+            for identifier in party.get("identifiers", []):
+                yield "identifierschemes", identifier.get("scheme")
+        for time_reference in metadata.get("time_references", []):
+            yield "datetypes", time_reference.get("date_type")
+        for identifier in metadata.get("identifiers", []):
+            yield "identifierschemes", identifier.get("scheme")
+        for resource in metadata.get("related_resources", []):
+            yield "resourcerelationtypes", resource.get("resource_relation_type")
+            yield "resourcetypes", resource.get("resource_type")
+        for description in metadata.get("descriptions", []):
+            yield "descriptiontypes", description.get("description_type")
+
+    @override
+    def get_type(self, obj: Mapping[str, Any]) -> dict[str, str]:
+        """Get resource type."""
+        return {
+            "resourceTypeGeneral": self.datacite_code("resourcetypes", obj["metadata"].get("resource_type"), "Other"),
+        }
+
+    @override
+    def get_titles(self, obj: Mapping[str, Any]) -> list[dict[str, str]]:
+        """Get the title and all the translations of the alternate titles."""
+        metadata = obj["metadata"]
+        titles = [{"title": metadata["title"]}] if metadata.get("title") else []
+        for alternate_title in metadata.get("alternate_titles", []):
+            title_type = self.title_type(alternate_title.get("alternate_title_type"))
+            for value, lang in translations(alternate_title.get("title")):
+                title = with_lang({"title": value}, lang)
+                if title_type:
+                    title["titleType"] = title_type
+                titles.append(title)
+        return titles
+
+    def qualified_relations(self, obj: Mapping[str, Any], *roles: str, exclude: bool = False) -> Iterator[dict]:
+        """Return the qualified relations with (or without, if exclude is set) the given roles."""
+        for qualified_relation in obj["metadata"].get("qualified_relations", []):
+            if (qualified_relation.get("role", {}).get("id") in roles) != exclude:
+                yield qualified_relation
+
+    def creatibutor(self, qualified_relation: Mapping[str, Any]) -> dict[str, Any] | None:
+        """Convert the person or organization of a qualified relation to a DataCite creator."""
+        relation = qualified_relation.get("relation", {})
+        if person := relation.get("person"):
+            given_name = " ".join(person.get("given_names", []))
+            family_name = " ".join(person.get("family_names", []))
+            creatibutor: dict[str, Any] = {
+                "name": f"{family_name}, {given_name}" if family_name and given_name else person.get("name"),
+                "nameType": "Personal",
+            }
+            if given_name:
+                creatibutor["givenName"] = given_name
+            if family_name:
+                creatibutor["familyName"] = family_name
+            affiliations = [{"name": aff["name"]} for aff in person.get("affiliations", []) if aff.get("name")]
+            if affiliations:
+                creatibutor["affiliation"] = affiliations
+            identifiers = person.get("identifiers", [])
+        elif organization := relation.get("organization"):
+            creatibutor = {"name": organization.get("name"), "nameType": "Organizational"}
+            identifiers = organization.get("identifiers", [])
+        else:
+            return None
+        if not creatibutor["name"]:
+            return None
+
+        name_identifiers = [
+            {
+                "nameIdentifier": identifier.get("value") or identifier["iri"],
+                "nameIdentifierScheme": self.datacite_code(
+                    "identifierschemes", identifier["scheme"], identifier["scheme"]["id"].upper()
+                ),
+            }
+            for identifier in identifiers
+            if identifier.get("scheme") and (identifier.get("value") or identifier.get("iri"))
+        ]
+        if name_identifiers:
+            creatibutor["nameIdentifiers"] = name_identifiers
+        return creatibutor
+
+    def get_creators(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get creators, the qualified relations with the Creator role."""
+        creators = [self.creatibutor(qr) for qr in self.qualified_relations(obj, "Creator")]
+        return [creator for creator in creators if creator] or missing
+
+    def get_contributors(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get contributors, the qualified relations with roles other than Creator and Publisher."""
+        contributors = []
+        for qualified_relation in self.qualified_relations(obj, "Creator", "Publisher", exclude=True):
+            contributor = self.creatibutor(qualified_relation)
+            if contributor:
+                contributor["contributorType"] = self.datacite_code(
+                    "resourceagentroletypes", qualified_relation.get("role"), "Other"
+                )
+                contributors.append(contributor)
+        return contributors or missing
+
+    def get_publisher(self, obj: Mapping[str, Any]) -> str | Any:
+        """Get publisher, the names of the qualified relations with the Publisher role."""
+        names = []
+        for qualified_relation in self.qualified_relations(obj, "Publisher"):
+            relation = qualified_relation.get("relation", {})
+            publisher = relation.get("person") or relation.get("organization") or {}
+            if publisher.get("name"):
+                names.append(publisher["name"])
+        return ", ".join(names) or missing
+
+    @override
+    def get_publication_year(self, obj: Mapping[str, Any]) -> str | Any:
+        """Get publication year."""
+        publication_year = obj["metadata"].get("publication_year")
+        return str(publication_year) if publication_year is not None else missing
+
+    @override
+    def get_subjects(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get subjects, one for each translation of a subject title."""
+        subjects = []
+        for subject in obj["metadata"].get("subjects", []):
+            scheme = subject.get("subject_scheme", {}).get("id")
+            for value, lang in translations(subject.get("title")):
+                serialized = with_lang({"subject": value}, lang)
+                if scheme:
+                    serialized["subjectScheme"] = scheme
+                if subject.get("iri"):
+                    serialized["valueUri"] = subject["iri"]
+                subjects.append(serialized)
+        return subjects or missing
+
+    @override
+    def get_dates(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get dates from the time references, intervals are written as start/end."""
+        dates = []
+        for time_reference in obj["metadata"].get("time_references", []):
+            representation = time_reference.get("temporal_representation", {})
+            if "time_instant" in representation:
+                date = date_value(representation["time_instant"])
+            elif "time_interval" in representation:
+                interval = representation["time_interval"]
+                beginning = date_value(interval.get("beginning"))
+                end = date_value(interval.get("end"))
+                date = f"{beginning or ''}/{end or ''}" if beginning or end else None
+            else:
+                date = None
+            if date:
+                dates.append(
+                    {
+                        "date": date,
+                        "dateType": self.datacite_code("datetypes", time_reference.get("date_type"), "Other"),
+                    }
+                )
+        return dates or missing
+
+    @override
+    def get_language(self, obj: Mapping[str, Any]) -> str | Any:
+        """Get the primary language."""
+        return datacite_language(obj["metadata"].get("primary_language", {}).get("id")) or missing
+
+    @override
+    def get_identifiers(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get the DOI of the record and the identifiers of the dataset."""
+        identifiers = []
+        doi = obj.get("pids", {}).get("doi", {}).get("identifier")
+        if doi:
+            identifiers.append({"identifier": doi, "identifierType": "DOI"})
+        for identifier in obj["metadata"].get("identifiers", []):
+            value = identifier.get("value") or identifier.get("iri")
+            if not value or value == doi:
+                continue
+            scheme = identifier.get("scheme")
+            identifiers.append(
+                {
+                    "identifier": value,
+                    "identifierType": self.datacite_code(
+                        "identifierschemes", scheme, scheme["id"] if scheme else "URL"
+                    ),
+                }
+            )
+        return identifiers or missing
+
+    @override
+    def get_related_identifiers(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get related resources that have a relation type and an IRI or URL."""
+        related_identifiers = []
+        for resource in obj["metadata"].get("related_resources", []):
+            relation_type = self.datacite_code("resourcerelationtypes", resource.get("resource_relation_type"))
+            identifier = resource.get("iri") or resource.get("resource_url")
+            if not relation_type or not identifier:
+                continue
+            if identifier.startswith(DOI_PREFIX):
+                related = {"relatedIdentifier": identifier.removeprefix(DOI_PREFIX), "relatedIdentifierType": "DOI"}
+            else:
+                related = {"relatedIdentifier": identifier, "relatedIdentifierType": "URL"}
+            related["relationType"] = relation_type
+            resource_type = self.datacite_code("resourcetypes", resource.get("resource_type"))
+            if resource_type:
+                related["resourceTypeGeneral"] = resource_type
+            related_identifiers.append(related)
+        return related_identifiers or missing
+
+    @override
+    def get_rights(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get the license of the terms of use."""
+        license_document = obj["metadata"].get("terms_of_use", {}).get("license")
+        if not license_document:
+            return missing
+        label = next(translations(license_document.get("label")), None)
+        rights: dict[str, Any] = with_lang({"rights": label[0]}, label[1]) if label else {}
+        if license_document.get("iri"):
+            rights["rightsUri"] = license_document["iri"]
+        return [rights] if rights else missing
+
+    @override
+    def get_descriptions(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get descriptions, one for each translation of a description text."""
+        descriptions = []
+        for description in obj["metadata"].get("descriptions", []):
+            description_type = self.datacite_code("descriptiontypes", description.get("description_type"), "Other")
+            for value, lang in translations(description.get("description_text")):
+                descriptions.append(
+                    with_lang({"description": value, "descriptionType": description_type}, lang),
+                )
+        return descriptions or missing
+
+    @override
+    def get_locations(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get locations from the bounding boxes and WGS84 gml geometries of the locations."""
+        locations = []
+        for location in obj["metadata"].get("locations", []):
+            names = location.get("names", [])
+            related_objects = location.get("related_objects", [])
+            place = names[0] if names else (related_objects[0].get("title") if related_objects else None)
+            geolocations = [
+                {"geoLocationBox": geolocation_box(*bbox["lowerCorner"][:2], *bbox["upperCorner"][:2])}
+                for bbox in location.get("bounding_boxes", [])
+                if bbox.get("lowerCorner") and bbox.get("upperCorner")
+            ]
+            geolocations.extend(gml_geolocations(location.get("geometry", {}).get("geometry")))
+            locations.extend(with_place(place, geolocations))
+        return locations or missing
+
     @override
-    def get_locations(self, obj: Mapping[str, Any]) -> list:
-        """Get locations."""
-        return []
+    def get_funding(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get funding references, one for each funder of a funding reference."""
+        fundings = []
+        for funding_reference in obj["metadata"].get("funding_references", []):
+            award: dict[str, Any] = {}
+            if funding_reference.get("award_title"):
+                award["awardTitle"] = funding_reference["award_title"]
+            if funding_reference.get("local_identifier"):
+                award["awardNumber"] = funding_reference["local_identifier"]
+            if funding_reference.get("iri"):
+                award["awardUri"] = funding_reference["iri"]
+            for funder in funding_reference.get("funders", []):
+                organization = funder.get("organization") or {}
+                funder_party = organization or funder.get("person") or {}
+                if not funder_party.get("name"):
+                    continue
+                funding: dict[str, Any] = {"funderName": funder_party["name"]}
+                ror = next(
+                    (
+                        identifier.get("iri") or f"{ROR_PREFIX}{identifier['value']}"
+                        for identifier in organization.get("identifiers", [])
+                        if identifier.get("scheme", {}).get("id") == "ror" and identifier.get("value")
+                    ),
+                    None,
+                )
+                if ror:
+                    funding.update(funderIdentifier=ror, funderIdentifierType="ROR")
+                elif organization.get("iri"):
+                    funding.update(funderIdentifier=organization["iri"], funderIdentifierType="Other")
+                fundings.append({**funding, **award})
+        return fundings or missing
@@ -0,0 +1,318 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""CCMM XML serializer for CCMM production records.
+
+Metadata of production records are stored in the RDM format. The serializer converts
+the current metadata of the record back to the form returned by the NMA parser and
+writes it with CCMMXMLWriter, the writer of NMA records driven by the merged schema.
+
+Each convert_* method below is the inverse of the method of the same name in
+CCMMXMLProductionParser. Parts that the parser strips out (distributions, provenances,
+validation results) are not written. Geometries of locations are written as their
+bounding boxes, the parser converts bounding boxes to polygons.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING, Any, override
+from urllib.parse import urlsplit
+
+from ..nma.ccmm_xml import CCMMNMAXMLSerializer_1_1_0
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from lxml.etree import _IncrementalFileWriter as IncrementalWriter
+
+    from ccmm_invenio.parsers.base import VocabularyLoader
+
+# language of texts that have no language in the RDM format
+UNDETERMINED_LANGUAGE = "und"
+
+
+@cache
+def lang3_to_lang2(lang3: str) -> str:
+    """Convert a three letter language code (id of the languages vocabulary) to the two letter code."""
+    import pycountry
+
+    lang = pycountry.languages.get(alpha_3=lang3.lower())
+    return getattr(lang, "alpha_2", None) or UNDETERMINED_LANGUAGE
+
+
+def multilingual(value: str, lang: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    """Return a multilingual field with a single text, lang is an item of the languages vocabulary."""
+    lang_id = lang.get("id") if lang else None
+    return [{"lang": {"id": lang3_to_lang2(lang_id) if lang_id else UNDETERMINED_LANGUAGE}, "value": value}]
+
+
+def coordinates(geometry: Any) -> Iterator[list[float]]:
+    """Return all the positions of GeoJSON coordinates, whatever their nesting is."""
+    if geometry and isinstance(geometry[0], list):
+        for item in geometry:
+            yield from coordinates(item)
+    elif geometry:
+        yield geometry
+
+
+class CCMMProductionXMLSerializer_1_1_0(CCMMNMAXMLSerializer_1_1_0):  # noqa: N801
+    """CCMM XML serializer for records with metadata in the form returned by CCMMXMLProductionParser."""
+
+    @override
+    def write_record(self, xf: IncrementalWriter, obj: dict[str, Any], iri_loader: VocabularyLoader) -> None:
+        """Write the current metadata of the record."""
+        self.writer.write(xf, self.ccmm_metadata(obj), iri_loader)
+
+    def ccmm_metadata(self, obj: dict[str, Any]) -> dict[str, Any]:
+        """Convert the record to the metadata in the form returned by the NMA parser."""
+        metadata = obj["metadata"]
+        ccmm: dict[str, Any] = {
+            "metadata_identifications": self.convert_metadata_identifications(obj),
+            "identifiers": self.convert_identifiers(obj),
+            "version": metadata.get("version"),
+            "title": metadata.get("title"),
+            "alternate_titles": [
+                self.convert_alternate_title(title) for title in metadata.get("additional_titles", [])
+            ],
+            "qualified_relations": [
+                *self.convert_publisher(metadata),
+                *self.convert_creators(metadata),
+                *self.convert_contributors(metadata),
+            ],
+            "publication_year": self.convert_publication_date(metadata),
+            "time_references": self.convert_time_references(metadata),
+            "resource_type": metadata.get("resource_type"),
+            "terms_of_use": self.convert_terms_of_use(obj),
+            "subjects": [self.convert_subject(subject) for subject in metadata.get("subjects", [])],
+            "descriptions": self.convert_additional_descriptions(metadata),
+            "locations": self.convert_locations(metadata),
+            "funding_references": [self.convert_funding_reference(funding) for funding in metadata.get("funding", [])],
+            "related_resources": [
+                self.convert_related_resource(resource) for resource in metadata.get("related_resources", [])
+            ],
+        }
+        ccmm.update(self.convert_languages(metadata))
+        return {key: value for key, value in ccmm.items() if value not in (None, [], {})}
+
+    def convert_metadata_identifications(self, obj: dict[str, Any]) -> list[dict[str, Any]]:
+        """Describe the metadata record by the technical metadata of the Invenio record.
+
+        The repository is the site of the landing page of the record and the agents responsible
+        for the metadata record are the publisher of the dataset, or its creators if it has none.
+        """
+        landing_page = urlsplit(obj.get("links", {}).get("self_html", ""))
+        identification = {
+            "qualified_relations": self.convert_publisher(obj["metadata"]) or self.convert_creators(obj["metadata"]),
+            "date_updated": obj.get("updated", "").split("T")[0],
+            "date_created": obj.get("created", "").split("T")[0],
+            "original_repository": (
+                {"iri": f"{landing_page.scheme}://{landing_page.netloc}/"} if landing_page.netloc else None
+            ),
+        }
+        identification = {key: value for key, value in identification.items() if value}
+        return [identification] if identification else []
+
+    def convert_identifiers(self, obj: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert the identifiers of the record and its DOI to CCMM identifiers."""
+        identifiers = [self.convert_identifier(ident) for ident in obj["metadata"].get("identifiers", [])]
+        doi = obj.get("pids", {}).get("doi", {}).get("identifier")
+        if doi and all(ident["value"] != doi for ident in identifiers):
+            identifiers.insert(0, {"value": doi, "scheme": {"id": "doi"}})
+        return identifiers
+
+    def convert_identifier(self, ident: dict[str, Any]) -> dict[str, Any]:
+        """Convert an RDM identifier (identifier, scheme) to a CCMM identifier (value, scheme vocabulary)."""
+        return {"value": ident["identifier"], "scheme": {"id": ident["scheme"]}}
+
+    def convert_alternate_title(self, title: dict[str, Any]) -> dict[str, Any]:
+        """Convert an RDM additional title to an alternate title."""
+        return {
+            "title": multilingual(title["title"], title.get("lang")),
+            "alternate_title_type": title.get("type"),
+        }
+
+    def convert_additional_descriptions(self, metadata: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert the description and the additional descriptions to CCMM descriptions."""
+        descriptions = (
+            [{"description_text": multilingual(metadata["description"])}] if metadata.get("description") else []
+        )
+        descriptions.extend(
+            {
+                "description_text": multilingual(desc["description"], desc.get("lang")),
+                "description_type": desc.get("type"),
+            }
+            for desc in metadata.get("additional_descriptions", [])
+        )
+        return descriptions
+
+    def convert_publisher(self, metadata: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert the publisher (a name in RDM) to a qualified relation with an organization."""
+        if not metadata.get("publisher"):
+            return []
+        return [{"relation": {"organization": {"name": metadata["publisher"]}}, "role": {"id": "Publisher"}}]
+
+    def convert_creators(self, metadata: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert creators to qualified relations with the Creator role."""
+        return [
+            self.convert_qualified_relation_to_creatibutor(creator, {"id": "Creator"})
+            for creator in metadata.get("creators", [])
+        ]
+
+    def convert_contributors(self, metadata: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert contributors to qualified relations, the roles share ids with the agent roles of CCMM."""
+        return [
+            self.convert_qualified_relation_to_creatibutor(contributor, contributor.get("role") or {"id": "Other"})
+            for contributor in metadata.get("contributors", [])
+        ]
+
+    def convert_qualified_relation_to_creatibutor(
+        self,
+        creatibutor: dict[str, Any],
+        role: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Convert a creator or a contributor to a qualified relation with the role."""
+        person_or_org = creatibutor["person_or_org"]
+        if person_or_org.get("type") == "organizational":
+            relation = {"organization": self.convert_organization(person_or_org)}
+        else:
+            relation = {"person": self.convert_person(person_or_org, creatibutor.get("affiliations", []))}
+        return {"relation": relation, "role": role}
+
+    def convert_person(self, person_or_org: dict[str, Any], affiliations: list[dict[str, Any]]) -> dict[str, Any]:
+        """Convert a person and their affiliations to a CCMM person."""
+        person = {
+            "name": person_or_org.get("name")
+            or ", ".join(filter(None, (person_or_org.get("family_name"), person_or_org.get("given_name")))),
+            "given_names": [person_or_org["given_name"]] if person_or_org.get("given_name") else [],
+            "family_names": [person_or_org["family_name"]] if person_or_org.get("family_name") else [],
+            "identifiers": [self.convert_identifier(ident) for ident in person_or_org.get("identifiers", [])],
+            "affiliations": [{"name": aff["name"]} for aff in affiliations if aff.get("name")],
+        }
+        return {key: value for key, value in person.items() if value}
+
+    def convert_organization(self, person_or_org: dict[str, Any]) -> dict[str, Any]:
+        """Convert an organization to a CCMM organization."""
+        organization = {
+            "name": person_or_org.get("name"),
+            "identifiers": [self.convert_identifier(ident) for ident in person_or_org.get("identifiers", [])],
+        }
+        return {key: value for key, value in organization.items() if value}
+
+    def convert_publication_date(self, metadata: dict[str, Any]) -> int | None:
+        """Return the publication year, the year of the publication date."""
+        publication_date = metadata.get("publication_date")
+        return int(publication_date[:4]) if publication_date else None
+
+    def convert_time_references(self, metadata: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert dates to time references, a date interval (start/end) to a time interval."""
+        time_references = []
+        for date in metadata.get("dates", []):
+            beginning, separator, end = date["date"].partition("/")
+            if separator:
+                interval = {"beginning": {"date": beginning}, "end": {"date": end}}
+                temporal_representation = {"time_interval": {key: value for key, value in interval.items() if value}}
+            else:
+                temporal_representation = {"time_instant": {"date": beginning}}
+            time_reference = {
+                "temporal_representation": temporal_representation,
+                "date_type": date.get("type"),
+                "date_information": date.get("description"),
+            }
+            time_references.append({key: value for key, value in time_reference.items() if value})
+        return time_references
+
+    def convert_languages(self, metadata: dict[str, Any]) -> dict[str, Any]:
+        """Use the first of the languages as the primary language."""
+        languages = metadata.get("languages", [])
+        if not languages:
+            return {}
+        return {"primary_language": languages[0], "other_languages": languages[1:]}
+
+    def convert_terms_of_use(self, obj: dict[str, Any]) -> dict[str, Any] | None:
+        """Convert the first of the rights and the access settings of the record to terms of use."""
+        terms_of_use = {
+            "access_rights": self.access_rights(obj.get("access")),
+            "license": self.convert_license(obj["metadata"].get("rights", [])),
+        }
+        terms_of_use = {key: value for key, value in terms_of_use.items() if value}
+        return terms_of_use or None
+
+    def access_rights(self, access: dict[str, Any] | None) -> dict[str, Any] | None:
+        """Return the COAR access right of the files of the record."""
+        if not access:
+            return None
+        if access.get("embargo", {}).get("active"):
+            return {"id": "c_f1cf"}
+        if access.get("files") == "restricted":
+            return {"id": "c_16ec"}
+        return {"id": "c_abf2"}
+
+    def convert_license(self, rights: list[dict[str, Any]]) -> dict[str, Any] | None:
+        """Convert a right to a license document, the IRI of the license is its link."""
+        if not rights:
+            return None
+        right = rights[0]
+        license_document = {
+            "iri": right.get("link") or right.get("props", {}).get("url"),
+            "label": [{"lang": {"id": lang}, "value": value} for lang, value in right.get("title", {}).items()],
+        }
+        return {key: value for key, value in license_document.items() if value} or None
+
+    def convert_subject(self, subj: dict[str, Any]) -> dict[str, Any]:
+        """Convert a subject, its id is the subject scheme and the classification code."""
+        subject_scheme, _, classification_code = (subj.get("id") or "").partition(":")
+        if not classification_code:
+            return {"title": multilingual(subj["subject"])}
+        return {
+            "title": multilingual(subj["subject"]),
+            "classification_code": classification_code,
+            "subject_scheme": {"id": subject_scheme},
+        }
+
+    def convert_locations(self, metadata: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert the features of RDM locations to locations."""
+        return [self.convert_location(feature) for feature in metadata.get("locations", {}).get("features", [])]
+
+    def convert_location(self, feature: dict[str, Any]) -> dict[str, Any]:
+        """Convert a feature to a location, its geometry is converted to a bounding box."""
+        location: dict[str, Any] = {
+            "names": [feature["place"]] if feature.get("place") else [],
+            "related_objects": [
+                {"iri": ident["identifier"]} for ident in feature.get("identifiers", []) if ident.get("scheme") == "iri"
+            ],
+            "relation_type": {"id": feature["description"]} if feature.get("description") else None,
+        }
+        positions = list(coordinates((feature.get("geometry") or {}).get("coordinates")))
+        if positions:
+            xs, ys = [position[0] for position in positions], [position[1] for position in positions]
+            location["bounding_boxes"] = [{"lowerCorner": [min(xs), min(ys)], "upperCorner": [max(xs), max(ys)]}]
+        return {key: value for key, value in location.items() if value}
+
+    def convert_funding_reference(self, funding: dict[str, Any]) -> dict[str, Any]:
+        """Convert an RDM funding to a funding reference with a single funder."""
+        funder = funding.get("funder", {})
+        award = funding.get("award", {})
+        funding_reference = {
+            "local_identifier": award.get("number"),
+            "award_title": next(iter(award.get("title", {}).values()), None),
+            "funders": [{"organization": {"name": funder.get("name") or funder.get("id")}}] if funder else [],
+        }
+        return {key: value for key, value in funding_reference.items() if value}
+
+    def convert_related_resource(self, res: dict[str, Any]) -> dict[str, Any]:
+        """Convert a related resource, the first two identifiers are its IRI and URL."""
+        identifiers = [ident["identifier"] for ident in res.get("identifiers", [])]
+        related_resource = {
+            "iri": identifiers[0] if identifiers else None,
+            "title": res.get("title"),
+            "resource_url": identifiers[1] if len(identifiers) > 1 else None,
+            "resource_type": res.get("resource_type"),
+            "resource_relation_type": res.get("relation_type"),
+        }
+        return {key: value for key, value in related_resource.items() if value}
@@ -12,35 +12,146 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, override
 
-from flask_resources import BaseListSchema, MarshmallowSerializer
-from flask_resources.serializers import JSONSerializer
 from invenio_rdm_records.resources.serializers.datacite import DataCite43Schema
+from invenio_rdm_records.resources.serializers.datacite.schema import ContributorSchema4
+from marshmallow import fields, missing
+from marshmallow_utils.html import strip_html
+
+from ..datacite import (
+    CCMMDataCiteJSONSerializer,
+    DataCiteCodesMixin,
+    datacite_language,
+    geojson_geolocations,
+    with_place,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Iterator, Mapping
+
+    from ccmm_invenio.parsers.base import VocabularyLoader
 
 
-class CCMMProductionDataCiteJSONSerializer_1_1_0(MarshmallowSerializer):  # noqa: N801
+class CCMMProductionDataCiteJSONSerializer_1_1_0(CCMMDataCiteJSONSerializer):  # noqa: N801
     """Marshmallow based DataCite serializer for records."""
 
-    def __init__(self, **options: Any):
+    def __init__(self, code_loader: VocabularyLoader | None = None, **options: Any):
         """Create a new instance of the serializer."""
-        super().__init__(
-            format_serializer_cls=JSONSerializer,
-            object_schema_cls=ProductionDataCiteSchema,
-            list_schema_cls=BaseListSchema,
-            schema_kwargs={},
-            **options,
-        )
+        super().__init__(ProductionDataCiteSchema, code_loader=code_loader, **options)
 
 
-class ProductionDataCiteSchema(DataCite43Schema):
+class ProductionDataCiteSchema(DataCiteCodesMixin, DataCite43Schema):
     """Schema for DataCite serialization of CCMM production records.
 
-    TODO: this will not work correctly !!!
+    Metadata of production records are in the RDM format, so most of the fields are mapped
+    by DataCite43Schema. The fields that use vocabularies with the DataCite code in the datacite
+    property (resource, title, description and date types and contributor roles) are mapped here, so that
+    their codes can be resolved for a whole page of records at once, and so are locations.
+
+    Subjects and rights are stored with their vocabulary data and need no lookups. The relation
+    and resource types of related identifiers are still looked up by DataCite43Schema, together
+    with the versions and communities of the record, one item at a time.
     """
 
+    contributors = fields.Method("get_contributors")
+
+    contributor_schema = ContributorSchema4()
+
+    @override
+    def vocabulary_items(self, obj: Mapping[str, Any]) -> Iterator[tuple[str, Mapping[str, Any] | None]]:
+        """Return the resource type, the types of additional titles, descriptions and dates and contributor roles."""
+        metadata = obj["metadata"]
+        yield "resourcetypes", metadata.get("resource_type")
+        for additional_title in metadata.get("additional_titles", []):
+            yield "titletypes", additional_title.get("type")
+        for additional_description in metadata.get("additional_descriptions", []):
+            yield "descriptiontypes", additional_description.get("type")
+        for date in metadata.get("dates", []):
+            yield "datetypes", date.get("type")
+        for contributor in metadata.get("contributors", []):
+            yield "contributorsroles", contributor.get("role")
+
+    @override
+    def get_type(self, obj: Mapping[str, Any]) -> dict[str, str]:
+        """Get resource type."""
+        return {
+            "resourceTypeGeneral": self.datacite_code("resourcetypes", obj["metadata"].get("resource_type"), "Other"),
+        }
+
+    @override
+    def get_titles(self, obj: Mapping[str, Any]) -> list[dict[str, str]]:
+        """Get the title and the additional titles."""
+        metadata = obj["metadata"]
+        titles = [{"title": metadata["title"]}] if metadata.get("title") else []
+        for additional_title in metadata.get("additional_titles", []):
+            title = {"title": additional_title["title"]}
+            title_type = self.title_type(additional_title.get("type"))
+            if title_type:
+                title["titleType"] = title_type
+            lang = datacite_language(additional_title.get("lang", {}).get("id"))
+            if lang:
+                title["lang"] = lang
+            titles.append(title)
+        return titles
+
+    @override
+    def get_descriptions(self, obj: Mapping[str, Any]) -> list[dict[str, str]] | Any:
+        """Get the description (an abstract) and the additional descriptions."""
+        metadata = obj["metadata"]
+        descriptions = (
+            [{"description": strip_html(metadata["description"]), "descriptionType": "Abstract"}]
+            if metadata.get("description")
+            else []
+        )
+        for additional_description in metadata.get("additional_descriptions", []):
+            description = {
+                "description": strip_html(additional_description["description"]),
+                "descriptionType": self.datacite_code("descriptiontypes", additional_description.get("type"), "Other"),
+            }
+            lang = datacite_language(additional_description.get("lang", {}).get("id"))
+            if lang:
+                description["lang"] = lang
+            descriptions.append(description)
+        return descriptions or missing
+
+    def get_contributors(self, obj: Mapping[str, Any]) -> list[dict[str, Any]] | Any:
+        """Get contributors, the contributor type is the DataCite code of the role."""
+        contributors = obj["metadata"].get("contributors")
+        if contributors is None:
+            return missing
+        serialized_contributors = []
+        for contributor in contributors:
+            serialized = self.contributor_schema.dump({**contributor, "role": None})
+            if contributor.get("role"):
+                serialized["contributorType"] = self.datacite_code("contributorsroles", contributor["role"], "Other")
+            serialized_contributors.append(serialized)
+        return serialized_contributors
+
+    @override
+    def get_dates(self, obj: Mapping[str, Any]) -> list[dict[str, str]] | Any:
+        """Get the publication date, the dates of the record and the date of the last update."""
+        metadata = obj["metadata"]
+        dates = (
+            [{"date": metadata["publication_date"], "dateType": "Issued"}] if metadata.get("publication_date") else []
+        )
+        updated = False
+        for date in metadata.get("dates", []):
+            date_type = date.get("type")
+            if date_type and date_type.get("id") == "updated":
+                updated = True
+            serialized = {"date": date["date"], "dateType": self.datacite_code("datetypes", date_type, "Other")}
+            if date.get("description"):
+                serialized["dateInformation"] = date["description"]
+            dates.append(serialized)
+        if not updated and obj.get("updated"):
+            dates.append({"date": obj["updated"].split("T")[0], "dateType": "Updated"})
+        return dates or missing
+
     @override
-    def get_locations(self, obj: Mapping[str, Any]) -> list:
-        """Get locations."""
-        return []
+    def get_locations(self, obj: Mapping[str, Any]) -> list | Any:
+        """Get locations, one geolocation for each point, box or polygon of the location features."""
+        locations = [
+            geolocation
+            for feature in obj["metadata"].get("locations", {}).get("features", [])
+            for geolocation in with_place(feature.get("place"), geojson_geolocations(feature.get("geometry")))
+        ]
+        return locations or missing
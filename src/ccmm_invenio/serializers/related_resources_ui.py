@@ -10,9 +10,13 @@
 
 from __future__ import annotations
 
+import json
+import threading
+from collections import OrderedDict
 from functools import partial
-from typing import Any
+from typing import TYPE_CHECKING, Any, override
 
+from invenio_i18n import get_locale
 from invenio_rdm_records.resources.serializers.ui.schema import (
     AdditionalDescriptionsSchema,
     AdditionalTitlesSchema,
@@ -32,6 +36,12 @@ from marshmallow import Schema, fields
 from marshmallow_utils.schemas import IdentifierSchema as RDMIdentifierSchema
 from oarepo_runtime.services.schema.ui import LocalizedEDTF
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+# number of localized values (vocabulary items, formatted dates) kept by a schema instance
+L10N_CACHE_SIZE = 4096
+
 
 def make_related_affiliation_index(attr: str, obj: dict, *args: Any) -> Any:
     """Build an RDM affiliation index for a nested related resource."""
@@ -46,23 +56,85 @@ class IdentifierSchema(RDMIdentifierSchema):
         super().__init__(allowed_schemes=record_related_identifiers_schemes, **kwargs)
 
 
+class L10nCache:
+    """Bounded cache of localized values, so that each distinct value is localized only once."""
+
+    def __init__(self, maxsize: int = L10N_CACHE_SIZE):
+        """Create an empty cache keeping at most maxsize values."""
+        self.maxsize = maxsize
+        self.values: OrderedDict[Hashable, Any] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, localize: Callable[[], Any]) -> Any:
+        """Return the cached value, call localize to create it if it is not cached yet."""
+        with self.lock:
+            if key in self.values:
+                self.values.move_to_end(key)
+                return self.values[key]
+        value = localize()
+        with self.lock:
+            self.values[key] = value
+            while len(self.values) > self.maxsize:
+                self.values.popitem(last=False)
+        return value
+
+
+class LocalizedVocabularyItem(fields.Nested):
+    """Vocabulary item dumped with VocabularyL10Schema, once per distinct item and locale.
+
+    The item is a part of the cache key as a whole, as records might be stored with different
+    titles of the same vocabulary item.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialize the field."""
+        super().__init__(VocabularyL10Schema, **kwargs)
+
+    @override
+    def _serialize(self, nested_obj: Any, attr: str | None, obj: Any, **kwargs: Any) -> Any:
+        if not isinstance(nested_obj, dict) or not nested_obj.get("id"):
+            return super()._serialize(nested_obj, attr, obj, **kwargs)
+        localized = self.root.l10n_cache.get(
+            (self.name, json.dumps(nested_obj, sort_keys=True, default=str), str(get_locale())),
+            lambda: super(LocalizedVocabularyItem, self)._serialize(nested_obj, attr, obj, **kwargs),
+        )
+        return dict(localized)
+
+
+class CachedLocalizedEDTF(LocalizedEDTF):
+    """Localized EDTF date, each distinct date is formatted only once per format and locale."""
+
+    @override
+    def format_value(self, value: str) -> str:
+        return self.root.l10n_cache.get(
+            (self.name, value, str(self.locale)),
+            lambda: super(CachedLocalizedEDTF, self).format_value(value),
+        )
+
+
 class CCMMRelatedResourceUISchema(Schema):
-    """UI schema for a single CCMM related resource."""
+    """UI schema for a single CCMM related resource.
+
+    Related resources are dumped one by one by the list field of the record UI schema,
+    but with the same schema instance. Vocabulary items and publication dates are
+    localized through a cache on the instance, so that a record with hundreds of related
+    resources localizes each distinct vocabulary item and date only once.
+    """
 
     title = fields.String()
     publisher = fields.String()
     publication_date = fields.String()
 
-    publication_date_l10n_short = LocalizedEDTF(attribute="publication_date", format="short")
-    publication_date_l10n_medium = LocalizedEDTF(attribute="publication_date", format="medium")
-    publication_date_l10n_long = LocalizedEDTF(attribute="publication_date", format="long")
-    publication_date_l10n_full = LocalizedEDTF(attribute="publication_date", format="full")
+    publication_date_l10n_short = CachedLocalizedEDTF(attribute="publication_date", format="short")
+    publication_date_l10n_medium = CachedLocalizedEDTF(attribute="publication_date", format="medium")
+    publication_date_l10n_long = CachedLocalizedEDTF(attribute="publication_date", format="long")
+    publication_date_l10n_full = CachedLocalizedEDTF(attribute="publication_date", format="full")
 
     identifiers = fields.List(fields.Nested(IdentifierSchema))
 
-    resource_type = fields.Nested(VocabularyL10Schema)
-    relation_type = fields.Nested(VocabularyL10Schema)
-    languages = fields.List(fields.Nested(VocabularyL10Schema))
+    resource_type = LocalizedVocabularyItem()
+    relation_type = LocalizedVocabularyItem()
+    languages = fields.List(LocalizedVocabularyItem())
 
     additional_titles = fields.List(fields.Nested(AdditionalTitlesSchema))
     additional_descriptions = fields.List(fields.Nested(AdditionalDescriptionsSchema))
@@ -73,3 +145,8 @@ class CCMMRelatedResourceUISchema(Schema):
 
     creators = fields.Function(partial(make_related_affiliation_index, "creators"))
     contributors = fields.Function(partial(make_related_affiliation_index, "contributors"))
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the schema with an empty localization cache."""
+        super().__init__(*args, **kwargs)
+        self.l10n_cache = L10nCache()
@@ -0,0 +1,152 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+"""Sample NMA records and vocabularies shared by the parser and serializer tests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from lxml import etree
+
+if TYPE_CHECKING:
+    import random
+
+    from ccmm_invenio.parsers.xsd_schema import Schema, SchemaField
+
+XSD_FILE = Path(__file__).parent.parent / "src" / "ccmm_invenio" / "schemas" / "ccmm-1.1.0-2026-01-29.xsd"
+NMA_XML_FILE = Path(__file__).parent / "data" / "nma_1_1_0-2026-01-29.xml"
+
+# random records are in the namespace read by the NMA parser
+NAMESPACE = "https://schema.ccmm.cz/research-data/1.0"
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+# fields the hand-written NMA parser does not read (the generated parser does) and geometry,
+# which is parsed by CCMMXMLParser for both of them and is checked on the NMA sample
+SKIPPED_FIELDS = {("ccmmtimereference", "iri"), ("ccmmlocation", "geometry")}
+
+SAMPLE_VALUES = {
+    "boolean": "true",
+    "date": "2024-01-02",
+    "datetime": "2024-01-02T03:04:05",
+    "double": "1.5",
+    "int": "2024",
+    "long": "256",
+}
+
+vocab_items = {
+    "titletypes": {"https://vocabs.ccmm.cz/registry/codelist/AlternateTitle/translatedTitle": "translatedTitle"},
+    "identifierschemes": {
+        "https://doi.org/": "doi",
+        "https://organization.cz/datasets/": "organization-specific-id",
+        "https://ror.org/": "ror",
+        "https://orcid.org/": "orcid",
+    },
+    "resourcetypes": {
+        "https://vocabularies.coar-repositories.org/resource_types/c_ddb1/": "Dataset",
+        "http://purl.org/coar/resource_type/c_18cf/": "Software",
+        "http://purl.org/coar/resource_type/8KJG-QS0Y": "PhysicalObject",
+        "http://purl.org/coar/resource_type/FF4C-28RK": "ObservationData",
+    },
+    "languages": {
+        "http://publications.europa.eu/resource/authority/language/CES": "CES",
+        "http://publications.europa.eu/resource/authority/language/ENG": "ENG",
+    },
+    "datetypes": {
+        "https://vocabs.ccmm.cz/registry/codelist/TimeReference/Created": "Created",
+        "https://vocabs.ccmm.cz/registry/codelist/TimeReference/Collected": "Collected",
+    },
+    "descriptiontypes": {"https://vocabs.ccmm.cz/registry/codelist/DescriptionType/abstract": "abstract"},
+    "fileformats": {
+        "https://op.europa.eu/web/eu-vocabularies/concept/-/resource?"
+        "uri=http://publications.europa.eu/resource/authority/file-type/GPKG": "GPKG"
+    },
+    "mediatypes": {
+        "https://op.europa.eu/web/eu-vocabularies/concept/-/resource?"
+        "uri=http://publications.europa.eu/resource/authority/file-type/ZIP": "ZIP"
+    },
+    "checksumalgorithms": {
+        "https://www.iana.org/go/rfc6920": "rfc6920",
+    },
+    "locationrelationtypes": {"https://vocabs.ccmm.cz/registry/codelist/LocationRelation/Collected": "Collected"},
+    "resourceagentroletypes": {
+        "https://vocabs.ccmm.cz/registry/codelist/AgentRole/DataManager": "DataManager",
+        "https://vocabs.ccmm.cz/registry/codelist/AgentRole/Creator": "Creator",
+        "https://vocabs.ccmm.cz/registry/codelist/AgentRole/Publisher": "Publisher",
+    },
+    "resourcerelationtypes": {
+        "https://vocabs.ccmm.cz/registry/codelist/RelationType/IsReferencedBy": "IsReferencedBy",
+        "https://vocabs.ccmm.cz/registry/codelist/RelationType/IsDerivedFrom": "IsDerivedFrom",
+        "https://vocabs.ccmm.cz/registry/codelist/RelationType/HasMetadata": "HasMetadata",
+    },
+    "subjectschemes": {
+        "https://vocabs.ccmm.cz/registry/codelist/SubjectCategory/": "Frascati",
+        "https://inspire.ec.europa.eu/theme/": "INSPIRE",
+    },
+    "accessrights": {"https://vocabularies.coar-repositories.org/access_rights/c_abf2/": "OpenAccess"},
+}
+
+
+def vocabulary_loader(vocabulary_type: str, iri: str) -> str:
+    return vocab_items[vocabulary_type][iri]
+
+
+def element(name: str) -> etree._Element:
+    return etree.Element(f"{{{NAMESPACE}}}{name}")
+
+
+def build_record(schema: Schema, rng: random.Random) -> etree._Element:
+    """Build a random record valid against the schema, with the elements in the schema order."""
+    root = element("dataset")
+    build_content(schema, "ccmmdataset", root, rng, depth=0)
+    return root
+
+
+def build_content(schema: Schema, datatype: str, parent: etree._Element, rng: random.Random, depth: int) -> None:
+    fields = [field for field in schema.types[datatype].fields if (datatype, field.element) not in SKIPPED_FIELDS]
+    # elements of a choice are alternatives, exactly one of them is used
+    choices: dict[int, list[SchemaField]] = {}
+    for field in fields:
+        if field.choice is not None:
+            choices.setdefault(field.choice, []).append(field)
+    chosen_fields = {id(rng.choice(alternatives)) for alternatives in choices.values()}
+
+    for field in fields:
+        if field.choice is not None:
+            present = id(field) in chosen_fields
+        elif field.kind == "datatype" and field.datatype and field.datatype.startswith("gml"):
+            # gml types are parsed by the hand-written code of CCMMXMLParser
+            present = False
+        else:
+            # deeply nested types contain only the required fields so that the records stay small
+            present = field.required or (depth < 3 and rng.random() < 0.7)
+        if not present:
+            continue
+        for _ in range(rng.randint(1, 2) if field.array else 1):
+            parent.append(build_field(schema, field, rng, depth))
+
+
+def build_field(schema: Schema, field: SchemaField, rng: random.Random, depth: int) -> etree._Element:
+    el = element(field.element)
+    if field.kind in ("multilingual", "i18n"):
+        el.set(XML_LANG, rng.choice(["cs", "en"]))
+        el.text = f"{field.element} {rng.randint(0, 1000)}"
+    elif field.kind == "vocabulary":
+        assert field.vocabulary is not None
+        iri = element("iri")
+        iri.text = rng.choice(list(vocab_items[field.vocabulary]))
+        el.append(iri)
+    elif field.kind == "datatype" and field.datatype in SAMPLE_VALUES:
+        el.text = SAMPLE_VALUES[field.datatype]
+    elif field.kind == "datatype":
+        assert field.datatype is not None
+        build_content(schema, field.datatype, el, rng, depth + 1)
+    else:
+        el.text = f"{field.element} {rng.randint(0, 1000)}"
+    return el
@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+from __future__ import annotations
+
+import random
+from typing import Any
+
+import pytest
+from lxml import etree
+
+from ccmm_invenio.parsers.nma_1_1_0 import CCMMXMLNMAParser
+from ccmm_invenio.parsers.production_1_1_0 import CCMMXMLProductionParser
+from ccmm_invenio.parsers.registry import CCMM_NAMESPACES, CCMMParserRegistry
+from ccmm_invenio.parsers.xsd_schema import load_schema
+from ccmm_invenio.serializers import CCMMNMAXMLSerializer_1_1_0, CCMMProductionXMLSerializer_1_1_0
+from tests.nma_records import NMA_XML_FILE, XSD_FILE, build_record, vocab_items, vocabulary_loader
+
+vocab_iris = {
+    (vocabulary_type, vocabulary_id): iri
+    for vocabulary_type, items in vocab_items.items()
+    for iri, vocabulary_id in items.items()
+}
+# access rights of production records are the ids of the COAR access rights vocabulary
+vocab_iris["accessrights", "c_abf2"] = "https://vocabularies.coar-repositories.org/access_rights/c_abf2/"
+
+
+def iri_loader(vocabulary_type: str, vocabulary_id: str) -> str:
+    return vocab_iris[vocabulary_type, vocabulary_id]
+
+
+@pytest.fixture(scope="module")
+def registry() -> CCMMParserRegistry:
+    registry = CCMMParserRegistry(vocabulary_loader=vocabulary_loader)
+    for namespace in CCMM_NAMESPACES:
+        registry.register(CCMMXMLNMAParser, namespace)
+    return registry
+
+
+@pytest.fixture(scope="module")
+def production_registry() -> CCMMParserRegistry:
+    registry = CCMMParserRegistry(vocabulary_loader=vocabulary_loader)
+    for namespace in CCMM_NAMESPACES:
+        registry.register(CCMMXMLProductionParser, namespace)
+    return registry
+
+
+def hits(records: list[dict[str, Any]]) -> dict[str, Any]:
+    return {"hits": {"hits": records, "total": len(records)}}
+
+
+def test_nma_record_round_trip(registry, clean_strings):
+    serializer = CCMMNMAXMLSerializer_1_1_0(iri_loader=iri_loader)
+    record = registry.parse(etree.fromstring(NMA_XML_FILE.read_bytes()))
+
+    serialized = serializer.serialize_object(record)
+    assert serialized.startswith(b"<?xml")
+    root = etree.fromstring(serialized)
+    assert root.tag == "{https://schema.ccmm.cz/research-data/1.1}dataset"
+    # wkt is not kept by the NMA parser, so only the gml geometry is written
+    assert clean_strings(registry.parse(root)) == clean_strings(record)
+
+
+def test_random_records_round_trip(registry):
+    serializer = CCMMNMAXMLSerializer_1_1_0(iri_loader=iri_loader)
+    schema = load_schema(XSD_FILE)
+    rng = random.Random(3)  # noqa: S311 - not used for cryptography
+
+    for _ in range(100):
+        record = registry.parse(build_record(schema, rng))
+        serialized = serializer.serialize_object(record)
+        assert registry.parse(etree.fromstring(serialized)) == record, serialized
+
+
+def test_record_list_is_streamed(registry):
+    serializer = CCMMNMAXMLSerializer_1_1_0(iri_loader=iri_loader)
+    schema = load_schema(XSD_FILE)
+    rng = random.Random(4)  # noqa: S311 - not used for cryptography
+    records = [registry.parse(build_record(schema, rng)) for _ in range(10)]
+
+    chunks = list(serializer.serialize_object_list(hits(records)))
+    # a chunk for each record and the closing tag of the list
+    assert len(chunks) == len(records) + 1
+    assert chunks[-1] == b"</datasets>"
+
+    root = etree.fromstring(b"".join(chunks))
+    assert etree.QName(root).localname == "datasets"
+    assert [registry.parse(dataset) for dataset in root] == records
+
+
+def production_record(registry: CCMMParserRegistry, **fields: Any) -> dict[str, Any]:
+    """Return the sample record as imported to the production repository."""
+    record = registry.parse(etree.fromstring(NMA_XML_FILE.read_bytes()))
+    return {
+        **record,
+        "id": "abc",
+        "created": "2025-05-01T10:00:00+00:00",
+        "updated": "2025-06-01T10:00:00+00:00",
+        "access": {"record": "public", "files": "public"},
+        "links": {"self_html": "https://repository.example.org/records/abc"},
+        **fields,
+    }
+
+
+def test_production_record_round_trip(production_registry, clean_strings):
+    serializer = CCMMProductionXMLSerializer_1_1_0(iri_loader=iri_loader)
+    record = production_record(production_registry)
+
+    root = etree.fromstring(serializer.serialize_object(record))
+    assert root.tag == "{https://schema.ccmm.cz/research-data/1.1}dataset"
+    # metadata identification is written from the technical metadata of the record
+    identification = root.find("{https://schema.ccmm.cz/research-data/1.1}metadata_identification")
+    assert identification.findtext("{https://schema.ccmm.cz/research-data/1.1}date_updated") == "2025-06-01"
+    assert clean_strings(production_registry.parse(root)["metadata"]) == clean_strings(record["metadata"])
+
+
+def test_production_record_writes_current_metadata(production_registry):
+    serializer = CCMMProductionXMLSerializer_1_1_0(iri_loader=iri_loader)
+    imported = production_record(production_registry)
+    edited = {**imported, "metadata": {**imported["metadata"], "title": "Edited title"}}
+    # records created in the deposit form have no imported CCMM XML
+    deposited = production_record(production_registry, id="def")
+    del deposited["ccmm_xml"]
+
+    root = etree.fromstring(b"".join(serializer.serialize_object_list(hits([edited, deposited]))))
+    assert [production_registry.parse(dataset)["metadata"]["title"] for dataset in root] == [
+        "Edited title",
+        imported["metadata"]["title"],
+    ]
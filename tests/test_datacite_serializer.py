@@ -0,0 +1,338 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from lxml import etree
+
+from ccmm_invenio.parsers.nma_1_1_0 import CCMMXMLNMAParser
+from ccmm_invenio.serializers import (
+    CCMMNMADataCiteJSONSerializer_1_1_0,
+    CCMMProductionDataCiteJSONSerializer_1_1_0,
+)
+from ccmm_invenio.serializers.datacite import datacite_cache, geojson_geolocations, gml_geolocations
+from ccmm_invenio.serializers.production.datacite import ProductionDataCiteSchema
+from tests.nma_records import NMA_XML_FILE, vocabulary_loader
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+PRODUCTION_JSON_FILE = Path(__file__).parent / "data" / "2026-01-29_example.json"
+
+datacite_codes = {
+    ("resourcetypes", "Dataset"): "Dataset",
+    ("resourcetypes", "Software"): "Software",
+    ("descriptiontypes", "abstract"): "Abstract",
+    ("datetypes", "Created"): "Created",
+    ("datetypes", "Collected"): "Collected",
+    ("resourcerelationtypes", "IsReferencedBy"): "IsReferencedBy",
+    ("resourcerelationtypes", "IsDerivedFrom"): "IsDerivedFrom",
+    ("identifierschemes", "doi"): "DOI",
+    ("resourcetypes", "c_ddb1"): "Dataset",
+    ("titletypes", "TranslatedTitle"): "TranslatedTitle",
+    ("contributorsroles", "Editor"): "Editor",
+}
+
+
+class CountingCodeLoader:
+    """Code loader counting the lookups."""
+
+    def __init__(self):
+        """Create the loader."""
+        self.calls = 0
+
+    def __call__(self, vocabulary_type: str, vocabulary_id: str) -> str:
+        """Return the DataCite code."""
+        self.calls += 1
+        return datacite_codes[vocabulary_type, vocabulary_id]
+
+
+class CountingBulkCodeLoader:
+    """Bulk code loader recording the requested vocabulary items."""
+
+    def __init__(self):
+        """Create the loader."""
+        self.requests: list[set[tuple[str, str]]] = []
+
+    def __call__(self, items: Iterable[tuple[str, str]]) -> dict[tuple[str, str], str]:
+        """Return the DataCite codes of the known items."""
+        items = set(items)
+        self.requests.append(items)
+        return {item: datacite_codes[item] for item in items if item in datacite_codes}
+
+
+@pytest.fixture
+def nma_record():
+    parser = CCMMXMLNMAParser(vocabulary_loader=vocabulary_loader)
+    record = parser.parse(etree.fromstring(NMA_XML_FILE.read_bytes()))
+    record.update(id="abcd-1234", revision_id=3, updated="2026-02-01T10:00:00+00:00")
+    return record
+
+
+def test_nma_datacite(nma_record):
+    serializer = CCMMNMADataCiteJSONSerializer_1_1_0(code_loader=CountingCodeLoader())
+    datacite = serializer.dump_obj(nma_record)
+
+    assert datacite["types"] == {"resourceTypeGeneral": "Dataset"}
+    assert datacite["titles"] == [
+        {"title": "Kvalita ovzduší ve středních čechách 2024"},
+        {
+            "title": "Air quality measurements in Central Bohemian Region in 2024.",
+            "lang": "en",
+            "titleType": "TranslatedTitle",
+        },
+    ]
+    assert datacite["creators"] == [
+        {
+            "name": "Šimek, Miroslav",
+            "nameType": "Personal",
+            "givenName": "Miroslav",
+            "familyName": "Šimek",
+            "affiliation": [{"name": "Univerzita Karlova"}],
+            "nameIdentifiers": [{"nameIdentifier": "0000-0003-0852-6632", "nameIdentifierScheme": "ORCID"}],
+        }
+    ]
+    assert "contributors" not in datacite
+    assert datacite["publisher"] == "Ivan Janouch"
+    assert datacite["publicationYear"] == "2025"
+    assert datacite["language"] == "cs"
+    assert datacite["identifiers"] == [{"identifier": "10.5281/zenodo.17594128", "identifierType": "DOI"}]
+    assert datacite["dates"] == [
+        {"date": "2025-04-27T12:00:01+02:00", "dateType": "Created"},
+        {"date": "2024-01-01/2024-12-31", "dateType": "Collected"},
+    ]
+    # related resources without a relation type known to DataCite are skipped
+    assert datacite["relatedIdentifiers"] == [
+        {
+            "relatedIdentifier": "http://data.europa.eu/eli/dir/2008/50/oj",
+            "relatedIdentifierType": "URL",
+            "relationType": "IsReferencedBy",
+            "resourceTypeGeneral": "Software",
+        },
+        {
+            "relatedIdentifier": "https://opendata.chmi.cz/air_quality/now/data/",
+            "relatedIdentifierType": "URL",
+            "relationType": "IsDerivedFrom",
+        },
+    ]
+    assert datacite["rightsList"] == [
+        {
+            "rights": "Attribution 4.0 International",
+            "lang": "en",
+            "rightsUri": "https://creativecommons.org/licenses/by/4.0/",
+        }
+    ]
+    assert datacite["descriptions"][0]["descriptionType"] == "Abstract"
+    assert datacite["descriptions"][0]["lang"] == "cs"
+    assert [subject["subject"] for subject in datacite["subjects"]] == [
+        "Environmentální vědy",
+        "kvalita ovzduší",
+        "Environmental monitoring facilities",
+    ]
+    # the gml geometry is in S-JTSK, only the bounding box is converted
+    assert datacite["geoLocations"] == [
+        {
+            "geoLocationPlace": "Středočeský kraj",
+            "geoLocationBox": {
+                "westBoundLongitude": "13.394972457505816",
+                "eastBoundLongitude": "15.585575400519133",
+                "southBoundLatitude": "49.50127042751268",
+                "northBoundLatitude": "50.61421606255462",
+            },
+        }
+    ]
+    assert datacite["fundingReferences"] == [
+        {
+            "funderName": "Grantová agentura České republiky",
+            "funderIdentifier": "https://ror.org/01pv73b02",
+            "funderIdentifierType": "ROR",
+            "awardTitle": "Program for air pollution research",
+            "awardNumber": "https://doi.org/award-identifier",
+            "awardUri": "https://funder-org.org/grants/123456789",
+        }
+    ]
+    assert datacite["version"] == "1.0.23"
+
+
+def test_datacite_is_cached_per_revision(nma_record):
+    code_loader = CountingCodeLoader()
+    serializer = CCMMNMADataCiteJSONSerializer_1_1_0(code_loader=code_loader)
+    datacite_cache.clear()
+
+    serialized = serializer.serialize_object(nma_record)
+    calls = code_loader.calls
+    assert calls > 0
+    assert json.loads(serialized) == serializer.dump_obj(nma_record)
+    calls = code_loader.calls
+
+    assert serializer.serialize_object(nma_record) == serialized
+    assert code_loader.calls == calls
+
+    nma_record["revision_id"] = 4
+    nma_record["metadata"]["title"] = "Updated title"
+    assert json.loads(serializer.serialize_object(nma_record))["titles"][0] == {"title": "Updated title"}
+    assert code_loader.calls > calls
+
+
+def test_datacite_cache_follows_parent(nma_record):
+    code_loader = CountingCodeLoader()
+    serializer = CCMMNMADataCiteJSONSerializer_1_1_0(code_loader=code_loader)
+    datacite_cache.clear()
+
+    nma_record["parent"] = {"id": "parent-1234", "communities": {"entries": []}}
+    serializer.serialize_object(nma_record)
+    calls = code_loader.calls
+    serializer.serialize_object(nma_record)
+    assert code_loader.calls == calls
+
+    # registering the concept DOI or adding a community does not create a new revision of the record
+    nma_record["parent"]["pids"] = {"doi": {"identifier": "10.1234/parent-1234"}}
+    serializer.serialize_object(nma_record)
+    assert code_loader.calls > calls
+    calls = code_loader.calls
+    nma_record["parent"]["communities"]["entries"].append({"slug": "ccmm"})
+    serializer.serialize_object(nma_record)
+    assert code_loader.calls > calls
+
+
+def test_datacite_dump_obj_is_not_cached(nma_record):
+    code_loader = CountingCodeLoader()
+    serializer = CCMMNMADataCiteJSONSerializer_1_1_0(code_loader=code_loader)
+    datacite_cache.clear()
+
+    # dump_obj is used by the DOI providers, its output depends on more than the record revision
+    datacite = serializer.dump_obj(nma_record)
+    calls = code_loader.calls
+    datacite["doi"] = "10.1234/abcd-1234"
+    assert "doi" not in serializer.dump_obj(nma_record)
+    assert code_loader.calls == 2 * calls
+
+
+def test_datacite_list_resolves_codes_at_once(nma_record):
+    code_loader = CountingCodeLoader()
+    bulk_code_loader = CountingBulkCodeLoader()
+    serializer = CCMMNMADataCiteJSONSerializer_1_1_0(code_loader=code_loader, bulk_code_loader=bulk_code_loader)
+    datacite_cache.clear()
+
+    records = []
+    for revision_id in range(20):
+        record = copy.deepcopy(nma_record)
+        record.update(id=f"record-{revision_id}", revision_id=revision_id)
+        records.append(record)
+    obj_list = {"hits": {"hits": records, "total": len(records)}, "links": {"self": "https://example.org/api"}}
+
+    chunks = list(serializer.serialize_object_list(obj_list))
+    # all the codes of the page are resolved with a single call, unknown items are not looked up again
+    assert len(bulk_code_loader.requests) == 1
+    assert ("resourcerelationtypes", "IsReferencedBy") in bulk_code_loader.requests[0]
+    assert code_loader.calls == 0
+
+    streamed = json.loads("".join(chunks))
+    assert streamed == serializer.dump_list(obj_list)
+    assert streamed["hits"]["total"] == len(records)
+    assert streamed["links"] == {"self": "https://example.org/api"}
+    # dump_list found the records in the revision cache, so nothing was resolved again
+    assert len(bulk_code_loader.requests) == 1
+    assert streamed["hits"]["hits"][0] == serializer.dump_obj(nma_record)
+
+
+def test_production_datacite_list_resolves_codes_at_once(app):
+    code_loader = CountingCodeLoader()
+    bulk_code_loader = CountingBulkCodeLoader()
+    serializer = CCMMProductionDataCiteJSONSerializer_1_1_0(code_loader=code_loader, bulk_code_loader=bulk_code_loader)
+    datacite_cache.clear()
+
+    production_record = json.loads(PRODUCTION_JSON_FILE.read_text(encoding="utf-8"))
+    # relation types of related identifiers are looked up by DataCite43Schema in the vocabulary service
+    del production_record["metadata"]["related_identifiers"]
+    production_record["metadata"]["contributors"] = [
+        {"role": {"id": "Editor"}, "person_or_org": {"name": "Nováková, Jana", "type": "personal"}},
+        {"role": {"id": "Unknown"}, "person_or_org": {"name": "Svoboda, Petr", "type": "personal"}},
+    ]
+    records = []
+    for revision_id in range(10):
+        record = copy.deepcopy(production_record)
+        record.update(
+            id=f"record-{revision_id}",
+            revision_id=revision_id,
+            updated="2026-02-01T10:00:00+00:00",
+            pids={},
+        )
+        records.append(record)
+    obj_list = {"hits": {"hits": records, "total": len(records)}}
+
+    streamed = json.loads("".join(serializer.serialize_object_list(obj_list)))
+    # resource, title, description and date types and contributor roles of the page are resolved with a single call
+    assert bulk_code_loader.requests == [
+        {
+            ("resourcetypes", "c_ddb1"),
+            ("titletypes", "TranslatedTitle"),
+            ("descriptiontypes", "abstract"),
+            ("datetypes", "Collected"),
+            ("contributorsroles", "Editor"),
+            ("contributorsroles", "Unknown"),
+        }
+    ]
+    assert code_loader.calls == 0
+
+    datacite = streamed["hits"]["hits"][0]
+    assert datacite["types"] == {"resourceTypeGeneral": "Dataset"}
+    assert datacite["titles"][1]["titleType"] == "TranslatedTitle"
+    assert [description["descriptionType"] for description in datacite["descriptions"]] == ["Abstract"]
+    assert [contributor["contributorType"] for contributor in datacite["contributors"]] == ["Editor", "Other"]
+    assert datacite["dates"] == [
+        {"date": "2025", "dateType": "Issued"},
+        {"date": "2025-04-27", "dateType": "Collected", "dateInformation": "Date collected"},
+        {"date": "2024", "dateType": "Collected", "dateInformation": "Collection period"},
+        {"date": "2026-02-01", "dateType": "Updated"},
+    ]
+
+
+def test_production_locations():
+    record = json.loads(PRODUCTION_JSON_FILE.read_text(encoding="utf-8"))
+
+    # bounding boxes are stored as rectangles in production records
+    assert ProductionDataCiteSchema(code_loader=CountingCodeLoader()).get_locations(record) == [
+        {
+            "geoLocationPlace": "Středočeský kraj",
+            "geoLocationBox": {
+                "westBoundLongitude": "13.394972",
+                "eastBoundLongitude": "15.585575",
+                "southBoundLatitude": "49.50127",
+                "northBoundLatitude": "50.614216",
+            },
+        }
+    ]
+
+
+def test_geolocations():
+    assert geojson_geolocations({"type": "Point", "coordinates": [14.4, 50.1]}) == [
+        {"geoLocationPoint": {"pointLongitude": "14.4", "pointLatitude": "50.1"}}
+    ]
+    triangle = [[14.0, 50.0], [15.0, 50.0], [14.5, 51.0], [14.0, 50.0]]
+    assert geojson_geolocations({"type": "MultiPolygon", "coordinates": [[triangle]]}) == [
+        {
+            "geoLocationPolygons": [
+                {"polygonPoints": [{"pointLongitude": str(lon), "pointLatitude": str(lat)} for lon, lat in triangle]}
+            ]
+        }
+    ]
+
+    # EPSG:4326 positions are in the latitude, longitude order
+    gml = (
+        '<gml:Point xmlns:gml="http://www.opengis.net/gml/3.2" srsName="http://www.opengis.net/def/crs/EPSG/0/4326">'
+        "<gml:pos>50.1 14.4</gml:pos></gml:Point>"
+    )
+    assert gml_geolocations(gml) == [{"geoLocationPoint": {"pointLongitude": "14.4", "pointLatitude": "50.1"}}]
+    assert gml_geolocations(gml.replace("EPSG/0/4326", "EPSG/0/5514")) == []
@@ -0,0 +1,104 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+import random
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from lxml import etree
+
+from ccmm_invenio.parsers.generate_xsd_parser import generate_parser_source
+from ccmm_invenio.parsers.nma_1_1_0 import CCMMXMLNMAParser
+from ccmm_invenio.parsers.xsd_schema import Schema, load_schema
+from tests.nma_records import NAMESPACE, NMA_XML_FILE, XSD_FILE, build_record, vocabulary_loader
+
+if TYPE_CHECKING:
+    from ccmm_invenio.parsers.base import CCMMXMLParser
+
+# the speed comparison depends on the machine and its load, so it is run only on request
+RUN_BENCHMARKS = bool(os.environ.get("CCMM_BENCHMARKS"))
+# maximum ratio of parsing times of the generated and NMA parsers
+PARSE_TIME_RATIO = float(os.environ.get("CCMM_GENERATED_PARSER_TIME_RATIO", "1.2"))
+
+
+@pytest.fixture(scope="module")
+def schema() -> Schema:
+    return load_schema(XSD_FILE)
+
+
+@pytest.fixture(scope="module")
+def generated_parser(tmp_path_factory) -> CCMMXMLParser:
+    module_path = tmp_path_factory.mktemp("generated") / "generated_parser.py"
+    module_path.write_text(
+        generate_parser_source(XSD_FILE, "CCMMXMLGeneratedParser", namespace=NAMESPACE),
+        encoding="utf-8",
+    )
+    spec = importlib.util.spec_from_file_location("generated_parser", module_path)
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.CCMMXMLGeneratedParser(vocabulary_loader=vocabulary_loader)
+
+
+def test_load_schema_logs_skipped_references(capsys, caplog):
+    # the schema is loaded by the CCMM XML serializer at runtime, nothing may be written to stdout
+    with caplog.at_level(logging.WARNING, logger="ccmm_invenio.parsers.xsd_schema"):
+        load_schema(XSD_FILE)
+    assert capsys.readouterr().out == ""
+    assert any("gml:AbstractGeometry" in record.getMessage() for record in caplog.records)
+
+
+def test_generated_parser_on_nma_sample(generated_parser):
+    nma_parser = CCMMXMLNMAParser(vocabulary_loader=vocabulary_loader)
+
+    expected = nma_parser.parse(etree.fromstring(NMA_XML_FILE.read_bytes()))
+    record = generated_parser.parse(etree.fromstring(NMA_XML_FILE.read_bytes()))
+
+    # wkt is lost by the NMA parser
+    wkt = record["metadata"]["locations"][0]["geometry"].pop("wkt")
+    assert wkt["srs_name"] == "http://www.opengis.net/def/crs/EPSG/0/4326"
+    assert wkt["value"].startswith("POLYGON ((14.508682697577541")
+    assert record == expected
+
+
+def test_generated_parser_on_random_records(schema, generated_parser):
+    nma_parser = CCMMXMLNMAParser(vocabulary_loader=vocabulary_loader)
+    rng = random.Random(1)  # noqa: S311 - not used for cryptography
+
+    for _ in range(200):
+        xml = etree.tostring(build_record(schema, rng))
+        assert generated_parser.parse(etree.fromstring(xml)) == nma_parser.parse(etree.fromstring(xml)), xml
+
+
+def parse_time(parser: CCMMXMLParser, records: list[bytes]) -> float:
+    """Return the best time of parsing all the records out of several runs."""
+    times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for xml in records:
+            parser.parse(etree.fromstring(xml))
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="benchmark, set CCMM_BENCHMARKS=1 to run it")
+def test_generated_parser_speed(schema, generated_parser):
+    nma_parser = CCMMXMLNMAParser(vocabulary_loader=vocabulary_loader)
+    rng = random.Random(2)  # noqa: S311 - not used for cryptography
+    records = [NMA_XML_FILE.read_bytes()] + [etree.tostring(build_record(schema, rng)) for _ in range(100)]
+
+    generated_time = parse_time(generated_parser, records)
+    nma_time = parse_time(nma_parser, records)
+    assert generated_time < nma_time * PARSE_TIME_RATIO
@@ -0,0 +1,43 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+# modules that must be imported only when a record is actually parsed
+HEAVY_MODULES = {"langdetect", "pycountry", "invenio_access", "invenio_vocabularies"}
+
+# cumulative import time of the parser in microseconds (measured in a fresh interpreter)
+IMPORT_TIME_BUDGET = int(os.environ.get("CCMM_IMPORT_TIME_BUDGET_US", "200000"))
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Import the module in a fresh interpreter and return cumulative import times of all imported modules."""
+    result = subprocess.run(  # noqa: S603 - running the current interpreter
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_parser_import_does_not_load_heavy_dependencies():
+    times = import_times("ccmm_invenio.parsers.production_1_1_0")
+    assert sorted(name for name in times if name.split(".")[0] in HEAVY_MODULES) == []
+    assert times["ccmm_invenio.parsers.production_1_1_0"] < IMPORT_TIME_BUDGET
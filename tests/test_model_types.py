@@ -0,0 +1,56 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+from __future__ import annotations
+
+from oarepo_model import from_yaml
+
+import ccmm_invenio.models
+from ccmm_invenio.models import CCMMNMAPreset, CCMMProductionPreset, ccmm_1_1_0, ccmm_production_1_1_0
+from ccmm_invenio.models.type_registry import LazyTypes, _marshalled_types
+
+
+def test_model_types_are_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("CCMM_INVENIO_MODEL_CACHE", str(tmp_path))
+    _marshalled_types.cache_clear()
+
+    types = ccmm_production_1_1_0()
+    assert (
+        types["CCMMDataset"]
+        == from_yaml("1.1.0-2026-01-29/ccmm-invenio.yaml", ccmm_invenio.models.__file__)["CCMMDataset"]
+    )
+    assert len(list(tmp_path.glob("*.marshal"))) == 5
+
+    # every access returns a fresh copy
+    types.clear()
+    assert CCMMProductionPreset.types == ccmm_production_1_1_0()
+    assert CCMMProductionPreset.types is not CCMMProductionPreset.types
+    assert CCMMNMAPreset.types == ccmm_1_1_0()
+
+    # a new process would load the types from the on-disk cache
+    _marshalled_types.cache_clear()
+    assert ccmm_production_1_1_0() == CCMMProductionPreset.types
+
+
+def test_model_types_are_loaded_once_per_instance():
+    loaded: list[dict] = []
+
+    def loader() -> dict:
+        loaded.append({"Type": {"properties": {}}})
+        return loaded[-1]
+
+    class Preset:
+        types = LazyTypes(loader)
+
+    preset = Preset()
+    assert preset.types is preset.types
+    assert len(loaded) == 1
+    # other instances and the class get their own copies
+    assert Preset().types is not preset.types
+    assert Preset.types is not Preset.types
+    assert len(loaded) == 4
@@ -8,64 +8,16 @@
 #
 from __future__ import annotations
 
+import asyncio
+import threading
 from pathlib import Path
 
 from lxml.etree import fromstring
 
+from ccmm_invenio.parsers.base import QualifiedTag, XMLNamespace, datatype_converter
 from ccmm_invenio.parsers.nma_1_1_0 import CCMMXMLNMAParser
 from tests.model import nma_dataset
-
-vocab_items = {
-    "titletypes": {"https://vocabs.ccmm.cz/registry/codelist/AlternateTitle/translatedTitle": "translatedTitle"},
-    "identifierschemes": {
-        "https://doi.org/": "doi",
-        "https://organization.cz/datasets/": "organization-specific-id",
-        "https://ror.org/": "ror",
-        "https://orcid.org/": "orcid",
-    },
-    "resourcetypes": {
-        "https://vocabularies.coar-repositories.org/resource_types/c_ddb1/": "Dataset",
-        "http://purl.org/coar/resource_type/c_18cf/": "Software",
-        "http://purl.org/coar/resource_type/8KJG-QS0Y": "PhysicalObject",
-        "http://purl.org/coar/resource_type/FF4C-28RK": "ObservationData",
-    },
-    "languages": {
-        "http://publications.europa.eu/resource/authority/language/CES": "CES",
-        "http://publications.europa.eu/resource/authority/language/ENG": "ENG",
-    },
-    "datetypes": {
-        "https://vocabs.ccmm.cz/registry/codelist/TimeReference/Created": "Created",
-        "https://vocabs.ccmm.cz/registry/codelist/TimeReference/Collected": "Collected",
-    },
-    "descriptiontypes": {"https://vocabs.ccmm.cz/registry/codelist/DescriptionType/abstract": "abstract"},
-    "fileformats": {
-        "https://op.europa.eu/web/eu-vocabularies/concept/-/resource?"
-        "uri=http://publications.europa.eu/resource/authority/file-type/GPKG": "GPKG"
-    },
-    "mediatypes": {
-        "https://op.europa.eu/web/eu-vocabularies/concept/-/resource?"
-        "uri=http://publications.europa.eu/resource/authority/file-type/ZIP": "ZIP"
-    },
-    "checksumalgorithms": {
-        "https://www.iana.org/go/rfc6920": "rfc6920",
-    },
-    "locationrelationtypes": {"https://vocabs.ccmm.cz/registry/codelist/LocationRelation/Collected": "Collected"},
-    "resourceagentroletypes": {
-        "https://vocabs.ccmm.cz/registry/codelist/AgentRole/DataManager": "DataManager",
-        "https://vocabs.ccmm.cz/registry/codelist/AgentRole/Creator": "Creator",
-        "https://vocabs.ccmm.cz/registry/codelist/AgentRole/Publisher": "Publisher",
-    },
-    "resourcerelationtypes": {
-        "https://vocabs.ccmm.cz/registry/codelist/RelationType/IsReferencedBy": "IsReferencedBy",
-        "https://vocabs.ccmm.cz/registry/codelist/RelationType/IsDerivedFrom": "IsDerivedFrom",
-        "https://vocabs.ccmm.cz/registry/codelist/RelationType/HasMetadata": "HasMetadata",
-    },
-    "subjectschemes": {
-        "https://vocabs.ccmm.cz/registry/codelist/SubjectCategory/": "Frascati",
-        "https://inspire.ec.europa.eu/theme/": "INSPIRE",
-    },
-    "accessrights": {"https://vocabularies.coar-repositories.org/access_rights/c_abf2/": "OpenAccess"},
-}
+from tests.nma_records import vocab_items, vocabulary_loader
 
 
 def test_parse_nma_1_1_0(clean_strings):
@@ -569,3 +521,65 @@ def test_load_nma_1_1_0(clean_strings):
 
     record = parser.parse(root_el)
     nma_dataset.RecordSchema().load(record)
+
+
+def test_parse_async_nma_1_1_0():
+    xml_file = Path(__file__).parent / "data" / "nma_1_1_0-2026-01-29.xml"
+    sync_parser = CCMMXMLNMAParser(vocabulary_loader=vocabulary_loader)
+    expected = sync_parser.parse(fromstring(xml_file.read_bytes()))
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def async_vocabulary_loader(vocab_type: str, iri: str) -> str:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return vocab_items[vocab_type][iri]
+
+    parser = CCMMXMLNMAParser(vocabulary_loader=None)  # type: ignore[arg-type]
+    record = asyncio.run(parser.parse_async(fromstring(xml_file.read_bytes()), async_vocabulary_loader))
+    assert record == expected
+    # lookups are issued concurrently
+    assert max_in_flight > 1
+
+    # without an async loader, the synchronous loader is used in the calling thread
+    lookup_threads = set()
+
+    def thread_recording_loader(vocab_type: str, iri: str) -> str:
+        lookup_threads.add(threading.get_ident())
+        return vocabulary_loader(vocab_type, iri)
+
+    sync_parser = CCMMXMLNMAParser(vocabulary_loader=thread_recording_loader)
+    records = asyncio.run(sync_parser.parse_many_async([fromstring(xml_file.read_bytes()) for _ in range(3)]))
+    assert records == [expected] * 3
+    assert lookup_threads == {threading.get_ident()}
+
+
+def test_qualified_tags_are_shared():
+    root_el = fromstring(b'<a xmlns="urn:test"><b/><b/><c xmlns=""/></a>')
+    b1, b2, c = root_el
+    assert QualifiedTag.from_element(b1) is QualifiedTag.from_element(b2)
+    assert QualifiedTag.from_element(b1) == QualifiedTag(namespace="urn:test", tag="b")
+    assert QualifiedTag.from_element(c) == QualifiedTag(namespace=None, tag="c")
+
+    ns = XMLNamespace("urn:test")
+    assert ns.b is ns["b"]
+    assert ns.b == QualifiedTag.from_element(b1)
+
+
+def test_datatype_converter():
+    class IdentifierValueParser(CCMMXMLNMAParser):
+        @datatype_converter("ccmmidentifier", path=["identifier"])
+        def convert_identifier(self, identifier) -> str:
+            return identifier["value"]
+
+    xml_file = Path(__file__).parent / "data" / "nma_1_1_0-2026-01-29.xml"
+    expected = CCMMXMLNMAParser(vocabulary_loader=vocabulary_loader).parse(fromstring(xml_file.read_bytes()))
+    record = IdentifierValueParser(vocabulary_loader=vocabulary_loader).parse(fromstring(xml_file.read_bytes()))
+
+    # only the identifiers of the dataset are converted
+    assert record["metadata"].pop("identifiers") == [x["value"] for x in expected["metadata"].pop("identifiers")]
+    assert record == expected
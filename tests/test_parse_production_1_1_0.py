@@ -8,11 +8,16 @@
 #
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
+from types import SimpleNamespace
 
+import pytest
 from lxml.etree import fromstring
 
+from ccmm_invenio.models import CCMMProductionDeserializer, import_batch
 from ccmm_invenio.parsers.production_1_1_0 import CCMMXMLProductionParser
+from ccmm_invenio.parsers.registry import UnsupportedVersionError
 from tests.model import production_dataset
 
 vocab_items = {
@@ -215,6 +220,46 @@ def test_parse_production_1_1_0(clean_strings):
     assert "<dataset" in cleaned_record["ccmm_xml"]
 
 
+def test_parse_async_production_1_1_0_resolves_license():
+    xml_file = Path(__file__).parent / "data" / "nma_1_1_0-2026-01-29.xml"
+    licenses = {"https://creativecommons.org/licenses/by/4.0/": "cc-by-4.0"}
+    requested = []
+
+    async def async_vocabulary_loader(vocabulary_type: str, iri: str) -> str:
+        requested.append((vocabulary_type, iri))
+        if vocabulary_type == "licenses":
+            return licenses[iri]
+        return vocab_items[vocabulary_type][iri]
+
+    # the license is resolved by the async loader together with the other terms, not by a lookup of its own
+    parser = CCMMXMLProductionParser(vocabulary_loader=None)  # type: ignore[arg-type]
+    record = asyncio.run(parser.parse_async(fromstring(xml_file.read_bytes()), async_vocabulary_loader))
+    assert record["metadata"]["rights"] == [{"id": "cc-by-4.0"}]
+    assert ("licenses", "https://creativecommons.org/licenses/by/4.0/") in requested
+
+    # licenses missing in the vocabulary are stored as links
+    sync_parser = CCMMXMLProductionParser(vocabulary_loader=lambda vocab_type, iri: vocab_items[vocab_type][iri])
+    expected = sync_parser.parse(fromstring(xml_file.read_bytes()))
+    assert asyncio.run(sync_parser.parse_async(fromstring(xml_file.read_bytes()))) == expected
+    assert expected["metadata"]["rights"][0]["link"] == "https://creativecommons.org/licenses/by/4.0/"
+
+
+def test_parse_production_1_1_0_license_lookup_failure():
+    xml_file = Path(__file__).parent / "data" / "nma_1_1_0-2026-01-29.xml"
+
+    def vocabulary_loader(vocabulary_type: str, iri: str) -> str:
+        if vocabulary_type == "licenses":
+            raise RuntimeError("licenses vocabulary does not exist")
+        return vocab_items[vocabulary_type][iri]
+
+    # the license is optional, a failed lookup stores it as a link instead of failing the import
+    parser = CCMMXMLProductionParser(vocabulary_loader=vocabulary_loader)
+    record = parser.parse(fromstring(xml_file.read_bytes()))
+    assert record["metadata"]["rights"] == [
+        {"link": "https://creativecommons.org/licenses/by/4.0/", "title": {"en": "Attribution 4.0 International"}}
+    ]
+
+
 def test_load_production_1_1_0(app, clean_strings):
     xml_file = Path(__file__).parent / "data" / "nma_1_1_0-2026-01-29.xml"
     root_el = fromstring(xml_file.read_bytes())
@@ -226,3 +271,105 @@ def test_load_production_1_1_0(app, clean_strings):
 
     record = parser.parse(root_el)
     production_dataset.RecordSchema().load(record)
+
+
+def test_deserialize_batch_production_1_1_0(app):
+    xml_file = Path(__file__).parent / "data" / "nma_1_1_0-2026-01-29.xml"
+    dataset = xml_file.read_bytes().split(b"?>", 1)[1]
+    broken_dataset = dataset.replace(b"<title>", b"<unknown_element/><title>", 1)
+    payload = b"<datasets>" + dataset + broken_dataset + dataset + b"</datasets>"
+
+    resolved: list[tuple[str, str]] = []
+
+    def vocabulary_loader(vocabulary_type: str, iri: str) -> str:
+        resolved.append((vocabulary_type, iri))
+        return vocab_items[vocabulary_type][iri]
+
+    deserializer = CCMMProductionDeserializer(parser=CCMMXMLProductionParser, vocabulary_loader=vocabulary_loader)
+    items = deserializer.deserialize_batch(payload)
+
+    assert [(item.index, item.status) for item in items] == [(0, "ok"), (1, "error"), (2, "ok")]
+    assert items[1].record is None
+    assert "unknown_element" in items[1].error
+    assert items[0].record == items[2].record
+    production_dataset.RecordSchema().load(items[0].record)
+    # each vocabulary term is resolved only once for the whole batch
+    assert len(resolved) == len(set(resolved))
+
+    # a single dataset is a batch of one
+    [item] = deserializer.deserialize_batch(dataset)
+    assert item.record == items[0].record
+
+
+def test_deserialize_mixed_version_batch_production_1_1_0(app):
+    xml_file = Path(__file__).parent / "data" / "nma_1_1_0-2026-01-29.xml"
+    dataset = xml_file.read_bytes().split(b"?>", 1)[1]
+    dataset_1_1 = dataset.replace(
+        b"https://schema.ccmm.cz/research-data/1.0", b"https://schema.ccmm.cz/research-data/1.1"
+    )
+    unsupported_dataset = dataset.replace(
+        b"https://schema.ccmm.cz/research-data/1.0", b"https://schemas.dataspecer.com/xsd/core/"
+    )
+    payload = b"<datasets>" + dataset + unsupported_dataset + dataset_1_1 + b"</datasets>"
+
+    def vocabulary_loader(vocabulary_type: str, iri: str) -> str:
+        return vocab_items[vocabulary_type][iri]
+
+    deserializer = CCMMProductionDeserializer(parser=CCMMXMLProductionParser, vocabulary_loader=vocabulary_loader)
+    items = deserializer.deserialize_batch(payload)
+
+    assert [(item.index, item.status) for item in items] == [(0, "ok"), (1, "error"), (2, "ok")]
+    assert "Unsupported CCMM XML version" in items[1].error
+    assert items[0].record["metadata"] == items[2].record["metadata"]
+
+    assert deserializer.deserialize(dataset_1_1)["metadata"] == items[0].record["metadata"]
+    with pytest.raises(UnsupportedVersionError):
+        deserializer.deserialize(unsupported_dataset)
+
+
+class FakeService:
+    """Records service creating drafts in memory, the second draft fails."""
+
+    def __init__(self):
+        """Create the service."""
+        self.created: list[dict] = []
+
+    def create(self, identity, data):
+        """Create a draft."""
+        _ = identity
+        if len(self.created) == 1:
+            self.created.append(data)
+            raise RuntimeError("search cluster is not available")
+        self.created.append(data)
+        return SimpleNamespace(id=f"draft-{len(self.created)}")
+
+
+class FailingParser(CCMMXMLProductionParser):
+    """Parser failing outside of the parsing of elements on datasets marked with the failing attribute."""
+
+    def parse(self, xml_root):
+        """Parse the dataset."""
+        if xml_root.get("failing"):
+            raise RuntimeError("vocabulary service failed")
+        return super().parse(xml_root)
+
+
+def test_import_batch_production_1_1_0(app):
+    xml_file = Path(__file__).parent / "data" / "nma_1_1_0-2026-01-29.xml"
+    dataset = xml_file.read_bytes().split(b"?>", 1)[1]
+    failing_dataset = dataset.replace(b"<dataset ", b'<dataset failing="true" ', 1)
+    payload = b"<datasets>" + dataset + failing_dataset + dataset + dataset + b"</datasets>"
+
+    def vocabulary_loader(vocabulary_type: str, iri: str) -> str:
+        return vocab_items[vocabulary_type][iri]
+
+    deserializer = CCMMProductionDeserializer(parser=FailingParser, vocabulary_loader=vocabulary_loader)
+    service = FakeService()
+    items = import_batch(service, deserializer, payload, identity=object())
+
+    # any error of a single dataset does not stop the batch, not only parse errors
+    assert [(item.index, item.status) for item in items] == [(0, "ok"), (1, "error"), (2, "error"), (3, "ok")]
+    assert items[1].error == "vocabulary service failed"
+    assert items[2].error == "search cluster is not available"
+    assert [item.id for item in items] == ["draft-1", None, None, "draft-3"]
+    assert len(service.created) == 3
@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+from __future__ import annotations
+
+import pytest
+from lxml.etree import fromstring
+
+from ccmm_invenio.parsers.base import CachingVocabularyLoader
+from ccmm_invenio.parsers.nma_1_1_0 import CCMMXMLNMAParser
+from ccmm_invenio.parsers.registry import CCMM_NAMESPACES, CCMMParserRegistry, UnsupportedVersionError
+from tests.nma_records import NMA_XML_FILE, vocabulary_loader
+
+NMA_XML = NMA_XML_FILE.read_bytes()
+
+
+@pytest.fixture
+def registry() -> CCMMParserRegistry:
+    registry = CCMMParserRegistry(vocabulary_loader=vocabulary_loader)
+    for namespace in CCMM_NAMESPACES:
+        registry.register(CCMMXMLNMAParser, namespace)
+    return registry
+
+
+def test_parser_is_selected_by_namespace(registry):
+    data_1_1 = NMA_XML.replace(b"https://schema.ccmm.cz/research-data/1.0", b"https://schema.ccmm.cz/research-data/1.1")
+
+    parser_1_0 = registry.parser_for_data(NMA_XML)
+    parser_1_1 = registry.parser_for_data(data_1_1)
+    assert parser_1_0.ns.uri == "https://schema.ccmm.cz/research-data/1.0"
+    assert parser_1_1.ns.uri == "https://schema.ccmm.cz/research-data/1.1"
+    assert isinstance(parser_1_1, CCMMXMLNMAParser)
+
+    # parsers are created once and reused
+    assert registry.parser_for_data(NMA_XML) is parser_1_0
+    assert registry.parser_for(fromstring(data_1_1)) is parser_1_1
+
+    expected = CCMMXMLNMAParser(vocabulary_loader=vocabulary_loader).parse(fromstring(NMA_XML))
+    assert registry.parse(fromstring(NMA_XML)) == expected
+    assert registry.parse(fromstring(data_1_1), CachingVocabularyLoader(vocabulary_loader)) == expected
+
+
+def test_parser_is_selected_by_version(registry):
+    class VersionedParser(CCMMXMLNMAParser):
+        pass
+
+    registry.register(VersionedParser, CCMM_NAMESPACES[0], version="2.0")
+
+    versioned = NMA_XML.replace(b"<dataset ", b'<dataset version="2.0" ', 1)
+    assert type(registry.parser_for_data(versioned)) is VersionedParser
+    # unknown versions fall back to the parser registered for any version
+    other_version = NMA_XML.replace(b"<dataset ", b'<dataset version="3.0" ', 1)
+    assert type(registry.parser_for_data(other_version)) is CCMMXMLNMAParser
+
+
+def test_unsupported_version_is_rejected_from_root_element(registry):
+    # only the root element is read, so the rest of the document does not need to be well-formed
+    data = b'<?xml version="1.0"?><dataset xmlns="https://schemas.dataspecer.com/xsd/core/"><iri>unclosed'
+    with pytest.raises(UnsupportedVersionError):
+        registry.parser_for_data(data)
+
+    with pytest.raises(UnsupportedVersionError):
+        registry.parse(fromstring(b"<dataset><iri>https://example.org</iri></dataset>"))
+
+
+def test_fallback_parser_is_shared_by_versions(registry):
+    namespace = CCMM_NAMESPACES[0]
+    parsers = {id(registry.get_parser(namespace, f"{version}.0")) for version in range(100)}
+
+    assert len(parsers) == 1
+    assert registry.get_parser(namespace) is registry.get_parser(namespace, "0.0")
+    # only the parser of the registration is cached, not one per version attribute
+    assert [key for key in registry._parsers if key[0] == namespace] == [(namespace, None)]  # noqa: SLF001
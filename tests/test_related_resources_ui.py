@@ -0,0 +1,81 @@
+#
+# Copyright (c) 2026 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+from __future__ import annotations
+
+from unittest import mock
+
+from invenio_vocabularies.resources import VocabularyL10Schema
+from marshmallow import Schema, fields
+from oarepo_runtime.services.schema.ui import LocalizedEDTF
+
+from ccmm_invenio.serializers.related_resources_ui import CCMMRelatedResourceUISchema
+
+RESOURCE_TYPE = {"id": "dataset", "title": {"cs": "Datová sada", "en": "Dataset"}}
+RELATION_TYPE = {"id": "cites", "title": {"en": "Cites"}}
+PUBLICATION_DATES = ["2020-01-02", "2021", "2020-01/2021-05"]
+
+
+class RecordUISchema(Schema):
+    """Record UI schema with the related resources."""
+
+    related_resources = fields.List(fields.Nested(CCMMRelatedResourceUISchema))
+
+
+class UncachedRelatedResourceUISchema(CCMMRelatedResourceUISchema):
+    """Related resource UI schema localizing every value."""
+
+    publication_date_l10n_short = LocalizedEDTF(attribute="publication_date", format="short")
+    publication_date_l10n_medium = LocalizedEDTF(attribute="publication_date", format="medium")
+    publication_date_l10n_long = LocalizedEDTF(attribute="publication_date", format="long")
+    publication_date_l10n_full = LocalizedEDTF(attribute="publication_date", format="full")
+
+    resource_type = fields.Nested(VocabularyL10Schema)
+    relation_type = fields.Nested(VocabularyL10Schema)
+    languages = fields.List(fields.Nested(VocabularyL10Schema))
+
+
+class UncachedRecordUISchema(Schema):
+    """Record UI schema with the related resources localized without the cache."""
+
+    related_resources = fields.List(fields.Nested(UncachedRelatedResourceUISchema))
+
+
+def related_resources(count: int) -> list[dict]:
+    return [
+        {
+            "title": f"Related resource {idx}",
+            "publication_date": PUBLICATION_DATES[idx % len(PUBLICATION_DATES)],
+            "resource_type": RESOURCE_TYPE,
+            "relation_type": RELATION_TYPE,
+            "languages": [{"id": "cs", "title": {"cs": "čeština", "en": "Czech"}}, {"id": "en"}],
+        }
+        for idx in range(count)
+    ]
+
+
+def test_related_resources_are_localized_once(app):
+    record = {"related_resources": related_resources(100)}
+    # the same vocabulary item stored with a different title is localized on its own
+    record["related_resources"].append({"resource_type": {"id": "dataset", "title": {"en": "Data set"}}})
+
+    with app.test_request_context(headers={"Accept-Language": "en"}):
+        expected = UncachedRecordUISchema().dump(record)
+
+        with (
+            mock.patch.object(
+                LocalizedEDTF, "format_value", autospec=True, side_effect=LocalizedEDTF.format_value
+            ) as format_value,
+            mock.patch.object(VocabularyL10Schema, "dump", autospec=True, side_effect=VocabularyL10Schema.dump) as dump,
+        ):
+            assert RecordUISchema().dump(record) == expected
+
+    # four formats of three distinct dates, five distinct vocabulary items
+    assert format_value.call_count == 4 * len(PUBLICATION_DATES)
+    assert dump.call_count == 5
+    assert expected["related_resources"][-1]["resource_type"]["title_l10n"] == "Data set"
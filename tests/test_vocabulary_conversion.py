@@ -0,0 +1,399 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+from __future__ import annotations
+
+import json
+from email.message import Message
+from functools import partial
+from pathlib import Path
+from typing import ClassVar
+from urllib.error import HTTPError
+
+import pytest
+import yaml
+from click.testing import CliRunner, Result
+from rdflib import SKOS, Graph, URIRef
+
+from ccmm_invenio.conversion import ccmm_sparql, convert_vocabularies, rdf_cache
+from ccmm_invenio.conversion.ccmm_copy import CopyReader
+from ccmm_invenio.conversion.ccmm_csv import CSVReader
+from ccmm_invenio.conversion.ccmm_filtered import DescendantsOfFilter
+from ccmm_invenio.conversion.ccmm_sparql import ExtraProperty, SPARQLReader
+from ccmm_invenio.conversion.hierarchy import HierarchyCycleError, sort_by_hierarchy
+from ccmm_invenio.conversion.manifest import BuildManifest, describe_parameter
+from ccmm_invenio.conversion.rdf_cache import RDFCache, RDFCacheMissError
+from ccmm_invenio.conversion.yaml_io import dump_yaml_list, iter_yaml_list, load_yaml
+
+
+def term(term_id: str, parent: str | None = None) -> dict:
+    ret: dict = {"id": term_id, "props": {"iri": f"https://example.org/{term_id}"}}
+    if parent:
+        ret["hierarchy"] = {"parent": parent}
+    return ret
+
+
+def test_sort_by_hierarchy_keeps_ordered_input():
+    terms = [term("a"), term("b", "a"), term("c", "b"), term("d"), term("e", "a")]
+    assert sort_by_hierarchy(terms) == terms
+
+
+def test_sort_by_hierarchy_moves_children_behind_parents():
+    terms = [term("c", "b"), term("x"), term("b", "a"), term("a"), term("d", "a"), term("y", "unknown")]
+    assert [t["id"] for t in sort_by_hierarchy(terms)] == ["x", "a", "b", "c", "d", "y"]
+
+
+def test_sort_by_hierarchy_reports_cycle():
+    terms = [term("root"), term("q", "a"), term("a", "b"), term("b", "a")]
+    with pytest.raises(HierarchyCycleError) as exc_info:
+        sort_by_hierarchy(terms)
+    assert exc_info.value.cycle == ["a", "b", "a"]
+
+
+def test_descendants_of_filter_does_not_depend_on_order():
+    terms = [term("c", "b"), term("x", "z"), term("b", "a"), term("a"), term("d", "a"), term("z")]
+    flt = DescendantsOfFilter(descendants_of={"https://example.org/a"})
+    assert [t["id"] for t in flt.filter(terms)] == ["c", "b", "d"]
+    assert [t["id"] for t in flt.filter(list(reversed(terms)))] == ["d", "b", "c"]
+
+
+def test_descendants_of_filter_depth_limits():
+    terms = [term("a"), term("b", "a"), term("c", "b"), term("d", "c"), term("z"), term("y", "z"), term("w", "y")]
+    flt = DescendantsOfFilter(descendants_of={"https://example.org/a"}, max_depth=2)
+    assert [t["id"] for t in flt.filter(terms)] == ["b", "c"]
+
+    flt = DescendantsOfFilter(descendants_of={"https://example.org/a": 1, "https://example.org/z": None})
+    assert [t["id"] for t in flt.filter(terms)] == ["b", "y", "w"]
+
+
+def test_dump_yaml_list_round_trip(tmp_path):
+    terms = [term("a"), term("b", "a"), {"id": "c", "title": {"cs": "Čeština", "en": "multi\nline"}}]
+    output = tmp_path / "terms.yaml"
+    dump_yaml_list(iter(terms), output)
+    assert load_yaml(output) == terms
+    assert yaml.safe_load(output.read_text(encoding="utf-8")) == terms
+    assert list(iter_yaml_list(output)) == terms
+
+    dump_yaml_list([], output)
+    assert load_yaml(output) == []
+    assert list(iter_yaml_list(output)) == []
+
+
+def test_csv_reader_applies_extra_files(tmp_path):
+    header = "IRI;base IRI;parentId;id;title_cs;title_en;definition_cs;definition_en\n"
+    main = tmp_path / "main.csv"
+    main.write_text(
+        header + "https://example.org/b;https://example.org;a;b;B;B;;\n"
+        "https://example.org/a;https://example.org;;a;A;A;;\n"
+        ";;;;;;;\n",
+        encoding="utf-8",
+    )
+    first = tmp_path / "first.csv"
+    first.write_text("id;props.datacite;props.openaire\na;X;Y\nmissing;Z;Z\n", encoding="utf-8")
+    second = tmp_path / "second.csv"
+    second.write_text("id; props.datacite \na;W\n", encoding="utf-8")
+
+    terms = list(CSVReader("test", main, extra=[first, second]).data())
+    assert [t["id"] for t in terms] == ["a", "b"]
+    assert terms[0]["props"] == {
+        "iri": "https://example.org/a",
+        "base_iri": "https://example.org",
+        "datacite": "W",
+        "openaire": "Y",
+    }
+    assert "datacite" not in terms[1]["props"]
+
+
+# blank nodes get new labels on every parse, so the serialized graph differs between runs
+RDF_BODY = b"""<https://example.org/a> <http://www.w3.org/2004/02/skos/core#prefLabel> "A"@en .
+<https://example.org/a> <http://www.w3.org/2004/02/skos/core#note> _:note .
+_:note <http://www.w3.org/2004/02/skos/core#prefLabel> "note" .
+"""
+
+
+class FakeServer:
+    """Replacement of rdf_cache.download serving RDF_BODY without validators."""
+
+    def __init__(self):
+        """Create the server."""
+        self.requests: list[dict[str, str]] = []
+        self.etag: str | None = None
+
+    def __call__(self, url: str, format: str = "xml", headers: dict[str, str] | None = None):  # noqa: A002, ARG002
+        """Serve the body or raise 304 if the client has the current version."""
+        headers = headers or {}
+        self.requests.append(headers)
+        if self.etag and headers.get("If-None-Match") == self.etag:
+            raise HTTPError(url, 304, "Not Modified", Message(), None)
+        response_headers = Message()
+        if self.etag:
+            response_headers["ETag"] = self.etag
+        return RDF_BODY, url, response_headers
+
+
+def test_rdf_cache_digest_is_stable(tmp_path, monkeypatch):
+    monkeypatch.setattr(rdf_cache, "download", FakeServer())
+    url = "https://example.org/vocabulary.nt"
+
+    digest = RDFCache(tmp_path).fetch(url, format="nt")
+    # a new run downloads the document again (no etag), the fingerprint must not change
+    assert RDFCache(tmp_path).fetch(url, format="nt") == digest
+    assert len(RDFCache(tmp_path).graph(url, format="nt")) == 3
+
+
+def test_rdf_cache_offline_miss(tmp_path, monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(rdf_cache, "download", server)
+
+    with pytest.raises(RDFCacheMissError):
+        RDFCache(tmp_path, offline=True).fetch("https://example.org/vocabulary.nt", format="nt")
+    assert server.requests == []
+
+
+def test_rdf_cache_revalidation(tmp_path, monkeypatch):
+    server = FakeServer()
+    server.etag = '"v1"'
+    monkeypatch.setattr(rdf_cache, "download", server)
+    url = "https://example.org/vocabulary.nt"
+
+    cache = RDFCache(tmp_path)
+    digest = cache.fetch(url, format="nt")
+    # revalidated only once per run
+    assert cache.fetch(url, format="nt") == digest
+    assert len(server.requests) == 1
+
+    assert RDFCache(tmp_path).fetch(url, format="nt") == digest
+    assert server.requests[1] == {"If-None-Match": '"v1"'}
+    assert RDFCache(tmp_path, offline=True).fetch(url, format="nt") == digest
+    assert len(server.requests) == 2
+
+
+def test_rdf_download_accepts_only_http(tmp_path):
+    local_file = tmp_path / "vocabulary.nt"
+    local_file.write_text("", encoding="utf-8")
+    with pytest.raises(ValueError, match="http"):
+        rdf_cache.download(local_file.as_uri(), format="nt")
+
+
+def test_describe_parameter():
+    parameters = {
+        "filter": partial(DescendantsOfFilter, descendants_of={"b", "a"}),
+        "extra_props": {"notation": ExtraProperty("skos:notation", datatype="euvoc:ISO_639_1")},
+        "files": (Path("/somewhere/input.csv"),),
+        "ids": frozenset({"y", "x"}),
+    }
+    assert describe_parameter(parameters) == {
+        "extra_props": {"notation": {"datatype": "euvoc:ISO_639_1", "predicate": "skos:notation"}},
+        "files": ["input.csv"],
+        "filter": {
+            "args": [],
+            "callable": "ccmm_invenio.conversion.ccmm_filtered.DescendantsOfFilter",
+            "kwargs": {"descendants_of": ["a", "b"]},
+        },
+        "ids": ["x", "y"],
+    }
+    # the description does not depend on the order of the items or on the location of the files
+    json.dumps(describe_parameter(parameters))
+    assert describe_parameter({"ids": {"x", "y"}, "files": [Path("input.csv")]}) == describe_parameter(
+        {"files": [Path("/elsewhere/input.csv")], "ids": {"y", "x"}}
+    )
+
+
+def test_build_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    output = tmp_path / "output.yaml"
+    output.write_text("- id: a\n", encoding="utf-8")
+
+    manifest = BuildManifest(manifest_path)
+    assert not manifest.is_up_to_date("Vocabulary", "input-hash", output)
+    manifest.record("Vocabulary", "input-hash", output)
+    manifest.save()
+
+    manifest = BuildManifest(manifest_path)
+    assert manifest.is_up_to_date("Vocabulary", "input-hash", output)
+    assert not manifest.is_up_to_date("Vocabulary", "other-input-hash", output)
+    assert not manifest.is_up_to_date("Other vocabulary", "input-hash", output)
+
+    # modified or deleted outputs are regenerated
+    output.write_text("- id: b\n", encoding="utf-8")
+    assert not manifest.is_up_to_date("Vocabulary", "input-hash", output)
+    output.unlink()
+    assert not manifest.is_up_to_date("Vocabulary", "input-hash", output)
+
+    # manifests of other versions are ignored
+    manifest_path.write_text(json.dumps({"version": 0, "vocabularies": manifest.entries}), encoding="utf-8")
+    assert BuildManifest(manifest_path).entries == {}
+
+
+class CountingCopyReader(CopyReader):
+    """Copy reader counting the conversions."""
+
+    conversions: ClassVar[list[str]] = []
+
+    def data(self) -> list[dict[str, str]]:
+        """Read the vocabulary from the input file."""
+        self.conversions.append(self.name)
+        return super().data()
+
+
+def test_convert_vocabularies_check_and_force(tmp_path, monkeypatch):
+    for name in ("first", "second"):
+        (tmp_path / f"{name}.yaml").write_text(f"id: {name}\n", encoding="utf-8")
+    converters = [
+        (CountingCopyReader("First", tmp_path / "first.yaml"), tmp_path / "first_output.yaml"),
+        # the second vocabulary is converted from the output of the first one
+        (CountingCopyReader("Second", tmp_path / "first_output.yaml"), tmp_path / "second_output.yaml"),
+        (CountingCopyReader("Third", tmp_path / "second.yaml"), tmp_path / "third_output.yaml"),
+    ]
+    monkeypatch.setattr(convert_vocabularies, "vocabulary_converters", lambda root_dir, rdf_cache: converters)  # noqa: ARG005
+    monkeypatch.setattr(CountingCopyReader, "conversions", [])
+
+    def run(*args: str) -> Result:
+        return CliRunner().invoke(
+            convert_vocabularies.convert_vocabularies, ["--manifest", str(tmp_path / "manifest.json"), *args]
+        )
+
+    assert run("--check").exit_code == 1
+    assert CountingCopyReader.conversions == []
+
+    assert run().exit_code == 0
+    assert CountingCopyReader.conversions == ["First", "Second", "Third"]
+    assert run("--check").exit_code == 0
+    assert run().exit_code == 0
+    assert CountingCopyReader.conversions == ["First", "Second", "Third"]
+
+    # a vocabulary depending on a stale output is reported as stale as well
+    (tmp_path / "first.yaml").write_text("id: changed\n", encoding="utf-8")
+    result = run("--check")
+    assert result.exit_code == 1
+    assert "Vocabulary First is out of date" in result.output
+    assert "Vocabulary Second is out of date" in result.output
+    assert "Vocabulary Third is out of date" not in result.output
+    assert CountingCopyReader.conversions == ["First", "Second", "Third"]
+
+    CountingCopyReader.conversions.clear()
+    assert run().exit_code == 0
+    assert CountingCopyReader.conversions == ["First", "Second"]
+    assert load_yaml(tmp_path / "first_output.yaml") == [{"id": "changed"}]
+
+    CountingCopyReader.conversions.clear()
+    assert run("--force", "Third").exit_code == 0
+    assert CountingCopyReader.conversions == ["Third"]
+
+
+def test_convert_checks_sparql_reader_without_network(tmp_path, monkeypatch):
+    server = FakeServer()
+    server.etag = '"v1"'
+    monkeypatch.setattr(rdf_cache, "download", server)
+    output = tmp_path / "remote.yaml"
+    manifest = BuildManifest(tmp_path / "manifest.json")
+
+    def converters() -> list[tuple[SPARQLReader, Path]]:
+        # a new cache for every run, as the cache revalidates a url only once per run
+        reader = SPARQLReader(
+            "Remote",
+            "https://example.org/vocabulary.nt",
+            "https://example.org/scheme",
+            load_subgraphs=False,
+            format="nt",
+            cache=RDFCache(tmp_path / "cache"),
+        )
+        return [(reader, output)]
+
+    assert convert_vocabularies.convert(converters(), [], manifest, check=True) == ["Remote"]
+    assert server.requests == []
+
+    assert convert_vocabularies.convert(converters(), [], manifest) == []
+    assert len(server.requests) == 1
+    assert output.exists()
+
+    # the check uses the cached validators of the endpoint
+    assert convert_vocabularies.convert(converters(), [], manifest, check=True) == []
+    assert len(server.requests) == 1
+
+    # a real conversion revalidates the endpoint and converts it again if it has changed
+    server.etag = '"v2"'
+    recorded = json.dumps(manifest.entries)
+    assert convert_vocabularies.convert(converters(), [], manifest) == []
+    assert server.requests[1:] == [{"If-None-Match": '"v1"'}]
+    assert json.dumps(manifest.entries) != recorded
+    assert convert_vocabularies.convert(converters(), [], manifest, check=True) == []
+    assert len(server.requests) == 2
+
+
+def test_sparql_reader_converts_concepts(monkeypatch):
+    graph_file = Path(__file__).parent / "data" / "sparql_vocabulary.ttl"
+    monkeypatch.setattr(ccmm_sparql, "parse_source", lambda *args, **kwargs: Graph().parse(graph_file))  # noqa: ARG005
+    reader = SPARQLReader(
+        "Vocabulary",
+        "https://example.org/vocabulary",
+        "https://example.org/vocabulary/scheme",
+        load_subgraphs=False,
+        extra_props={
+            "ISO_639_1": ExtraProperty("skos:notation", datatype="euvoc:ISO_639_1"),
+            "ISO_639_3": ExtraProperty(
+                "skos:notation", datatype="http://publications.europa.eu/ontology/euvoc#ISO_639_3"
+            ),
+            "openaire": "props:openaire",
+        },
+        prefixes={"euvoc": "http://publications.europa.eu/ontology/euvoc#", "props": "http://vocabs.ccmm.cz/props/"},
+    )
+
+    # the output of the SPARQL query used by the previous version of the reader
+    assert reader.data() == [
+        {
+            "id": "alt",
+            "props": {"iri": "https://example.org/vocabulary/alt"},
+            "title": {"cs": "Alternative", "en": "Alternative"},
+        },
+        {
+            "id": "first-id",
+            "props": {"iri": "https://example.org/vocabulary/identified", "openaire": "c"},
+            "title": {"cs": "Identifikovaný", "en": "Identifikovaný"},
+            "description": {"cs": "Sloučený"},
+        },
+        {
+            "id": "second-id",
+            "props": {"iri": "https://example.org/vocabulary/identified"},
+            "title": {"cs": "Identifikovaný", "en": "Identifikovaný"},
+        },
+        {
+            "id": "root",
+            "props": {"iri": "https://example.org/vocabulary/root", "ISO_639_1": "rt"},
+            "title": {"cs": "Root", "en": "Root"},
+            "description": {"cs": "Kořen", "en": "The root concept"},
+        },
+        {
+            "id": "child",
+            "props": {
+                "iri": "https://example.org/vocabulary/child",
+                "ISO_639_1": "ch",
+                "ISO_639_3": "chi",
+                "openaire": "a, b",
+            },
+            "title": {"cs": "Potomek", "en": "Child"},
+            "description": {"cs": "Popis potomka"},
+            "hierarchy": {"parent": "root"},
+        },
+    ]
+
+
+def test_sparql_reader_expands_prefixed_names():
+    reader = SPARQLReader(
+        "Vocabulary",
+        "https://example.org/vocabulary",
+        "https://example.org/scheme",
+        prefixes={"ex": "https://example.org/"},
+    )
+    assert reader._resolve_extra_property("skos:notation") == (SKOS.notation, None)  # noqa: SLF001
+    assert reader._resolve_extra_property(ExtraProperty("ex:code", datatype="xsd:string")) == (  # noqa: SLF001
+        URIRef("https://example.org/code"),
+        URIRef("xsd:string"),
+    )
+    # full IRIs and names with unknown prefixes are kept as they are
+    assert reader._expand_curie("https://example.org/code") == URIRef("https://example.org/code")  # noqa: SLF001
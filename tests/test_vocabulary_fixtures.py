@@ -0,0 +1,40 @@
+#
+# Copyright (c) 2025 CESNET z.s.p.o.
+#
+# This file is a part of ccmm-invenio (see https://github.com/NRP-CZ/ccmm-invenio).
+#
+# ccmm-invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+#
+from __future__ import annotations
+
+import yaml
+from invenio_access.permissions import system_identity
+from invenio_vocabularies.proxies import current_service as vocabulary_service
+
+from ccmm_invenio.fixtures.loader import BulkVocabularyLoader, LoadResult
+
+
+def write_terms(path, title_suffix=""):
+    terms = [{"id": f"t{idx}", "title": {"en": f"Term {idx}{title_suffix}"}} for idx in range(5)]
+    path.write_text(yaml.safe_dump(terms), encoding="utf-8")
+
+
+def test_bulk_load_vocabularies(app, db, search_clear, tmp_path):
+    write_terms(tmp_path / "titletypes.yaml")
+    fixtures_file = tmp_path / "vocabularies.yaml"
+    fixtures_file.write_text("titletypes:\n  pid-type: v-tt\n  data-file: titletypes.yaml\n", encoding="utf-8")
+    loader = BulkVocabularyLoader(fixtures_file=fixtures_file, state_file=tmp_path / "state.json", batch_size=2)
+
+    assert loader.load() == [LoadResult(type="titletypes", created=5)]
+    hits = vocabulary_service.search(system_identity, type="titletypes")
+    assert hits.total == 5
+
+    # unchanged content is not loaded again
+    assert loader.load() == [LoadResult(type="titletypes", skipped=True)]
+
+    # changed content updates the existing terms
+    write_terms(tmp_path / "titletypes.yaml", title_suffix=" (updated)")
+    assert loader.load() == [LoadResult(type="titletypes", updated=5)]
+    term = vocabulary_service.read(system_identity, ("titletypes", "t1")).to_dict()
+    assert term["title"] == {"en": "Term 1 (updated)"}